@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from app.env import env_int
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+ASSET_CACHE_DIR = Path(os.getenv("ASSET_CACHE_DIR") or str(BASE_DIR / "cache" / "assets"))
+# 0 disables the cache and every asset is downloaded straight into the job directory.
+ASSET_CACHE_MAX_BYTES = env_int("ASSET_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024)
+# Entries validated within this window are served without touching the network;
+# older ones are revalidated with If-None-Match / If-Modified-Since.
+ASSET_CACHE_FRESH_SEC = env_int("ASSET_CACHE_FRESH_SEC", 24 * 60 * 60)
+ASSET_DOWNLOAD_TIMEOUT_SEC = 60
+# Hard cap per downloaded asset; bodies are streamed so memory stays at one chunk.
+ASSET_MAX_BYTES = env_int("ASSET_MAX_BYTES", 200 * 1024 * 1024)
+ASSET_DOWNLOAD_RESUME_ATTEMPTS = env_int("ASSET_DOWNLOAD_RESUME_ATTEMPTS", 3)
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+_STREAM_CHUNK_BYTES = 64 * 1024
+# Linux FICLONE ioctl (copy-on-write reflink on btrfs/xfs).
+_FICLONE = 0x40049409
+_digest_memo: dict[tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def file_sha256(path: Path) -> str:
+    """Content hash of a file, memoized by (path, size, mtime) so repeat lookups are free."""
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _digest_lock:
+        cached = _digest_memo.get(memo_key)
+    if cached:
+        return cached
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _digest_lock:
+        if len(_digest_memo) > 4096:
+            _digest_memo.clear()
+        _digest_memo[memo_key] = value
+    return value
+
+
+def _reflink(source: Path, destination: Path) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        with source.open("rb") as src, destination.open("wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError:
+        try:
+            destination.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def link_or_copy(source: Path, destination: Path) -> str:
+    """
+    Place source at destination without copying bytes when possible:
+    hardlink, then reflink, then a plain copy across filesystems.
+    Returns the method used.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if destination.exists() or destination.is_symlink():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+        return "hardlink"
+    except OSError:
+        pass
+    if _reflink(source, destination):
+        return "reflink"
+    shutil.copyfile(source, destination)
+    return "copy"
+
+
+def list_cache_files(root: Path) -> list[tuple[float, int, Path]]:
+    """(mtime, size, path) for finished files under a two-level cache directory."""
+    rows: list[tuple[float, int, Path]] = []
+    if not root.exists():
+        return rows
+    for file_path in root.glob("*/*"):
+        if file_path.suffix in {".part", ".tmp"}:
+            continue
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        rows.append((stat.st_mtime, stat.st_size, file_path))
+    return rows
+
+
+def evict_lru_files(
+    root: Path,
+    max_bytes: int,
+    companion_suffixes: tuple[str, ...] = (),
+) -> int:
+    """
+    Delete least recently used files (oldest mtime first) until root fits max_bytes.
+    Files with a companion suffix are never picked on their own: they go together
+    with the entry of the same stem, so an entry and its sidecar leave as a pair.
+    """
+    rows = list_cache_files(root)
+    total = sum(size for _, size, _ in rows)
+    companions = {file_path: size for _, size, file_path in rows if file_path.suffix in companion_suffixes}
+    evicted = 0
+    for _, size, file_path in sorted(rows):
+        if total <= max_bytes:
+            break
+        if file_path in companions:
+            continue
+        try:
+            file_path.unlink()
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+        for suffix in companion_suffixes:
+            companion = file_path.with_suffix(suffix)
+            if companion not in companions:
+                continue
+            try:
+                companion.unlink()
+            except OSError:
+                continue
+            total -= companions.pop(companion)
+    return evicted
+
+
+def touch(path: Path) -> None:
+    """Bump mtime so LRU eviction treats the file as recently used."""
+    try:
+        os.utime(path, None)
+    except OSError:
+        return
+
+
+class AssetTooLarge(RuntimeError):
+    pass
+
+
+_RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+
+
+def stream_download(
+    url: str,
+    destination: Path,
+    session: requests.Session | None = None,
+    headers: dict[str, str] | None = None,
+    max_bytes: int = ASSET_MAX_BYTES,
+) -> dict[str, Any]:
+    """
+    Stream url into destination chunk by chunk and rename it into place atomically.
+
+    A dropped connection resumes with an HTTP Range request (guarded by If-Range) up to
+    ASSET_DOWNLOAD_RESUME_ATTEMPTS times; a server that ignores the range restarts the
+    body from scratch. Returns status, response headers, byte count and SHA-256.
+    A 304 answer returns without touching destination.
+    """
+    http = session if session is not None else requests
+    request_headers = dict(headers or {})
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(
+        dir=str(destination.parent),
+        prefix=f".{destination.name}.",
+        suffix=".part",
+    )
+    temp_path = Path(temp_name)
+    digest = hashlib.sha256()
+    written = 0
+    attempts = 0
+    validator = ""
+    first_response: requests.Response | None = None
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            while True:
+                attempt_headers = dict(request_headers)
+                if written > 0:
+                    attempt_headers["Range"] = f"bytes={written}-"
+                    if validator:
+                        attempt_headers["If-Range"] = validator
+                try:
+                    with http.get(
+                        url,
+                        headers=attempt_headers,
+                        timeout=ASSET_DOWNLOAD_TIMEOUT_SEC,
+                        stream=True,
+                    ) as response:
+                        if first_response is None:
+                            first_response = response
+                            if response.status_code == 304:
+                                return {"status": 304, "headers": response.headers, "bytes": 0, "sha256": ""}
+                            validator = str(
+                                response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+                            )
+                        if response.status_code >= 400:
+                            raise RuntimeError(f"Failed to download asset: {url} (HTTP {response.status_code})")
+                        if written > 0 and response.status_code != 206:
+                            # Range ignored or validator changed: start the body over.
+                            handle.seek(0)
+                            handle.truncate()
+                            digest = hashlib.sha256()
+                            written = 0
+                        declared = response.headers.get("Content-Length")
+                        if max_bytes > 0 and declared and declared.isdigit():
+                            if written + int(declared) > max_bytes:
+                                raise AssetTooLarge(
+                                    f"Asset exceeds {max_bytes} bytes: {url}"
+                                )
+                        for chunk in response.iter_content(chunk_size=_STREAM_CHUNK_BYTES):
+                            if not chunk:
+                                continue
+                            written += len(chunk)
+                            if max_bytes > 0 and written > max_bytes:
+                                raise AssetTooLarge(f"Asset exceeds {max_bytes} bytes: {url}")
+                            handle.write(chunk)
+                            digest.update(chunk)
+                    break
+                except _RESUMABLE_ERRORS:
+                    attempts += 1
+                    if first_response is None or attempts > ASSET_DOWNLOAD_RESUME_ATTEMPTS:
+                        raise
+        os.replace(temp_path, destination)
+    finally:
+        if temp_path.exists():
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+    return {
+        "status": first_response.status_code if first_response is not None else 200,
+        "headers": first_response.headers if first_response is not None else {},
+        "bytes": written,
+        "sha256": digest.hexdigest(),
+    }
+
+
+class AssetCache:
+    """
+    Shared on-disk cache for downloaded job assets.
+
+    Blobs are stored once by content hash (blobs/ab/abcdef...); a per-URL index entry
+    records the blob hash plus ETag/Last-Modified validators. Job asset directories get
+    hardlinks to the blob, and blob mtime doubles as the LRU clock for eviction.
+    """
+
+    def __init__(
+        self,
+        root: Path = ASSET_CACHE_DIR,
+        max_bytes: int = ASSET_CACHE_MAX_BYTES,
+        fresh_sec: int = ASSET_CACHE_FRESH_SEC,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.fresh_sec = fresh_sec
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "evictions": 0,
+            "bytesDownloaded": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def _index_path(self, url: str) -> Path:
+        url_key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / "index" / url_key[:2] / f"{url_key}.json"
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def _load_entry(self, url: str) -> dict[str, Any] | None:
+        index_path = self._index_path(url)
+        try:
+            entry = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        if not self._blob_path(str(entry.get("sha256") or "")).exists():
+            return None
+        return entry
+
+    def _save_entry(self, url: str, entry: dict[str, Any]) -> None:
+        index_path = self._index_path(url)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=str(index_path.parent), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry))
+        os.replace(temp_name, index_path)
+
+    def _serve(self, entry: dict[str, Any], destination: Path) -> None:
+        blob_path = self._blob_path(str(entry["sha256"]))
+        touch(blob_path)
+        link_or_copy(blob_path, destination)
+
+    def _store(self, url: str, downloaded_path: Path, download: dict[str, Any]) -> dict[str, Any]:
+        digest = str(download["sha256"])
+        headers = download["headers"]
+        blob_path = self._blob_path(digest)
+        if blob_path.exists():
+            downloaded_path.unlink()
+        else:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(downloaded_path, blob_path)
+        entry = {
+            "url": url,
+            "sha256": digest,
+            "size": int(download["bytes"]),
+            "etag": str(headers.get("ETag") or ""),
+            "lastModified": str(headers.get("Last-Modified") or ""),
+            "validatedAt": time.time(),
+        }
+        self._save_entry(url, entry)
+        return entry
+
+    def fetch(
+        self,
+        url: str,
+        destination: Path,
+        session: requests.Session | None = None,
+    ) -> str:
+        """
+        Place the asset for url at destination and return how it was satisfied:
+        "hit" (no network), "revalidated" (304 from origin) or "miss" (downloaded).
+        """
+        entry = self._load_entry(url)
+        if entry is not None and time.time() - float(entry.get("validatedAt") or 0) < self.fresh_sec:
+            self._serve(entry, destination)
+            self._count("hits")
+            return "hit"
+
+        headers: dict[str, str] = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = str(entry["etag"])
+            if entry.get("lastModified"):
+                headers["If-Modified-Since"] = str(entry["lastModified"])
+
+        # Stream into the incoming/ area on the cache filesystem so the finished
+        # file can be renamed into blobs/ instead of copied.
+        incoming_path = self.root / "incoming" / uuid.uuid4().hex
+        download = stream_download(url, incoming_path, session=session, headers=headers)
+        if entry is not None and download["status"] == 304:
+            entry["validatedAt"] = time.time()
+            self._save_entry(url, entry)
+            self._serve(entry, destination)
+            self._count("revalidated")
+            return "revalidated"
+
+        self._count("misses")
+        self._count("bytesDownloaded", int(download["bytes"]))
+        entry = self._store(url, incoming_path, download)
+        self._serve(entry, destination)
+        self.evict()
+        return "miss"
+
+    def _blob_files(self) -> list[tuple[float, int, Path]]:
+        return list_cache_files(self.root / "blobs")
+
+    def evict(self) -> int:
+        """Delete least recently used blobs until the cache fits max_bytes."""
+        with self._lock:
+            evicted = evict_lru_files(self.root / "blobs", self.max_bytes)
+            self._counters["evictions"] += evicted
+            return evicted
+
+    def stats(self) -> dict[str, Any]:
+        rows = self._blob_files()
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "enabled": self.enabled,
+            "blobCount": len(rows),
+            "totalBytes": sum(size for _, size, _ in rows),
+            "maxBytes": self.max_bytes,
+        }
+
+
+asset_cache = AssetCache()
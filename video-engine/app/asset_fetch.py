@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.asset_cache import asset_cache, link_or_copy, stream_download
+from app.env import env_int
+
+
+ASSET_FETCH_CONCURRENCY = env_int("ASSET_FETCH_CONCURRENCY", 8, 1, 32)
+# Placements remembered for reuse_placed; least recently used ones are forgotten first.
+ASSET_PLACED_MEMO_SIZE = env_int("ASSET_PLACED_MEMO_SIZE", 4096, 1)
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+# destination -> (source, size, mtime_ns) for files this process placed itself (LRU).
+_placed_assets: OrderedDict[str, tuple[str, int, int]] = OrderedDict()
+_placed_lock = threading.Lock()
+
+
+class AssetFetchError(RuntimeError):
+    def __init__(self, failures: list[dict[str, Any]], rows: list[dict[str, Any]] | None = None) -> None:
+        self.failures = failures
+        self.rows = rows if rows is not None else failures
+        details = "; ".join(f"{row['source']}: {row['error']}" for row in failures)
+        super().__init__(f"Failed to fetch {len(failures)} asset(s): {details}")
+
+
+def http_session() -> requests.Session:
+    """Process-wide keep-alive session so repeated hosts reuse TCP/TLS connections."""
+    global _session  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=ASSET_FETCH_CONCURRENCY,
+                pool_maxsize=ASSET_FETCH_CONCURRENCY * 2,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def _is_remote(source: str) -> bool:
+    return source.startswith("http://") or source.startswith("https://")
+
+
+def download_to_path(source: str, destination: Path) -> str:
+    """Place one asset at destination and return how it was satisfied."""
+    if _is_remote(source):
+        if asset_cache.enabled:
+            return asset_cache.fetch(source, destination, session=http_session())
+        stream_download(source, destination, session=http_session())
+        return "downloaded"
+
+    parsed = urlparse(source)
+    local_candidate = Path(parsed.path if parsed.scheme == "file" else source)
+    if not local_candidate.exists():
+        raise RuntimeError(f"Local asset does not exist: {source}")
+    # Same-filesystem sources are linked (or reflinked) instead of copied.
+    return f"local-{link_or_copy(local_candidate, destination)}"
+
+
+def _placement_signature(destination: Path) -> tuple[int, int] | None:
+    try:
+        stat = destination.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _already_placed(source: str, destination: Path) -> bool:
+    signature = _placement_signature(destination)
+    if signature is None:
+        return False
+    with _placed_lock:
+        placed = _placed_assets.get(str(destination))
+        if placed is not None:
+            _placed_assets.move_to_end(str(destination))
+    return placed == (source, *signature)
+
+
+def _remember_placed(source: str, destination: Path) -> None:
+    signature = _placement_signature(destination)
+    if signature is None:
+        return
+    with _placed_lock:
+        _placed_assets[str(destination)] = (source, *signature)
+        _placed_assets.move_to_end(str(destination))
+        while len(_placed_assets) > ASSET_PLACED_MEMO_SIZE:
+            _placed_assets.popitem(last=False)
+
+
+def fetch_assets(
+    assets: list[tuple[str, Path]],
+    max_workers: int = ASSET_FETCH_CONCURRENCY,
+    reuse_placed: bool = False,
+    prefetched: dict[str, Path] | None = None,
+) -> dict[str, Any]:
+    """
+    Fetch (source, destination) pairs concurrently over the pooled session.
+    Every asset is attempted; failures are collected per asset and raised together
+    as AssetFetchError so one bad URL does not hide the others.
+
+    reuse_placed skips assets this process already placed at the same destination
+    from the same source (and that are unchanged on disk) without revalidating them,
+    for callers such as preview scrubbing that hit one job repeatedly.
+
+    prefetched maps sources already fetched elsewhere (a batch staging directory) to
+    their local copy; those are linked into place with status "shared-<link mode>".
+    """
+    started = time.monotonic()
+
+    def _fetch_one(source: str, destination: Path) -> dict[str, Any]:
+        asset_started = time.monotonic()
+        row: dict[str, Any] = {"source": source, "path": str(destination)}
+        try:
+            if reuse_placed and _already_placed(source, destination):
+                row["status"] = "reused"
+            elif prefetched and source in prefetched:
+                row["status"] = f"shared-{link_or_copy(prefetched[source], destination)}"
+            else:
+                row["status"] = download_to_path(source, destination)
+                _remember_placed(source, destination)
+            row["bytes"] = destination.stat().st_size
+        except Exception as exc:  # pylint: disable=broad-except
+            row["status"] = "failed"
+            row["bytes"] = 0
+            row["error"] = str(exc)
+        row["elapsedSec"] = round(time.monotonic() - asset_started, 3)
+        return row
+
+    worker_count = max(1, min(max_workers, len(assets)))
+    with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="asset") as executor:
+        futures = [executor.submit(_fetch_one, source, destination) for source, destination in assets]
+        rows = [future.result() for future in futures]
+
+    failures = [row for row in rows if row["status"] == "failed"]
+    if failures:
+        raise AssetFetchError(failures, rows)
+    return {
+        "totalSec": round(time.monotonic() - started, 3),
+        "assets": rows,
+    }
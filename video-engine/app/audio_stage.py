@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from app.asset_cache import (
+    BASE_DIR,
+    evict_lru_files,
+    file_sha256,
+    link_or_copy,
+    list_cache_files,
+    touch,
+)
+from app.cancellation import CancelToken
+from app.env import env_int
+from app.ffmpeg_exec import (
+    FFMPEG_BIN,
+    aac_args,
+    append_ffmpeg_log,
+    run_cmd,
+    tail_text,
+)
+from app.progress import RenderProgress
+
+
+AUDIO_CACHE_DIR = Path(os.getenv("AUDIO_CACHE_DIR") or str(BASE_DIR / "cache" / "audio"))
+# 0 disables reuse; the mixed track is still encoded once per job, off the video path.
+AUDIO_CACHE_MAX_BYTES = env_int("AUDIO_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+# Two-pass EBU R128 normalization target (loudnorm options, e.g. I=-14:TP=-1.5:LRA=11).
+# Empty keeps the narration level as delivered.
+AUDIO_LOUDNORM = str(os.getenv("AUDIO_LOUDNORM", "") or "").strip()
+# loudnorm resamples to 192 kHz internally; the encoder brings the track back to this rate.
+AUDIO_SAMPLE_RATE = env_int("AUDIO_SAMPLE_RATE", 48000, 8000, 192000)
+# Bump when the mix changes in a way the filter graph and codec args do not capture.
+_AUDIO_KEY_VERSION = "1"
+_LOUDNORM_MEASURED_KEYS = (
+    ("measured_I", "input_i"),
+    ("measured_TP", "input_tp"),
+    ("measured_LRA", "input_lra"),
+    ("measured_thresh", "input_thresh"),
+    ("offset", "target_offset"),
+)
+
+
+def _audio_mix_graph(tts_input: int, sfx_input: int | None) -> tuple[str, str]:
+    """Return (filter graph, map target) for narration with an optional looped SFX bed."""
+    if sfx_input is None:
+        return "", f"{tts_input}:a"
+    return (
+        f"[{tts_input}:a]volume=1.0[tts];[{sfx_input}:a]volume=0.13[sfx];"
+        "[tts][sfx]amix=inputs=2:duration=first:dropout_transition=2[aout]",
+        "[aout]",
+    )
+
+
+def _mix_graph(has_sfx: bool, tail: str = "") -> tuple[str, str]:
+    """Narration (+ looped SFX bed) mix, optionally followed by one more filter chain."""
+    graph, audio_map = _audio_mix_graph(0, 1 if has_sfx else None)
+    if not tail:
+        return graph, audio_map
+    source = audio_map if audio_map.startswith("[") else f"[{audio_map}]"
+    return ";".join(part for part in (graph, f"{source}{tail}[anorm]") if part), "[anorm]"
+
+
+def _mix_inputs(tts_path: Path, sfx_path: Path | None) -> list[str]:
+    inputs = ["-i", str(tts_path)]
+    if sfx_path is not None:
+        inputs.extend(["-stream_loop", "-1", "-i", str(sfx_path)])
+    return inputs
+
+
+def _parse_loudnorm_stats(stderr_text: str) -> dict[str, str] | None:
+    """loudnorm print_format=json writes one JSON object at the end of the log."""
+    start = stderr_text.rfind("{")
+    end = stderr_text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        stats = json.loads(stderr_text[start : end + 1])
+    except ValueError:
+        return None
+    if not all(source in stats for _, source in _LOUDNORM_MEASURED_KEYS):
+        return None
+    return {key: str(value) for key, value in stats.items()}
+
+
+class AudioCache:
+    """
+    Final AAC tracks keyed by narration and SFX content hashes plus the mix settings
+    (filter graph, cut length, codec args, loudnorm target). The first-pass loudnorm
+    measurements are kept in a .json sidecar next to the track so a hit needs no
+    analysis either; a track without its sidecar counts as a miss, and eviction
+    removes the two together.
+    """
+
+    def __init__(
+        self,
+        root: Path = AUDIO_CACHE_DIR,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key_for(self, tts_path: Path, sfx_path: Path | None, settings: dict[str, Any]) -> str:
+        payload = json.dumps(
+            {
+                "version": _AUDIO_KEY_VERSION,
+                "tts": file_sha256(tts_path),
+                "sfx": file_sha256(sfx_path) if sfx_path is not None else None,
+                "settings": settings,
+            },
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.m4a"
+
+    def lookup(self, key: str, destination: Path) -> dict[str, Any] | None:
+        """Place a cached track at destination; returns its metadata, or None on a miss."""
+        if not self.enabled:
+            return None
+        cached = self._path_for(key)
+        try:
+            meta = json.loads(cached.with_suffix(".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = None
+        if not isinstance(meta, dict) or not cached.exists():
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        touch(cached)
+        link_or_copy(cached, destination)
+        with self._lock:
+            self._counters["hits"] += 1
+        return meta
+
+    def store(self, key: str, track_path: Path, meta: dict[str, Any]) -> None:
+        if not self.enabled or not track_path.exists():
+            return
+        cached = self._path_for(key)
+        if not cached.exists():
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            link_or_copy(track_path, cached)
+        # Written after the track and renamed into place, so a sidecar always has its track.
+        sidecar_tmp = cached.with_suffix(".json.tmp")
+        sidecar_tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(sidecar_tmp, cached.with_suffix(".json"))
+        with self._lock:
+            self._counters["evictions"] += evict_lru_files(
+                self.root, self.max_bytes, companion_suffixes=(".json",)
+            )
+
+    def stats(self) -> dict[str, Any]:
+        rows = [row for row in list_cache_files(self.root) if row[2].suffix == ".m4a"]
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "enabled": self.enabled,
+            "trackCount": len(rows),
+            "totalBytes": sum(size for _, size, _ in rows),
+            "maxBytes": self.max_bytes,
+        }
+
+
+audio_cache = AudioCache()
+
+
+def _measure_loudness(
+    tts_path: Path,
+    sfx_path: Path | None,
+    duration_sec: float,
+    target: str,
+    log_path: Path | None,
+    progress: RenderProgress | None,
+    cancel: CancelToken | None,
+) -> dict[str, str]:
+    """First loudnorm pass over the mixed signal (decode only, nothing is encoded)."""
+    graph, audio_map = _mix_graph(sfx_path is not None, f"loudnorm={target}:print_format=json")
+    command = [
+        FFMPEG_BIN,
+        "-hide_banner",
+        "-y",
+        *_mix_inputs(tts_path, sfx_path),
+        "-filter_complex",
+        graph,
+        "-map",
+        audio_map,
+        "-t",
+        f"{duration_sec:.6f}",
+        "-f",
+        "null",
+        "-",
+    ]
+    stderr_lines: list[str] = []
+    run_cmd(
+        command,
+        log_path=log_path,
+        label="audio-loudness",
+        progress=progress,
+        cancel=cancel,
+        on_stderr=stderr_lines.append,
+    )
+    stats = _parse_loudnorm_stats("".join(stderr_lines))
+    if stats is None:
+        stderr_text = tail_text("".join(stderr_lines))
+        append_ffmpeg_log(log_path, f"[audio-loudness] FAIL no loudnorm stats\n{stderr_text}")
+        raise RuntimeError(f"Loudness analysis failed:\n{stderr_text}")
+    append_ffmpeg_log(
+        log_path,
+        f"[audio-loudness] STATS input_i={stats['input_i']} input_tp={stats['input_tp']} input_lra={stats['input_lra']}",
+    )
+    return stats
+
+
+def render_audio_track(
+    tts_path: Path,
+    sfx_path: Path | None,
+    duration_sec: float,
+    output_path: Path,
+    audio_bitrate: str | None = None,
+    log_path: Path | None = None,
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+    loudnorm: str = AUDIO_LOUDNORM,
+) -> dict[str, Any]:
+    """
+    Produce the job's final AAC track (narration + optional SFX bed, cut to
+    duration_sec, optionally two-pass loudnorm) at output_path, from the audio
+    cache when the same narration was mixed the same way before. The final merge
+    then stream-copies it.
+    """
+    codec_args = [*aac_args(audio_bitrate)]
+    if loudnorm:
+        codec_args.extend(["-ar", str(AUDIO_SAMPLE_RATE)])
+    settings = {
+        "mix": _mix_graph(sfx_path is not None)[0],
+        "durationMs": int(round(duration_sec * 1000)),
+        "codec": codec_args,
+        "loudnorm": loudnorm or None,
+    }
+    key = audio_cache.key_for(tts_path, sfx_path, settings)
+    meta = audio_cache.lookup(key, output_path)
+    if meta is not None:
+        append_ffmpeg_log(log_path, f"[audio-mix] REUSE cache key={key[:12]}")
+        return {"cache": "hit", "loudnorm": meta.get("loudnorm")}
+
+    stats: dict[str, str] | None = None
+    tail = ""
+    if loudnorm:
+        stats = _measure_loudness(tts_path, sfx_path, duration_sec, loudnorm, log_path, progress, cancel)
+        measured = ":".join(f"{key_name}={stats[source]}" for key_name, source in _LOUDNORM_MEASURED_KEYS)
+        tail = f"loudnorm={loudnorm}:{measured}:linear=true"
+    graph, audio_map = _mix_graph(sfx_path is not None, tail)
+    command = [FFMPEG_BIN, "-y", *_mix_inputs(tts_path, sfx_path)]
+    if graph:
+        command.extend(["-filter_complex", graph])
+    command.extend([
+        "-map",
+        audio_map,
+        "-vn",
+        *codec_args,
+        "-t",
+        f"{duration_sec:.6f}",
+        str(output_path),
+    ])
+    # Never let ffmpeg truncate a file that may be hardlinked into the cache.
+    if output_path.exists():
+        output_path.unlink()
+    run_cmd(command, log_path=log_path, label="audio-mix", progress=progress, cancel=cancel)
+    if not output_path.exists() or output_path.stat().st_size == 0:
+        raise RuntimeError(f"Audio stage produced no track: {output_path}")
+    meta = {"loudnorm": stats}
+    audio_cache.store(key, output_path, meta)
+    return {"cache": "miss", "loudnorm": stats}
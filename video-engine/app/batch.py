@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+from app.asset_fetch import AssetFetchError, fetch_assets
+from app.ffmpeg_builder import resolve_sfx_path
+from app.jobs import JobAlreadyActive, JobQueueFull, JobRecord
+from app.media_probe import MediaProbeError, validate_media
+from app.models import BuildVideoRequest
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# Per-batch copies of shared assets; removed when the batch's last job finishes.
+BATCH_STAGING_DIR = Path(os.getenv("BATCH_STAGING_DIR") or str(BASE_DIR / "cache" / "batches"))
+# How often the scheduler re-checks queue capacity and finished jobs.
+BATCH_POLL_SEC = 0.5
+
+
+def _job_sources(payload: BuildVideoRequest) -> list[str]:
+    return [*payload.imageUrls, payload.ttsPath]
+
+
+def _staged_name(source: str) -> str:
+    suffix = Path(urlparse(source).path).suffix
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:24] + suffix
+
+
+@dataclass
+class SharedAssets:
+    """Assets of a batch fetched once, keyed by source, for every job that references them."""
+
+    staging_dir: Path
+    paths: dict[str, Path] = field(default_factory=dict)
+    failures: dict[str, str] = field(default_factory=dict)
+    sfx_path: Path | None = None
+    report: dict[str, Any] = field(default_factory=dict)
+
+    def job_failures(self, payload: BuildVideoRequest) -> list[str]:
+        return [
+            f"{source}: {self.failures[source]}"
+            for source in dict.fromkeys(_job_sources(payload))
+            if source in self.failures
+        ]
+
+
+def prefetch_shared_assets(payloads: list[BuildVideoRequest], staging_dir: Path) -> SharedAssets:
+    """
+    Fetch and probe each distinct image/narration source once and resolve the
+    shared SFX bed once. A failed source only fails the jobs using it.
+    """
+    shared = SharedAssets(staging_dir=staging_dir)
+    references = [source for payload in payloads for source in _job_sources(payload)]
+    staged = {source: staging_dir / _staged_name(source) for source in dict.fromkeys(references)}
+    staging_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.monotonic()
+    try:
+        rows = fetch_assets(list(staged.items()))["assets"]
+    except AssetFetchError as exc:
+        rows = exc.rows
+    fetch_sec = time.monotonic() - started
+    for row in rows:
+        if row["status"] == "failed":
+            shared.failures[row["source"]] = row.get("error") or "fetch failed"
+        else:
+            shared.paths[row["source"]] = staged[row["source"]]
+
+    started = time.monotonic()
+    kinds = {source: "image" for payload in payloads for source in payload.imageUrls}
+    kinds.update({payload.ttsPath: "audio" for payload in payloads})
+    try:
+        validate_media([(source, path, kinds[source]) for source, path in shared.paths.items()])
+    except MediaProbeError as exc:
+        for row in exc.failures:
+            shared.failures[row["source"]] = row["error"]
+            shared.paths.pop(row["source"], None)
+    if any(payload.useSfx for payload in payloads):
+        shared.sfx_path = resolve_sfx_path()
+    probe_sec = time.monotonic() - started
+
+    shared.report = {
+        "assetRefs": len(references),
+        "uniqueAssets": len(staged),
+        "failedAssets": len(shared.failures),
+        "assetFetchSec": round(fetch_sec, 3),
+        "probeSec": round(probe_sec, 3),
+        "assets": rows,
+    }
+    return shared
+
+
+def run_batch(
+    batch_id: str,
+    payloads: list[BuildVideoRequest],
+    submit: Callable[[BuildVideoRequest, SharedAssets], JobRecord],
+    emit: Callable[[dict[str, Any]], None],
+    staging_root: Path = BATCH_STAGING_DIR,
+) -> None:
+    """
+    Render a batch: shared assets first, then jobs are handed to submit() as the
+    render queue has room, and one "job" event is emitted per job in the order
+    jobs finish. Events: "accepted", "job" (a JobRecord snapshot), then "done".
+    """
+    started = time.monotonic()
+    staging_dir = staging_root / batch_id
+    counts = {"succeeded": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+    try:
+        shared = prefetch_shared_assets(payloads, staging_dir)
+        emit(
+            {
+                "event": "accepted",
+                "batchId": batch_id,
+                "jobIds": [payload.jobId for payload in payloads],
+                **shared.report,
+            }
+        )
+
+        def _reject(payload: BuildVideoRequest, error: str) -> None:
+            counts["rejected"] += 1
+            emit({"event": "job", "jobId": payload.jobId, "state": "rejected", "error": error})
+
+        pending = deque(payloads)
+        active: dict[str, JobRecord] = {}
+        while pending or active:
+            while pending:
+                payload = pending[0]
+                problems = shared.job_failures(payload)
+                if problems:
+                    pending.popleft()
+                    _reject(payload, "Unusable asset(s): " + "; ".join(problems))
+                    continue
+                try:
+                    record = submit(payload, shared)
+                except JobQueueFull:
+                    # Leave the rest queued here until a running job frees a slot.
+                    break
+                except JobAlreadyActive as exc:
+                    pending.popleft()
+                    _reject(payload, str(exc))
+                    continue
+                pending.popleft()
+                active[payload.jobId] = record
+
+            finished = [job_id for job_id, record in active.items() if record.done.is_set()]
+            for job_id in finished:
+                record = active.pop(job_id)
+                counts[record.state] = counts.get(record.state, 0) + 1
+                emit({"event": "job", **record.snapshot()})
+            if not finished:
+                if active:
+                    next(iter(active.values())).done.wait(BATCH_POLL_SEC)
+                else:
+                    time.sleep(BATCH_POLL_SEC)
+    except Exception as exc:  # pylint: disable=broad-except
+        emit({"event": "error", "batchId": batch_id, "error": str(exc)})
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    emit(
+        {
+            "event": "done",
+            "batchId": batch_id,
+            **counts,
+            "totalSec": round(time.monotonic() - started, 3),
+        }
+    )
+
+
+def clear_staging(staging_root: Path = BATCH_STAGING_DIR) -> None:
+    """Drop staging left by batches interrupted by a restart."""
+    shutil.rmtree(staging_root, ignore_errors=True)
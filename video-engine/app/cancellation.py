@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import threading
+from typing import Any
+
+
+class JobCancelled(RuntimeError):
+    pass
+
+
+def process_group_kwargs() -> dict[str, Any]:
+    """Popen kwargs that start the child in its own process group so it can be killed as a unit."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_group(process: subprocess.Popen) -> None:
+    if process.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            process.kill()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+
+
+class CancelToken:
+    """
+    Cancellation flag for one job plus the ffmpeg processes it is currently running.
+    cancel() kills every attached process group at once; processes attached later
+    are killed on attach, so a cancel racing a Popen cannot leave an encode behind.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._processes: set[subprocess.Popen] = set()
+        self.reason = ""
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        with self._lock:
+            if not self._event.is_set():
+                self.reason = reason
+                self._event.set()
+            processes = list(self._processes)
+        for process in processes:
+            kill_process_group(process)
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise JobCancelled(f"Job cancelled: {self.reason}")
+
+    def attach(self, process: subprocess.Popen) -> None:
+        with self._lock:
+            self._processes.add(process)
+            cancelled = self._event.is_set()
+        if cancelled:
+            kill_process_group(process)
+
+    def detach(self, process: subprocess.Popen) -> None:
+        with self._lock:
+            self._processes.discard(process)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import os
+
+
+def env_int(env_key: str, default_value: int, min_value: int = 0, max_value: int | None = None) -> int:
+    """
+    Integer setting from the environment, clamped to [min_value, max_value].
+    Fractional values are truncated ("1.5" -> 1); unset or unparseable values use default_value.
+    """
+    raw = str(os.getenv(env_key, str(default_value)) or "").strip()
+    try:
+        parsed = int(float(raw))
+    except (TypeError, ValueError, OverflowError):
+        parsed = default_value
+    parsed = max(min_value, parsed)
+    if max_value is not None:
+        parsed = min(max_value, parsed)
+    return parsed
+
+
+def env_bool(env_key: str, default_value: bool) -> bool:
+    """Boolean setting from the environment: 1/true/yes/on/y enable it; unset uses default_value."""
+    raw = os.getenv(env_key)
+    if raw is None:
+        return default_value
+    return raw.strip().lower() in {"1", "true", "yes", "on", "y"}
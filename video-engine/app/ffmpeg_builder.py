@@ -1,32 +1,71 @@
 from __future__ import annotations
 
+import json
 import os
-import shlex
 import subprocess
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 import math
 import re
 import unicodedata
 
-
-FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
-FFPROBE_BIN = os.getenv("FFPROBE_BIN", "ffprobe")
-
-
-def _resolve_cmd_timeout_sec(env_key: str, default_sec: int) -> int:
-    raw = str(os.getenv(env_key, str(default_sec)) or "").strip()
-    try:
-        parsed = int(float(raw))
-    except (TypeError, ValueError):
-        parsed = default_sec
-    return max(10, min(60 * 60, parsed))
-
-
-FFMPEG_CMD_TIMEOUT_SEC = _resolve_cmd_timeout_sec("FFMPEG_CMD_TIMEOUT_SEC", 12 * 60)
-FFPROBE_CMD_TIMEOUT_SEC = _resolve_cmd_timeout_sec("FFPROBE_CMD_TIMEOUT_SEC", 60)
+from app import title_overlay
+from app.asset_cache import BASE_DIR, link_or_copy
+from app.audio_stage import render_audio_track
+from app.cancellation import CancelToken
+from app.env import env_int
+from app.ffmpeg_exec import (
+    FFMPEG_BIN,
+    aac_args,
+    append_ffmpeg_log,
+    decode_output,
+    escape_filter_path,
+    run_cmd,
+    run_parallel_commands,
+    to_ffmpeg_command_string,
+)
+from app.ffmpeg_governor import THREAD_BUDGET
+from app.font_index import font_index
+from app.image_prep import prepare_scene_images
+from app.media_probe import FFPROBE_BIN, FFPROBE_CMD_TIMEOUT_SEC, probe_media, validate_media
+from app.motion_numpy import render_motion_track
+from app.progress import RenderProgress
+from app.scene_motion import (
+    SCENE_MOTION_PRESETS,
+    even_dimension,
+    motion_crop_rect,
+    motion_parameters,
+    panel_geometry,
+    resolve_scene_motion_preset,
+    resolve_video_layout,
+)
+from app.text_layout import measure_text, wrap_text_to_width
+from app.segment_cache import segment_cache
+
+
+# Segment encodes are independent ffmpeg processes; run a few at once so a
+# 6-12 image short does not leave most cores idle behind a single zoompan.
+SEGMENT_RENDER_CONCURRENCY = env_int(
+    "SEGMENT_RENDER_CONCURRENCY",
+    max(1, min(4, (os.cpu_count() or 2) // 2)),
+    1,
+    16,
+)
+
+
+# Default number of time slices the final merge is split into (1 = one merge process).
+FINAL_ENCODE_SLICES = env_int("FINAL_ENCODE_SLICES", 1, 1, 16)
+# Shortest slice worth its own ffmpeg start-up and leading IDR frame.
+FINAL_SLICE_MIN_SEC = env_int("FINAL_SLICE_MIN_SEC", 8, 1, 600)
+# Pink-noise SFX bed shared by every job when DEFAULT_SFX_PATH does not exist.
+SFX_BED_PATH = Path(os.getenv("SFX_BED_PATH") or str(BASE_DIR / "cache" / "sfx" / "pink-noise-bed.mp3"))
+_sfx_bed_lock = threading.Lock()
+# Largest audio/video duration gap accepted after a sliced merge (about two AAC frames).
+_AV_SYNC_TOLERANCE_SEC = 0.1
 
 
 def _safe_strip(value: Any) -> str:
@@ -44,92 +83,22 @@ def _safe_bool(value: Any) -> bool:
     return raw in {"1", "true", "yes", "on", "y"}
 
 
-def _decode_output(value: Any) -> str:
-    if value is None:
-        return ""
-    if isinstance(value, bytes):
-        try:
-            return value.decode("utf-8", errors="replace").strip()
-        except Exception:  # pylint: disable=broad-except
-            return value.decode(errors="replace").strip()
-    return str(value).strip()
-
-
-def _tail_text(value: str, max_chars: int = 4000) -> str:
-    text = (value or "").strip()
-    if len(text) <= max_chars:
-        return text
-    return text[-max_chars:]
-
-
-def _append_ffmpeg_log(log_path: Path | None, message: str) -> None:
-    if log_path is None:
-        return
-    try:
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-        with log_path.open("a", encoding="utf-8") as handle:
-            handle.write(f"[{timestamp}Z] {message}\n")
-    except OSError:
-        return
-
-
-def run_cmd(command: list[str], log_path: Path | None = None, label: str = "ffmpeg") -> None:
-    started = time.monotonic()
-    command_text = _to_ffmpeg_command_string(command)
-    _append_ffmpeg_log(
-        log_path,
-        f"[{label}] START timeout={FFMPEG_CMD_TIMEOUT_SEC}s cmd={command_text}",
-    )
-    try:
-        completed = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=False,
-            check=False,
-            timeout=FFMPEG_CMD_TIMEOUT_SEC,
-        )
-    except subprocess.TimeoutExpired as exc:
-        elapsed = time.monotonic() - started
-        stderr_text = _tail_text(_decode_output(exc.stderr))
-        stdout_text = _tail_text(_decode_output(exc.output))
-        output_text = stderr_text or stdout_text or "(no output captured)"
-        _append_ffmpeg_log(
-            log_path,
-            f"[{label}] TIMEOUT elapsed={elapsed:.2f}s cmd={command_text}\n{output_text}",
-        )
-        raise RuntimeError(
-            f"Command timed out after {FFMPEG_CMD_TIMEOUT_SEC}s: {' '.join(command)}"
-        ) from exc
-    if completed.returncode != 0:
-        elapsed = time.monotonic() - started
-        stderr_text = _decode_output(completed.stderr)
-        stdout_text = _decode_output(completed.stdout)
-        combined = stderr_text or stdout_text or "(ffmpeg returned non-zero with no output)"
-        _append_ffmpeg_log(
-            log_path,
-            f"[{label}] FAIL rc={completed.returncode} elapsed={elapsed:.2f}s cmd={command_text}\n{_tail_text(combined)}",
-        )
-        raise RuntimeError(
-            f"Command failed: {' '.join(command)}\n{combined}"
-        )
-    elapsed = time.monotonic() - started
-    _append_ffmpeg_log(log_path, f"[{label}] OK elapsed={elapsed:.2f}s")
-
-
-def _to_ffmpeg_command_string(command: list[str]) -> str:
-    return " ".join(shlex.quote(arg) for arg in command)
-
-
-def _resolve_sfx_path(output_dir: Path) -> Path | None:
+def resolve_sfx_path(log_path: Path | None = None) -> Path | None:
+    """DEFAULT_SFX_PATH, or the shared pink-noise bed generated once per host (SFX_BED_PATH)."""
     configured = Path(os.getenv("DEFAULT_SFX_PATH", "assets/sfx.mp3"))
     if configured.exists():
         return configured
+    if SFX_BED_PATH.exists():
+        return SFX_BED_PATH
+    with _sfx_bed_lock:
+        if SFX_BED_PATH.exists():
+            return SFX_BED_PATH
+        return _generate_sfx_bed(SFX_BED_PATH, log_path)
+
 
-    generated = output_dir / "_default_sfx.mp3"
-    if generated.exists():
-        return generated
+def _generate_sfx_bed(destination: Path, log_path: Path | None = None) -> Path | None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    generated = destination.with_name(f"{destination.stem}.tmp{destination.suffix}")
 
     generate_command = [
         FFMPEG_BIN,
@@ -137,92 +106,33 @@ def _resolve_sfx_path(output_dir: Path) -> Path | None:
         "-f",
         "lavfi",
         "-i",
-        "anoisesrc=color=pink:amplitude=0.03:d=30",
+        # Fixed seed: a regenerated bed is byte-identical, so cached audio mixes stay valid.
+        "anoisesrc=color=pink:amplitude=0.03:d=30:seed=1",
         "-af",
         "highpass=f=120,lowpass=f=4500,volume=0.35",
         "-c:a",
         "mp3",
         str(generated),
     ]
-    completed = subprocess.run(
-        generate_command,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=False,
-        check=False,
-        timeout=FFMPEG_CMD_TIMEOUT_SEC,
-    )
-    if completed.returncode != 0:
-        return None
-    return generated
-
-
-def probe_audio_duration(audio_path: Path) -> float:
-    command = [
-        FFPROBE_BIN,
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(audio_path),
-    ]
-    try:
-        completed = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=False,
-            check=False,
-            timeout=FFPROBE_CMD_TIMEOUT_SEC,
-        )
-    except subprocess.TimeoutExpired:
-        return 30.0
-    if completed.returncode != 0:
-        return 30.0
     try:
-        return max(1.0, float(_decode_output(completed.stdout)))
-    except ValueError:
-        return 30.0
+        run_cmd(generate_command, log_path=log_path, label="sfx-bed")
+    except RuntimeError:
+        generated.unlink(missing_ok=True)
+        return None
+    if not generated.exists():
+        return None
+    os.replace(generated, destination)
+    return destination
 
 
 def probe_video_dimensions(video_path: Path) -> tuple[int, int] | None:
-    command = [
-        FFPROBE_BIN,
-        "-v",
-        "error",
-        "-select_streams",
-        "v:0",
-        "-show_entries",
-        "stream=width,height",
-        "-of",
-        "csv=s=x:p=0",
-        str(video_path),
-    ]
-    try:
-        completed = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=False,
-            check=False,
-            timeout=FFPROBE_CMD_TIMEOUT_SEC,
-        )
-    except subprocess.TimeoutExpired:
-        return None
-    if completed.returncode != 0:
-        return None
-    raw = _decode_output(completed.stdout)
-    if "x" not in raw:
-        return None
     try:
-        width_text, height_text = raw.split("x", maxsplit=1)
-        width = int(width_text)
-        height = int(height_text)
-        return width, height
+        video = probe_media(video_path, "video", use_cache=False)["video"]
     except ValueError:
         return None
+    if video is None or not video["width"] or not video["height"]:
+        return None
+    return video["width"], video["height"]
 
 
 def _hex_to_ass_color(value: str, fallback: str) -> str:
@@ -357,27 +267,6 @@ def _subtitle_filter_value(
     )
 
 
-def _resolve_scene_motion_preset(
-    overlay_options: dict[str, Any] | None,
-    scene_index: int,
-) -> str:
-    options = overlay_options or {}
-    raw = str(options.get("sceneMotionPreset") or "gentle_zoom").strip().lower()
-    allowed = {"gentle_zoom", "up_down", "left_right", "focus_smooth", "random", "none"}
-    if raw not in allowed:
-        raw = "gentle_zoom"
-    if raw == "random":
-        cycle = ["gentle_zoom", "focus_smooth", "up_down", "left_right"]
-        return cycle[(scene_index - 1) % len(cycle)]
-    return raw
-
-
-def _resolve_video_layout(overlay_options: dict[str, Any] | None) -> str:
-    options = overlay_options or {}
-    raw = str(options.get("videoLayout") or "fill_9_16").strip().lower()
-    return "panel_16_9" if raw == "panel_16_9" else "fill_9_16"
-
-
 def _resolve_output_fps(overlay_options: dict[str, Any] | None) -> int:
     options = overlay_options or {}
     try:
@@ -387,10 +276,6 @@ def _resolve_output_fps(overlay_options: dict[str, Any] | None) -> int:
     return 60 if raw_value >= 60 else 30
 
 
-def _even(value: int) -> int:
-    return value if value % 2 == 0 else value - 1
-
-
 def _resolve_output_dimensions(overlay_options: dict[str, Any] | None) -> tuple[int, int]:
     options = overlay_options or {}
     try:
@@ -401,39 +286,11 @@ def _resolve_output_dimensions(overlay_options: dict[str, Any] | None) -> tuple[
         out_h = int(float(options.get("outputHeight")))
     except (TypeError, ValueError):
         out_h = 1920
-    out_w = max(320, min(4000, _even(out_w)))
-    out_h = max(320, min(4000, _even(out_h)))
+    out_w = max(320, min(4000, even_dimension(out_w)))
+    out_h = max(320, min(4000, even_dimension(out_h)))
     return out_w, out_h
 
 
-def _panel_geometry(
-    overlay_options: dict[str, Any] | None,
-    out_w: int,
-    out_h: int,
-) -> tuple[int, int, int, int]:
-    options = overlay_options or {}
-    try:
-        width_pct = float(options.get("panelWidthPercent"))
-    except (TypeError, ValueError):
-        width_pct = 100.0
-    width_pct = max(60.0, min(100.0, width_pct))
-
-    panel_w = _even(int(round(out_w * (width_pct / 100.0))))
-    panel_w = max(max(320, int(out_w * 0.6)), min(out_w, panel_w))
-    panel_h = _even(int(round(panel_w * (9.0 / 16.0))))
-    panel_h = max(180, min(out_h, panel_h))
-
-    try:
-        top_pct = float(options.get("panelTopPercent"))
-    except (TypeError, ValueError):
-        top_pct = 34.0
-    top_pct = max(0.0, min(85.0, top_pct))
-    top_px = int(round(out_h * (top_pct / 100.0)))
-    top_px = max(0, min(out_h - panel_h, top_px))
-    left_px = (out_w - panel_w) // 2
-    return panel_w, panel_h, left_px, top_px
-
-
 def _zoompan_motion_filter(
     motion_preset: str,
     frame_count: int,
@@ -442,6 +299,7 @@ def _zoompan_motion_filter(
     overlay_options: dict[str, Any] | None,
     out_w: int = 1080,
     out_h: int = 1920,
+    oversample: float | None = None,
 ) -> str:
     if motion_preset == "none":
         return (
@@ -451,42 +309,22 @@ def _zoompan_motion_filter(
             f"d={frame_count}:s={out_w}x{out_h}:fps={fps}"
         )
 
-    options = overlay_options or {}
-    def _safe_float(value: Any, fallback: float) -> float:
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return fallback
-
-    def _clamp(value: float, min_value: float, max_value: float) -> float:
-        return max(min_value, min(max_value, value))
-
-    frames_minus_one = max(1, frame_count - 1)
+    params = motion_parameters(frame_count, scene_index, overlay_options)
+    frames_minus_one = params["frames_minus_one"]
+    motion_speed = params["motion_speed"]
+    zoom_gain = params["zoom_gain"]
+    focus_x = params["focus_x"]
+    focus_y = params["focus_y"]
+    start_fx = params["start_fx"]
+    end_fx = params["end_fx"]
+    start_fy = params["start_fy"]
+    end_fy = params["end_fy"]
     t_expr = f"(on/{frames_minus_one})"
-    raw_motion_speed = _clamp(_safe_float(options.get("motionSpeedPercent"), 135.0), 60.0, 220.0) / 100.0
-    motion_speed = 1.0 + (raw_motion_speed - 1.0) * 0.68
     progress_expr = f"clip({t_expr}*{motion_speed:.2f},0,1)"
     ease_expr = (
         f"({progress_expr}*{progress_expr}*{progress_expr}"
         f"*({progress_expr}*({progress_expr}*6-15)+10))"
     )
-    try:
-        configured_zoom = float(options.get("focusZoomPercent"))
-    except (TypeError, ValueError):
-        configured_zoom = 9.0
-    zoom_gain = max(0.03, min(0.2, configured_zoom / 100.0))
-
-    focus_x = _clamp(_safe_float(options.get("focusXPercent"), 50.0), 0.0, 100.0) / 100.0
-    focus_y = _clamp(_safe_float(options.get("focusYPercent"), 50.0), 0.0, 100.0) / 100.0
-    drift = _clamp(_safe_float(options.get("focusDriftPercent"), 6.0), 0.0, 20.0) / 100.0
-    drift_x = drift
-    drift_y = drift * 0.64
-    direction_x = -1.0 if scene_index % 2 else 1.0
-    direction_y = -1.0 if scene_index % 3 else 1.0
-    start_fx = _clamp(focus_x - (drift_x * direction_x), 0.06, 0.94)
-    end_fx = _clamp(focus_x + (drift_x * direction_x), 0.06, 0.94)
-    start_fy = _clamp(focus_y - (drift_y * direction_y), 0.06, 0.94)
-    end_fy = _clamp(focus_y + (drift_y * direction_y), 0.06, 0.94)
 
     zoom_expr = f"'1+({zoom_gain:.4f})*{ease_expr}'"
     focus_zoom_expr = f"'{1.0 + zoom_gain:.4f}'"
@@ -498,9 +336,9 @@ def _zoompan_motion_filter(
     y_ud_expr = f"'clip(ih*({start_fy:.4f}+({end_fy - start_fy:.4f})*{ease_expr})-(ih/zoom/2),0,ih-ih/zoom)'"
     x_center_focus_expr = f"'clip(iw*{focus_x:.4f}-(iw/zoom/2),0,iw-iw/zoom)'"
     y_center_focus_expr = f"'clip(ih*{focus_y:.4f}-(ih/zoom/2),0,ih-ih/zoom)'"
-    oversample_scale = 2.4 if fps >= 60 else 2.0
-    motion_w = _even(int(round(out_w * oversample_scale)))
-    motion_h = _even(int(round(out_h * oversample_scale)))
+    oversample_scale = oversample if oversample else (2.4 if fps >= 60 else 2.0)
+    motion_w = even_dimension(int(round(out_w * oversample_scale)))
+    motion_h = even_dimension(int(round(out_h * oversample_scale)))
     zoompan_tail = (
         f":d={frame_count}:s={motion_w}x{motion_h}:fps={fps},"
         f"scale={out_w}:{out_h}:flags=lanczos"
@@ -551,21 +389,9 @@ def _escape_drawtext_value(value: str) -> str:
     return escaped
 
 
-def _escape_filter_path(path_text: str) -> str:
-    safe_path = path_text.replace("\\", "/")
-    if len(safe_path) >= 2 and safe_path[1] == ":":
-        safe_path = f"{safe_path[0]}\\:{safe_path[2:]}"
-    safe_path = safe_path.replace("'", "\\'")
-    return safe_path
-
-
 def _font_exists(path_text: str) -> bool:
-    if not path_text:
-        return False
-    try:
-        return Path(path_text).exists()
-    except OSError:
-        return False
+    # Answered from the startup font index instead of probing the filesystem per call.
+    return font_index.has_file(path_text)
 
 
 def _first_existing_font(candidates: list[str]) -> str:
@@ -770,10 +596,8 @@ def _resolve_devanagari_font_file() -> str:
     so prefer `fontfile=` when possible.
     """
     configured = str(os.getenv("DEVANAGARI_FONT_FILE") or "").strip()
-    if configured:
-        configured_path = Path(configured)
-        if configured_path.exists():
-            return str(configured_path)
+    if configured and _font_exists(configured):
+        return str(Path(configured))
 
     windir = os.getenv("WINDIR", "C:/Windows").strip() or "C:/Windows"
     windows_candidates = [
@@ -799,19 +623,12 @@ def _resolve_devanagari_font_file() -> str:
         "/usr/share/fonts/noto/NotoSansDevanagari*.ttf",
     ]
 
-    for candidate in [*windows_candidates, *linux_candidates]:
-        try:
-            if candidate.exists():
-                return str(candidate)
-        except OSError:
-            continue
+    matched = _first_existing_font([str(item) for item in [*windows_candidates, *linux_candidates]])
+    if matched:
+        return matched
     for pattern in linux_globs:
-        try:
-            for matched in Path("/").glob(pattern.lstrip("/")):
-                if matched.exists():
-                    return str(matched)
-        except OSError:
-            continue
+        for indexed in font_index.glob(pattern):
+            return indexed
     return ""
 
 
@@ -893,9 +710,30 @@ def _resolve_font_file_for_text(
     requested_font_name: str,
     prefer_bold: bool = False,
 ) -> str:
-    alias = _normalize_font_alias(requested_font_name)
-    script_hint = _detect_text_script(text)
+    # Resolution depends only on (script, family alias, weight); the memo is keyed by
+    # index generation so a font rebuild invalidates it (stale generations age out).
+    return _resolve_font_file_memo(
+        font_index.generation,
+        _detect_text_script(text),
+        _normalize_font_alias(requested_font_name),
+        bool(prefer_bold),
+    )
 
+
+@lru_cache(maxsize=256)
+def _resolve_font_file_memo(generation: int, script_hint: str, alias: str, prefer_bold: bool) -> str:
+    resolved = _resolve_font_file_uncached(script_hint, alias, prefer_bold)
+    if not resolved and script_hint != "latin":
+        # Nothing on the known candidate lists; use any indexed font covering the script.
+        resolved = font_index.best_file_for_script(script_hint, prefer_bold)
+    return resolved
+
+
+def _resolve_font_file_uncached(
+    script_hint: str,
+    alias: str,
+    prefer_bold: bool = False,
+) -> str:
     # Script-based fallback first to avoid broken glyphs when requested family
     # does not support the script (e.g. Pretendard + Devanagari).
     if script_hint == "devanagari":
@@ -995,12 +833,106 @@ def _wrap_text_by_visual_width(text: str, max_units: float) -> list[str]:
     return wrapped_lines or [text]
 
 
-def _build_title_template_filter(
-    template: dict[str, Any],
-) -> list[str]:
+def _scale_px(value: int, scale: float) -> int:
+    if scale == 1.0 or value == 0:
+        return value
+    scaled = int(round(value * scale))
+    if scaled == 0:
+        return 1 if value > 0 else -1
+    return scaled
+
+
+def _template_text(template: dict[str, Any]) -> str:
     text = str(template.get("text") or "").strip()
     text = text.replace("\r\n", "\n").replace("\r", "\n")
     text = text.replace("\\r\\n", "\n").replace("\\n", "\n")
+    return text
+
+
+def _resolve_template_font(
+    text: str,
+    font_name: str,
+    font_bold: bool,
+    font_file: str,
+) -> tuple[str, str]:
+    """Return (font file, family name) drawtext should use for a template layer."""
+    # Prefer deterministic fontfile resolution in server environments.
+    if not font_file:
+        resolved_font_file = _resolve_font_file_for_text(
+            text=text,
+            requested_font_name=font_name,
+            prefer_bold=font_bold,
+        )
+        if resolved_font_file:
+            font_file = resolved_font_file
+        else:
+            # Safety net: if script-specific font file is not resolved, at least
+            # force a script-capable family name instead of user-selected Latin/KR-only fonts.
+            fallback_family = _fallback_font_family_for_text(text)
+            if fallback_family:
+                font_name = fallback_family
+    return font_file, font_name
+
+
+def _wrap_title_text(
+    text: str,
+    fontsize: int,
+    width_pct: float,
+    font_file: str,
+) -> tuple[list[str], str]:
+    """
+    Wrap a title to its template width in the 1080px design space.
+    Uses the font file's real glyph advances when it can be loaded ("glyph"), else the
+    per-character visual-unit heuristic ("heuristic").
+    """
+    # Keep coefficients aligned with web/lib/template-text-wrap.ts so editor preview
+    # and engine output line-break at the same point as closely as possible.
+    width_px = 1080 * (width_pct / 100.0)
+    effective_width_px = width_px * 0.94
+    if font_file:
+        glyph_lines = wrap_text_to_width(text, font_file, fontsize, effective_width_px)
+        if glyph_lines is not None:
+            return glyph_lines, "glyph"
+    wrap_multiplier = _text_wrap_safety_multiplier(text)
+    unit_px = max(4.0, fontsize * 0.54 * wrap_multiplier)
+    max_units = max(6.0, min(220.0, effective_width_px / unit_px))
+    return _wrap_text_by_visual_width(text, max_units), "heuristic"
+
+
+def layout_title_template(template: dict[str, Any]) -> dict[str, Any]:
+    """Line breaks and resolved font for one template, exactly as the renderer will draw it."""
+    text = _template_text(template)
+    fontsize = int(template.get("fontSize") or 48)
+    width_pct = max(10.0, min(100.0, float(template.get("width", 60.0))))
+    font_file, font_name = _resolve_template_font(
+        text,
+        str(template.get("fontName") or "").strip(),
+        _safe_bool(template.get("fontBold")),
+        str(template.get("fontFile") or "").strip(),
+    )
+    lines, engine = _wrap_title_text(text, fontsize, width_pct, font_file) if text else ([], "heuristic")
+    line_widths: list[float] = []
+    if engine == "glyph":
+        line_widths = [round(measure_text(line, font_file, fontsize), 2) for line in lines]
+    line_gap = max(2, int(round(fontsize * 0.18)))
+    return {
+        "id": str(template.get("id") or ""),
+        "lines": lines,
+        "lineWidthsPx": line_widths,
+        "maxWidthPx": round(1080 * (width_pct / 100.0) * 0.94, 2),
+        "fontSize": fontsize,
+        "lineHeightPx": fontsize + line_gap,
+        "fontFile": font_file,
+        "fontName": font_name,
+        "engine": engine,
+    }
+
+
+def _build_title_template_filter(
+    template: dict[str, Any],
+    scale: float = 1.0,
+) -> list[str]:
+    text = _template_text(template)
     if not text:
         return []
 
@@ -1023,19 +955,19 @@ def _build_title_template_filter(
     background_opacity = max(0.0, min(1.0, background_opacity))
     padding_x = int(template.get("paddingX") or 8)
     padding_y = int(template.get("paddingY") or 4)
-    padding_x = max(0, min(80, padding_x))
-    padding_y = max(0, min(80, padding_y))
+    padding_x = _scale_px(max(0, min(80, padding_x)), scale)
+    padding_y = _scale_px(max(0, min(80, padding_y)), scale)
     shadow_x = int(template.get("shadowX") or 2)
     shadow_y = int(template.get("shadowY") or 2)
-    shadow_x = max(-20, min(20, shadow_x))
-    shadow_y = max(-20, min(20, shadow_y))
+    shadow_x = _scale_px(max(-20, min(20, shadow_x)), scale)
+    shadow_y = _scale_px(max(-20, min(20, shadow_y)), scale)
     shadow_color_raw = str(template.get("shadowColor") or "#000000").strip()
     shadow_color = shadow_color_raw if shadow_color_raw.startswith("#") else "#000000"
     shadow_opacity = float(template.get("shadowOpacity") or 1.0)
     shadow_opacity = max(0.0, min(1.0, shadow_opacity))
     shadow_color_expr = f"{shadow_color}@{shadow_opacity:.2f}"
     font_thickness = int(template.get("fontThickness") or 0)
-    font_thickness = max(0, min(10, font_thickness))
+    font_thickness = _scale_px(max(0, min(10, font_thickness)), scale)
     thickness_expr = (
         f"borderw={font_thickness}:bordercolor={color}:"
         if font_thickness > 0
@@ -1044,39 +976,22 @@ def _build_title_template_filter(
     font_name = str(template.get("fontName") or "").strip()
     font_bold = _safe_bool(template.get("fontBold"))
     font_italic = _safe_bool(template.get("fontItalic"))
-    font_file = str(template.get("fontFile") or "").strip()
-
-    # Prefer deterministic fontfile resolution in server environments.
-    if not font_file:
-        resolved_font_file = _resolve_font_file_for_text(
-            text=text,
-            requested_font_name=font_name,
-            prefer_bold=font_bold,
-        )
-        if resolved_font_file:
-            font_file = resolved_font_file
-        else:
-            # Safety net: if script-specific font file is not resolved, at least
-            # force a script-capable family name instead of user-selected Latin/KR-only fonts.
-            fallback_family = _fallback_font_family_for_text(text)
-            if fallback_family:
-                font_name = fallback_family
-
-    # Approximate wrapping by template width.
-    # Keep coefficients aligned with web/lib/template-text-wrap.ts so editor preview
-    # and engine output line-break at the same point as closely as possible.
-    width_px = 1080 * (width_pct / 100.0)
-    effective_width_px = width_px * 0.94
-    wrap_multiplier = _text_wrap_safety_multiplier(text)
-    unit_px = max(4.0, fontsize * 0.54 * wrap_multiplier)
-    max_units = max(6.0, min(220.0, effective_width_px / unit_px))
-    wrapped_lines = _wrap_text_by_visual_width(text, max_units)
+    font_file, font_name = _resolve_template_font(
+        text,
+        font_name,
+        font_bold,
+        str(template.get("fontFile") or "").strip(),
+    )
+    wrapped_lines, _ = _wrap_title_text(text, fontsize, width_pct, font_file)
     if not wrapped_lines:
         return []
+    # Wrapping above stays in the 1080px design space so scaled-down profile
+    # renders break lines exactly like the full-size render.
+    fontsize = max(1, _scale_px(fontsize, scale))
 
     font_expr = ""
     if font_file:
-        font_expr = f"fontfile='{_escape_filter_path(font_file)}':"
+        font_expr = f"fontfile='{escape_filter_path(font_file)}':"
     elif font_name:
         font_pattern = font_name
         style_tokens: list[str] = []
@@ -1124,6 +1039,7 @@ def _build_title_template_filter(
 def _drawtext_filter_values(
     overlay_options: dict[str, Any] | None,
     fallback_title: str,
+    scale: float = 1.0,
 ) -> list[str]:
     options = overlay_options or {}
     filters: list[str] = []
@@ -1135,7 +1051,7 @@ def _drawtext_filter_values(
             if not isinstance(raw, dict):
                 continue
             has_template_layer = True
-            template_filters = _build_title_template_filter(raw)
+            template_filters = _build_title_template_filter(raw, scale=scale)
             if template_filters:
                 filters.extend(template_filters)
         if has_template_layer:
@@ -1165,126 +1081,159 @@ def _drawtext_filter_values(
                 "fontItalic": _safe_bool(options.get("titleFontItalic")),
                 "fontFile": str(options.get("titleFontFile") or "").strip(),
             }
-            filters.extend(_build_title_template_filter(legacy_template))
+            filters.extend(_build_title_template_filter(legacy_template, scale=scale))
 
     return filters
 
 
-def render_short_video(
-    image_paths: list[Path],
-    tts_path: Path,
-    subtitle_path: Path | None,
-    output_dir: Path,
-    use_sfx: bool,
-    target_duration_sec: float | None,
-    subtitle_options: dict[str, Any] | None = None,
-    overlay_options: dict[str, Any] | None = None,
-    title_text: str = "",
-) -> tuple[Path, list[str]]:
-    """
-    Render a 9:16 short with configurable image motion + narration + subtitles + optional SFX.
-
-    Example command this function emits per image:
-    ffmpeg -y -loop 1 -t 6 -i image.png -vf
-    "scale=1080:1920:force_original_aspect_ratio=increase,crop=1080:1920,
-    zoompan=z='min(zoom+0.0015,1.15)':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':
-    d=1:s=1080x1920:fps={outputFps},setsar=1" -r {outputFps} -pix_fmt yuv420p segment.mp4
-    """
-    output_dir.mkdir(parents=True, exist_ok=True)
-    commands: list[str] = []
-    ffmpeg_log_path = output_dir / "ffmpeg.log"
-    _append_ffmpeg_log(
-        ffmpeg_log_path,
-        (
-            "Render start "
-            f"images={len(image_paths)} use_sfx={use_sfx} "
-            f"target_duration_sec={target_duration_sec}"
-        ),
+RENDER_MODES = {"segments", "single_pass"}
+
+
+def _resolve_render_mode(value: Any) -> str:
+    raw = str(value or "segments").strip().lower()
+    return raw if raw in RENDER_MODES else "segments"
+
+
+MOTION_ENGINES = {"zoompan", "numpy"}
+
+
+def _resolve_motion_engine(value: Any) -> str:
+    raw = str(value or "zoompan").strip().lower()
+    return raw if raw in MOTION_ENGINES else "zoompan"
+
+
+# Named quality/speed trade-offs. "final" keeps the original hard-coded settings
+# (segments veryfast/CRF 16, merge medium/CRF 18, oversample 2.0/2.4).
+RENDER_PROFILES: dict[str, dict[str, Any]] = {
+    "draft": {
+        "scale": 0.5,
+        "oversample": 1.0,
+        "maxFps": 24,
+        "segmentPreset": "ultrafast",
+        "segmentCrf": 30,
+        "finalPreset": "ultrafast",
+        "finalCrf": 30,
+        "tune": "fastdecode",
+        "audioBitrate": "96k",
+    },
+    "preview": {
+        "scale": 2.0 / 3.0,
+        "oversample": 1.5,
+        "maxFps": 30,
+        "segmentPreset": "veryfast",
+        "segmentCrf": 22,
+        "finalPreset": "veryfast",
+        "finalCrf": 23,
+        "tune": None,
+        "audioBitrate": "128k",
+    },
+    "final": {
+        "scale": 1.0,
+        "oversample": None,
+        "maxFps": None,
+        "segmentPreset": "veryfast",
+        "segmentCrf": 16,
+        "finalPreset": "medium",
+        "finalCrf": 18,
+        "tune": None,
+        "audioBitrate": None,
+    },
+}
+
+
+def _resolve_render_profile(value: Any) -> tuple[str, dict[str, Any]]:
+    raw = str(value or "final").strip().lower()
+    name = raw if raw in RENDER_PROFILES else "final"
+    return name, RENDER_PROFILES[name]
+
+
+def _scale_dimensions(out_w: int, out_h: int, scale: float) -> tuple[int, int]:
+    if scale == 1.0:
+        return out_w, out_h
+    return (
+        max(2, even_dimension(int(round(out_w * scale)))),
+        max(2, even_dimension(int(round(out_h * scale)))),
     )
 
-    audio_duration = probe_audio_duration(tts_path)
-    if target_duration_sec is not None:
-        audio_duration = float(target_duration_sec)
 
-    fps = _resolve_output_fps(overlay_options)
-    image_count = len(image_paths)
-    total_frames = max(image_count, int(math.ceil(audio_duration * fps)))
-    base_frames = total_frames // image_count
-    extra_frames = total_frames % image_count
+def _x264_args(preset: str, crf: int, tune: str | None = None) -> list[str]:
+    args = ["-c:v", "libx264", "-preset", preset, "-crf", str(crf)]
+    if tune:
+        args.extend(["-tune", tune])
+    return args
 
-    segments: list[Path] = []
-    out_w, out_h = _resolve_output_dimensions(overlay_options)
-    video_layout = _resolve_video_layout(overlay_options)
-    panel_w, panel_h, panel_left, panel_top = _panel_geometry(overlay_options, out_w, out_h)
-    for idx, image_path in enumerate(image_paths, start=1):
-        frame_count = base_frames + (1 if idx <= extra_frames else 0)
-        segment_path = output_dir / f"segment-{idx}.mp4"
-        motion_preset = _resolve_scene_motion_preset(overlay_options, idx)
-        if video_layout == "panel_16_9":
-            motion_filter = _zoompan_motion_filter(
-                motion_preset,
-                frame_count,
-                fps,
-                scene_index=idx,
-                overlay_options=overlay_options,
-                out_w=panel_w,
-                out_h=panel_h,
-            )
-            vf = (
-                f"scale={panel_w}:{panel_h}:force_original_aspect_ratio=increase,"
-                f"crop={panel_w}:{panel_h},"
-                f"{motion_filter},"
-                f"pad={out_w}:{out_h}:{panel_left}:{panel_top}:color=black,"
-                "setsar=1"
-            )
-        else:
-            motion_filter = _zoompan_motion_filter(
-                motion_preset,
-                frame_count,
-                fps,
-                scene_index=idx,
-                overlay_options=overlay_options,
-                out_w=out_w,
-                out_h=out_h,
-            )
-            vf = (
-                f"scale={out_w}:{out_h}:force_original_aspect_ratio=increase,"
-                f"crop={out_w}:{out_h},"
-                f"{motion_filter},"
-                "setsar=1"
-            )
-        command = [
-            FFMPEG_BIN,
-            "-y",
-            "-i",
-            str(image_path),
-            "-vf",
-            vf,
-            "-c:v",
-            "libx264",
-            "-preset",
-            "veryfast",
-            "-crf",
-            "16",
-            "-frames:v",
-            str(frame_count),
-            "-r",
-            str(fps),
-            "-pix_fmt",
-            "yuv420p",
-            str(segment_path),
-        ]
-        run_cmd(command, log_path=ffmpeg_log_path, label=f"segment-{idx}")
-        commands.append(_to_ffmpeg_command_string(command))
-        segments.append(segment_path)
 
-    concat_file = output_dir / "concat.txt"
-    concat_file.write_text(
-        "\n".join(f"file '{segment.as_posix()}'" for segment in segments),
-        encoding="utf-8",
+def _scene_video_filter(
+    scene_index: int,
+    frame_count: int,
+    fps: int,
+    overlay_options: dict[str, Any] | None,
+    out_w: int,
+    out_h: int,
+    oversample: float | None = None,
+) -> str:
+    motion_preset = resolve_scene_motion_preset(overlay_options, scene_index)
+    if resolve_video_layout(overlay_options) == "panel_16_9":
+        panel_w, panel_h, panel_left, panel_top = panel_geometry(overlay_options, out_w, out_h)
+        motion_filter = _zoompan_motion_filter(
+            motion_preset,
+            frame_count,
+            fps,
+            scene_index=scene_index,
+            overlay_options=overlay_options,
+            out_w=panel_w,
+            out_h=panel_h,
+            oversample=oversample,
+        )
+        return (
+            f"scale={panel_w}:{panel_h}:force_original_aspect_ratio=increase,"
+            f"crop={panel_w}:{panel_h},"
+            f"{motion_filter},"
+            f"pad={out_w}:{out_h}:{panel_left}:{panel_top}:color=black,"
+            "setsar=1"
+        )
+    motion_filter = _zoompan_motion_filter(
+        motion_preset,
+        frame_count,
+        fps,
+        scene_index=scene_index,
+        overlay_options=overlay_options,
+        out_w=out_w,
+        out_h=out_h,
+        oversample=oversample,
+    )
+    return (
+        f"scale={out_w}:{out_h}:force_original_aspect_ratio=increase,"
+        f"crop={out_w}:{out_h},"
+        f"{motion_filter},"
+        "setsar=1"
     )
 
-    final_output = output_dir / "final.mp4"
+
+def _scene_frame_counts(image_count: int, total_frames: int) -> list[int]:
+    base_frames = total_frames // image_count
+    extra_frames = total_frames % image_count
+    return [
+        base_frames + (1 if idx <= extra_frames else 0)
+        for idx in range(1, image_count + 1)
+    ]
+
+
+def _overlay_video_filters(
+    subtitle_path: Path | None,
+    subtitle_options: dict[str, Any] | None,
+    overlay_options: dict[str, Any] | None,
+    title_text: str,
+    text_scale: float = 1.0,
+    raster_size: tuple[int, int] | None = None,
+    work_dir: Path | None = None,
+    log_path: Path | None = None,
+) -> list[str]:
+    """
+    Subtitle + title filters for the composited video. With raster_size/work_dir the
+    static title layers are pre-rasterized into one cached RGBA image and composited
+    with a single overlay instead of evaluating every drawtext filter per frame.
+    """
     subtitle_filter = ""
     if subtitle_path is not None and subtitle_path.exists():
         try:
@@ -1296,101 +1245,987 @@ def render_short_video(
     drawtext_filters = _drawtext_filter_values(
         overlay_options,
         title_text,
+        scale=text_scale,
     )
     filter_chain: list[str] = []
     if subtitle_filter:
         filter_chain.append(subtitle_filter)
+    if drawtext_filters and raster_size is not None and work_dir is not None:
+        if title_overlay.TITLE_OVERLAY_RASTERIZE:
+            overlay_path = title_overlay.rasterize_title_layers(
+                drawtext_filters,
+                raster_size[0],
+                raster_size[1],
+                work_dir,
+                log_path=log_path,
+            )
+            filter_chain.append(title_overlay.title_overlay_filter(overlay_path))
+            return filter_chain
     if drawtext_filters:
         filter_chain.extend(drawtext_filters)
-    video_filters = ",".join(filter_chain)
-
-    sfx_path = _resolve_sfx_path(output_dir) if use_sfx else None
-    should_mix_sfx = use_sfx and sfx_path is not None and sfx_path.exists()
-
-    if should_mix_sfx:
-        final_command = [
-            FFMPEG_BIN,
-            "-y",
-            "-fflags",
-            "+genpts",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(concat_file),
-            "-i",
-            str(tts_path),
-            "-stream_loop",
-            "-1",
-            "-i",
-            str(sfx_path),
-            "-filter_complex",
-            "[1:a]volume=1.0[tts];[2:a]volume=0.13[sfx];"
-            "[tts][sfx]amix=inputs=2:duration=first:dropout_transition=2[aout]",
+    return filter_chain
+
+
+RENDITION_CONTAINERS = {"mp4", "mov", "mkv", "webm"}
+
+
+def _rendition_dimensions(width: Any, height: Any, out_w: int, out_h: int) -> tuple[int, int]:
+    if width and height:
+        return max(2, even_dimension(int(width))), max(2, even_dimension(int(height)))
+    if width:
+        return max(2, even_dimension(int(width))), max(2, even_dimension(int(round(int(width) * out_h / out_w))))
+    if height:
+        return max(2, even_dimension(int(round(int(height) * out_w / out_h)))), max(2, even_dimension(int(height)))
+    return out_w, out_h
+
+
+def _resolve_renditions(
+    renditions: list[dict[str, Any]] | None,
+    fps: int,
+    out_w: int,
+    out_h: int,
+    output_dir: Path,
+) -> list[dict[str, Any]]:
+    """Normalize RenderOptions.renditions: unique names, known container, fps no higher than the main output."""
+    resolved: list[dict[str, Any]] = []
+    used_names: set[str] = set()
+    for rendition in renditions or []:
+        base_name = re.sub(r"[^A-Za-z0-9_-]", "-", _safe_strip(rendition.get("name"))) or f"r{len(resolved) + 1}"
+        name = base_name
+        suffix = 2
+        while name in used_names:
+            name = f"{base_name}-{suffix}"
+            suffix += 1
+        used_names.add(name)
+        container = _safe_strip(rendition.get("container")).lower() or "mp4"
+        if container not in RENDITION_CONTAINERS:
+            container = "mp4"
+        width, height = _rendition_dimensions(rendition.get("width"), rendition.get("height"), out_w, out_h)
+        resolved.append(
+            {
+                "name": name,
+                "container": container,
+                "width": width,
+                "height": height,
+                "fps": max(1, min(fps, int(rendition.get("fps") or fps))),
+                "crf": rendition.get("crf"),
+                "videoBitrateKbps": rendition.get("videoBitrateKbps"),
+                "audioBitrateKbps": rendition.get("audioBitrateKbps"),
+                "path": output_dir / f"rendition-{name}.{container}",
+            }
+        )
+    return resolved
+
+
+def _rendition_filter_parts(
+    renditions: list[dict[str, Any]],
+    fps: int,
+    video_chain: str,
+) -> tuple[list[str], str, list[str]]:
+    """
+    Fan the finished video chain out with split: one branch is the main output, the
+    others are scaled (center-cropped when the aspect differs) and fps-reduced per
+    rendition, so decode, motion and overlays run once for every output.
+    Returns (graph parts, main video label, rendition video labels).
+    """
+    count = len(renditions) + 1
+    parts = [f"{video_chain},split={count}[vmain]" + "".join(f"[rv{idx}]" for idx in range(1, count))]
+    video_labels: list[str] = []
+    for idx, rendition in enumerate(renditions, start=1):
+        width, height = rendition["width"], rendition["height"]
+        chain = [
+            f"scale={width}:{height}:force_original_aspect_ratio=increase:flags=lanczos",
+            f"crop={width}:{height}",
+            "setsar=1",
         ]
-        if video_filters:
-            final_command.extend(["-vf", video_filters])
-        final_command.extend([
-            "-map",
-            "0:v",
-            "-map",
-            "[aout]",
+        if rendition["fps"] != fps:
+            chain.append(f"fps={rendition['fps']}")
+        parts.append(f"[rv{idx}]{','.join(chain)}[rv{idx}out]")
+        video_labels.append(f"[rv{idx}out]")
+    return parts, "[vmain]", video_labels
+
+
+def _rendition_output_args(
+    rendition: dict[str, Any],
+    video_label: str,
+    audio_map: str,
+    profile: dict[str, Any],
+) -> list[str]:
+    """Codec arguments for one rendition (H.264/AAC, or VP9/Opus for webm); CRF capped by the bitrate when both are set."""
+    crf = rendition["crf"]
+    video_kbps = rendition["videoBitrateKbps"]
+    audio_kbps = rendition["audioBitrateKbps"]
+    args = ["-map", video_label, "-map", audio_map]
+    if rendition["container"] == "webm":
+        args.extend([
             "-c:v",
-            "libx264",
-            "-preset",
-            "medium",
+            "libvpx-vp9",
+            "-deadline",
+            "good",
+            "-cpu-used",
+            "4",
+            "-row-mt",
+            "1",
             "-crf",
-            "18",
-            "-r",
-            str(fps),
+            str(crf if crf is not None else 32),
+            "-b:v",
+            f"{video_kbps}k" if video_kbps else "0",
             "-c:a",
-            "aac",
-            "-shortest",
-            "-movflags",
-            "+faststart",
-            str(final_output),
+            "libopus",
+            "-b:a",
+            f"{audio_kbps or 96}k",
         ])
     else:
-        final_command = [
-            FFMPEG_BIN,
-            "-y",
-            "-fflags",
-            "+genpts",
-            "-f",
-            "concat",
-            "-safe",
-            "0",
-            "-i",
-            str(concat_file),
-            "-i",
-            str(tts_path),
-        ]
-        if video_filters:
-            final_command.extend(["-vf", video_filters])
-        final_command.extend([
-            "-map",
-            "0:v",
-            "-map",
-            "1:a",
-            "-c:v",
-            "libx264",
-            "-preset",
-            "medium",
-            "-crf",
-            "18",
+        args.extend(
+            _x264_args(
+                profile["finalPreset"],
+                crf if crf is not None else profile["finalCrf"],
+                profile["tune"],
+            )
+        )
+        if video_kbps:
+            args.extend(["-maxrate", f"{video_kbps}k", "-bufsize", f"{video_kbps * 2}k"])
+        args.extend(aac_args(f"{audio_kbps}k" if audio_kbps else profile["audioBitrate"]))
+    args.extend(["-r", str(rendition["fps"]), "-pix_fmt", "yuv420p", "-threads", THREAD_BUDGET])
+    if rendition["container"] in {"mp4", "mov"}:
+        args.extend(["-movflags", "+faststart"])
+    return args
+
+
+def _build_segment_merge_command(
+    concat_file: Path,
+    audio_path: Path,
+    video_filters: str,
+    fps: int,
+    final_output: Path,
+    total_frames: int,
+    profile: dict[str, Any] | None = None,
+    renditions: list[dict[str, Any]] | None = None,
+) -> list[str]:
+    """
+    Final merge of the concatenated segments (or motion track) with the overlays.
+
+    The video is bounded by frame count, not -shortest: the copied audio packets
+    reach the muxer long before x264 flushes its lookahead, so -shortest would end
+    the file early and drop the tail of the last scene.
+    """
+    profile = profile or RENDER_PROFILES["final"]
+    command = [
+        FFMPEG_BIN,
+        "-y",
+        "-fflags",
+        "+genpts",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(concat_file),
+        "-i",
+        str(audio_path),
+    ]
+    audio_map = "1:a"
+    video_map = "0:v"
+    rendition_maps: list[tuple[str, str]] = []
+    if renditions:
+        split_parts, video_map, rendition_videos = _rendition_filter_parts(
+            renditions,
+            fps,
+            f"[0:v]{video_filters or 'null'}",
+        )
+        command.extend(["-filter_complex", ";".join(split_parts)])
+        rendition_maps = [(label, audio_map) for label in rendition_videos]
+    elif video_filters:
+        command.extend(["-vf", video_filters])
+    command.extend([
+        "-map",
+        video_map,
+        "-map",
+        audio_map,
+        *_x264_args(profile["finalPreset"], profile["finalCrf"], profile["tune"]),
+        "-r",
+        str(fps),
+        "-frames:v",
+        str(total_frames),
+        # The audio stage already produced the final AAC track, cut to the video.
+        "-c:a",
+        "copy",
+        "-movflags",
+        "+faststart",
+        # With renditions every output gets its own -threads (see with_thread_budget).
+        *(["-threads", THREAD_BUDGET] if renditions else []),
+        str(final_output),
+    ])
+    for rendition, (rendition_video, rendition_audio) in zip(renditions or [], rendition_maps):
+        command.extend([
+            *_rendition_output_args(rendition, rendition_video, rendition_audio, profile),
+            "-t",
+            f"{total_frames / fps:.6f}",
+            str(rendition["path"]),
+        ])
+    return command
+
+
+def _build_single_pass_command(
+    image_paths: list[Path],
+    frame_counts: list[int],
+    audio_path: Path,
+    overlay_options: dict[str, Any] | None,
+    video_filters: str,
+    fps: int,
+    out_w: int,
+    out_h: int,
+    final_output: Path,
+    profile: dict[str, Any] | None = None,
+    renditions: list[dict[str, Any]] | None = None,
+) -> list[str]:
+    """
+    Build one ffmpeg command that renders every scene and overlay in a single filter
+    graph, so the video is encoded exactly once; the audio stage's track is copied.
+
+    Each image is a single-frame input: zoompan already expands one frame into
+    `d=frame_count` frames, the same way the per-segment encode does.
+    Scene lengths are pinned with trim inside the graph; -shortest/-frames:v are
+    left out because they cut the narration down to its first packet once the
+    single-frame image inputs hit EOF.
+    """
+    profile = profile or RENDER_PROFILES["final"]
+    command = [FFMPEG_BIN, "-y"]
+    for image_path in image_paths:
+        command.extend(["-i", str(image_path)])
+    command.extend(["-i", str(audio_path)])
+    audio_map = f"{len(image_paths)}:a"
+
+    graph_parts: list[str] = []
+    scene_labels: list[str] = []
+    for idx, frame_count in enumerate(frame_counts, start=1):
+        scene_filter = _scene_video_filter(
+            idx, frame_count, fps, overlay_options, out_w, out_h, oversample=profile["oversample"]
+        )
+        label = f"[scene{idx}]"
+        graph_parts.append(
+            f"[{idx - 1}:v]{scene_filter},trim=end_frame={frame_count},setpts=PTS-STARTPTS{label}"
+        )
+        scene_labels.append(label)
+    video_chain = (
+        f"{''.join(scene_labels)}concat=n={len(scene_labels)}:v=1:a=0,format=yuv420p"
+        f"{',' + video_filters if video_filters else ''}"
+    )
+    video_map = "[vout]"
+    rendition_maps: list[tuple[str, str]] = []
+    if renditions:
+        split_parts, video_map, rendition_videos = _rendition_filter_parts(
+            renditions,
+            fps,
+            video_chain,
+        )
+        graph_parts.extend(split_parts)
+        rendition_maps = [(label, audio_map) for label in rendition_videos]
+    else:
+        graph_parts.append(f"{video_chain}[vout]")
+
+    command.extend([
+        "-filter_complex",
+        ";".join(graph_parts),
+        "-map",
+        video_map,
+        "-map",
+        audio_map,
+        *_x264_args(profile["finalPreset"], profile["finalCrf"], profile["tune"]),
+        "-r",
+        str(fps),
+        "-pix_fmt",
+        "yuv420p",
+        "-c:a",
+        "copy",
+        "-movflags",
+        "+faststart",
+        *(["-threads", THREAD_BUDGET] if renditions else []),
+        str(final_output),
+    ])
+    for rendition, (rendition_video, rendition_audio) in zip(renditions or [], rendition_maps):
+        command.extend([
+            *_rendition_output_args(rendition, rendition_video, rendition_audio, profile),
+            str(rendition["path"]),
+        ])
+    return command
+
+
+def _render_scene_segments(
+    image_paths: list[Path],
+    frame_counts: list[int],
+    fps: int,
+    overlay_options: dict[str, Any] | None,
+    out_w: int,
+    out_h: int,
+    output_dir: Path,
+    log_path: Path,
+    profile: dict[str, Any] | None = None,
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+) -> tuple[list[Path], list[str], list[dict[str, Any]], dict[str, int]]:
+    """
+    Produce segment-N.mp4 for every scene, encoding only scenes whose key is new.
+
+    Scenes with the same image content and encode arguments are rendered once per job
+    and linked into place; scenes already in the segment cache are linked without
+    running ffmpeg at all.
+    """
+    profile = profile or RENDER_PROFILES["final"]
+    segments: list[Path] = []
+    commands: list[str] = []
+    owner_by_key: dict[str, Path] = {}
+    duplicates: list[tuple[Path, Path]] = []
+    to_render: list[tuple[str, list[str], str]] = []
+    reused = 0
+    for idx, image_path in enumerate(image_paths, start=1):
+        frame_count = frame_counts[idx - 1]
+        segment_path = output_dir / f"segment-{idx}.mp4"
+        vf = _scene_video_filter(
+            idx, frame_count, fps, overlay_options, out_w, out_h, oversample=profile["oversample"]
+        )
+        encode_args = [
+            "-vf",
+            vf,
+            *_x264_args(profile["segmentPreset"], profile["segmentCrf"], profile["tune"]),
+            "-frames:v",
+            str(frame_count),
             "-r",
             str(fps),
-            "-c:a",
-            "aac",
-            "-shortest",
-            "-movflags",
-            "+faststart",
-            str(final_output),
-        ])
+            "-pix_fmt",
+            "yuv420p",
+        ]
+        command = [FFMPEG_BIN, "-y", "-i", str(image_path), *encode_args, str(segment_path)]
+        commands.append(to_ffmpeg_command_string(command))
+        segments.append(segment_path)
+
+        key = segment_cache.key_for(image_path, encode_args)
+        if key in owner_by_key:
+            duplicates.append((owner_by_key[key], segment_path))
+            reused += 1
+            append_ffmpeg_log(log_path, f"[segment-{idx}] REUSE same scene as {owner_by_key[key].name}")
+            continue
+        owner_by_key[key] = segment_path
+        if segment_cache.lookup(key, segment_path):
+            reused += 1
+            append_ffmpeg_log(log_path, f"[segment-{idx}] REUSE cache key={key[:12]}")
+            continue
+        # Never let ffmpeg truncate a file that may be hardlinked into the cache.
+        if segment_path.exists():
+            segment_path.unlink()
+        to_render.append((f"segment-{idx}", command, key))
+        if progress is not None:
+            progress.plan(f"segment-{idx}", frame_count)
+
+    timings = run_parallel_commands(
+        [(label, command) for label, command, _ in to_render],
+        log_path,
+        max_workers=SEGMENT_RENDER_CONCURRENCY,
+        progress=progress,
+        cancel=cancel,
+    )
+    for _, command, key in to_render:
+        segment_cache.store(key, Path(command[-1]))
+    for owner_path, duplicate_path in duplicates:
+        link_or_copy(owner_path, duplicate_path)
+    return segments, commands, timings, {
+        "segmentsReused": reused,
+        "segmentsRendered": len(to_render),
+    }
+
+
+def _plan_final_slices(frame_counts: list[int], fps: int, requested: int) -> list[dict[str, int]]:
+    """
+    Group consecutive scenes into at most `requested` slices of similar length.
+
+    Slices always start on a scene boundary: every segment-N.mp4 opens with an IDR
+    frame, so a slice decodes from its first packet and its encode is independent of
+    the others. Slices shorter than FINAL_SLICE_MIN_SEC are not planned.
+    """
+    total_frames = sum(frame_counts)
+    slice_count = min(
+        max(1, requested),
+        len(frame_counts),
+        max(1, total_frames // max(1, FINAL_SLICE_MIN_SEC * fps)),
+    )
+    slices: list[dict[str, int]] = []
+    first_scene = 0
+    start_frame = 0
+    done_frames = 0
+    for idx, frame_count in enumerate(frame_counts):
+        done_frames += frame_count
+        slices_left = slice_count - len(slices) - 1
+        if slices_left <= 0:
+            break
+        target = total_frames * (len(slices) + 1) / slice_count
+        if done_frames < target:
+            continue
+        # Cut after this scene or before it, whichever boundary lands nearer the target.
+        boundaries = {idx: done_frames - frame_count, idx + 1: done_frames}
+        cuts = [
+            scene for scene in boundaries
+            if scene > first_scene and len(frame_counts) - scene >= slices_left
+        ]
+        if not cuts:
+            continue
+        cut = min(cuts, key=lambda scene: abs(boundaries[scene] - target))
+        slices.append(
+            {
+                "firstScene": first_scene,
+                "sceneCount": cut - first_scene,
+                "startFrame": start_frame,
+                "frames": boundaries[cut] - start_frame,
+            }
+        )
+        first_scene = cut
+        start_frame = boundaries[cut]
+    slices.append(
+        {
+            "firstScene": first_scene,
+            "sceneCount": len(frame_counts) - first_scene,
+            "startFrame": start_frame,
+            "frames": total_frames - start_frame,
+        }
+    )
+    return slices
+
+
+def _build_final_slice_command(
+    input_args: list[str],
+    start_frame: int,
+    frame_count: int,
+    video_filters: str,
+    fps: int,
+    slice_output: Path,
+    profile: dict[str, Any] | None = None,
+) -> list[str]:
+    """
+    Video-only encode of one time slice with the overlay filters applied.
+    Frames are re-stamped to their global time before the subtitle filter (libass
+    picks cues by frame timestamp) and back to zero afterwards for the concat join.
+    """
+    profile = profile or RENDER_PROFILES["final"]
+    slice_filters = [f"setpts=PTS-STARTPTS+{start_frame / fps:.6f}/TB"]
+    if video_filters:
+        slice_filters.append(video_filters)
+    slice_filters.append("setpts=PTS-STARTPTS")
+    return [
+        FFMPEG_BIN,
+        "-y",
+        *input_args,
+        "-vf",
+        ",".join(slice_filters),
+        "-map",
+        "0:v",
+        *_x264_args(profile["finalPreset"], profile["finalCrf"], profile["tune"]),
+        "-r",
+        str(fps),
+        "-frames:v",
+        str(frame_count),
+        "-an",
+        str(slice_output),
+    ]
+
+
+def _build_final_mux_command(slice_list: Path, audio_path: Path, final_output: Path) -> list[str]:
+    return [
+        FFMPEG_BIN,
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        str(slice_list),
+        "-i",
+        str(audio_path),
+        "-map",
+        "0:v",
+        "-map",
+        "1:a",
+        "-c",
+        "copy",
+        "-movflags",
+        "+faststart",
+        str(final_output),
+    ]
+
+
+def probe_av_streams(media_path: Path) -> dict[str, float | int | None]:
+    """Video packet count and per-stream durations of a muxed file (None when unknown)."""
+    command = [
+        FFPROBE_BIN,
+        "-v",
+        "error",
+        "-count_packets",
+        "-show_entries",
+        "stream=codec_type,nb_read_packets,duration",
+        "-of",
+        "json",
+        str(media_path),
+    ]
+    summary: dict[str, float | int | None] = {"videoFrames": None, "videoSec": None, "audioSec": None}
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=False,
+            check=False,
+            timeout=FFPROBE_CMD_TIMEOUT_SEC,
+        )
+    except subprocess.TimeoutExpired:
+        return summary
+    if completed.returncode != 0:
+        return summary
+    try:
+        streams = json.loads(decode_output(completed.stdout) or "{}").get("streams", [])
+    except ValueError:
+        return summary
+    for stream in streams:
+        try:
+            duration = float(stream.get("duration"))
+        except (TypeError, ValueError):
+            duration = None
+        if stream.get("codec_type") == "video" and summary["videoFrames"] is None:
+            try:
+                summary["videoFrames"] = int(stream.get("nb_read_packets"))
+            except (TypeError, ValueError):
+                pass
+            summary["videoSec"] = duration
+        elif stream.get("codec_type") == "audio" and summary["audioSec"] is None:
+            summary["audioSec"] = duration
+    return summary
+
+
+def _check_final_av(
+    final_output: Path,
+    total_frames: int,
+    fps: int,
+    narration_sec: float,
+    log_path: Path | None,
+    label: str,
+) -> None:
+    """
+    Fail the render unless final_output carries exactly total_frames video frames
+    and its audio ends within _AV_SYNC_TOLERANCE_SEC of min(narration, video).
+    """
+    summary = probe_av_streams(final_output)
+    if summary["videoFrames"] is not None and summary["videoFrames"] != total_frames:
+        raise RuntimeError(
+            f"Final encode ({label}) wrote {summary['videoFrames']} frames, expected {total_frames}."
+        )
+    if summary["audioSec"] is not None:
+        drift = abs(float(summary["audioSec"]) - min(narration_sec, total_frames / fps))
+        if drift > _AV_SYNC_TOLERANCE_SEC:
+            raise RuntimeError(
+                f"Final encode ({label}) audio drifted {drift:.3f}s from the video timeline."
+            )
+    append_ffmpeg_log(
+        log_path,
+        f"[{label}] CHECK frames={summary['videoFrames']} video={summary['videoSec']} audio={summary['audioSec']}",
+    )
+
+
+def _render_sliced_final(
+    slices: list[dict[str, int]],
+    segments: list[Path],
+    motion_track: bool,
+    audio_path: Path,
+    video_filters: str,
+    fps: int,
+    narration_sec: float,
+    output_dir: Path,
+    final_output: Path,
+    log_path: Path,
+    profile: dict[str, Any] | None = None,
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+) -> tuple[list[str], list[dict[str, Any]]]:
+    """
+    Final merge split into time slices encoded in parallel, then joined losslessly.
+
+    Each slice reads only its own scenes (a per-slice concat list of segment files,
+    or an accurate seek into the NumPy motion track) and applies the subtitle/title
+    filters at its global time offset. The slices are concatenated with stream copy
+    and muxed with the audio stage's track. The
+    result must carry exactly the planned frames, and audio ending within
+    _AV_SYNC_TOLERANCE_SEC of min(narration, video), otherwise the render fails.
+    """
+    profile = profile or RENDER_PROFILES["final"]
+    total_frames = sum(item["frames"] for item in slices)
+    jobs: list[tuple[str, list[str]]] = []
+    slice_paths: list[Path] = []
+    for idx, item in enumerate(slices, start=1):
+        slice_path = output_dir / f"final-slice-{idx}.mp4"
+        if motion_track:
+            input_args = []
+            if item["startFrame"] > 0:
+                # Accurate seek decodes from the preceding keyframe and drops frames
+                # before the target; half a frame early so rounding never skips one.
+                input_args = ["-ss", f"{(item['startFrame'] - 0.5) / fps:.6f}"]
+            input_args.extend(["-i", str(segments[0])])
+        else:
+            slice_list = output_dir / f"final-slice-{idx}.txt"
+            slice_list.write_text(
+                "\n".join(
+                    f"file '{segment.as_posix()}'"
+                    for segment in segments[item["firstScene"] : item["firstScene"] + item["sceneCount"]]
+                ),
+                encoding="utf-8",
+            )
+            input_args = ["-fflags", "+genpts", "-f", "concat", "-safe", "0", "-i", str(slice_list)]
+        jobs.append(
+            (
+                f"final-slice-{idx}",
+                _build_final_slice_command(
+                    input_args,
+                    item["startFrame"],
+                    item["frames"],
+                    video_filters,
+                    fps,
+                    slice_path,
+                    profile=profile,
+                ),
+            )
+        )
+        slice_paths.append(slice_path)
+    append_ffmpeg_log(
+        log_path,
+        "Final slices "
+        + " ".join(f"{idx}:{item['startFrame']}+{item['frames']}" for idx, item in enumerate(slices, start=1)),
+    )
+    timings = run_parallel_commands(
+        jobs,
+        log_path,
+        max_workers=len(jobs),
+        progress=progress,
+        cancel=cancel,
+        stage_name="final-slice",
+    )
+
+    slice_list = output_dir / "final-slices.txt"
+    slice_list.write_text(
+        "\n".join(f"file '{path.as_posix()}'" for path in slice_paths),
+        encoding="utf-8",
+    )
+    mux_command = _build_final_mux_command(slice_list, audio_path, final_output)
+    run_cmd(mux_command, log_path=log_path, label="final-mux", progress=progress, cancel=cancel)
+
+    _check_final_av(final_output, total_frames, fps, narration_sec, log_path, "final-mux")
+    commands = [to_ffmpeg_command_string(command) for _, command in jobs]
+    commands.append(to_ffmpeg_command_string(mux_command))
+    return commands, timings
+
+
+def render_labels(
+    overlay_options: dict[str, Any] | None,
+    image_count: int,
+    profile: str = "final",
+) -> dict[str, str]:
+    """Metric labels describing what drives a render's cost (see app.metrics.RENDER_LABELS)."""
+    _, render_profile = _resolve_render_profile(profile)
+    fps = _resolve_output_fps(overlay_options)
+    if render_profile["maxFps"]:
+        fps = min(fps, int(render_profile["maxFps"]))
+    motion_preset = str((overlay_options or {}).get("sceneMotionPreset") or "gentle_zoom").strip().lower()
+    return {
+        "fps": str(fps),
+        "layout": resolve_video_layout(overlay_options),
+        "motion_preset": motion_preset if motion_preset in SCENE_MOTION_PRESETS else "gentle_zoom",
+        "image_count": str(image_count),
+    }
+
+
+def render_short_video(
+    image_paths: list[Path],
+    tts_path: Path,
+    subtitle_path: Path | None,
+    output_dir: Path,
+    use_sfx: bool,
+    target_duration_sec: float | None,
+    subtitle_options: dict[str, Any] | None = None,
+    overlay_options: dict[str, Any] | None = None,
+    title_text: str = "",
+    render_mode: str = "segments",
+    motion_engine: str = "zoompan",
+    profile: str = "final",
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+    final_slices: int | None = None,
+    sfx_path: Path | None = None,
+    renditions: list[dict[str, Any]] | None = None,
+) -> tuple[Path, list[str], dict[str, Any]]:
+    """
+    Render a 9:16 short with configurable image motion + narration + subtitles + optional SFX.
+
+    Example command this function emits per image:
+    ffmpeg -y -loop 1 -t 6 -i image.png -vf
+    "scale=1080:1920:force_original_aspect_ratio=increase,crop=1080:1920,
+    zoompan=z='min(zoom+0.0015,1.15)':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':
+    d=1:s=1080x1920:fps={outputFps},setsar=1" -r {outputFps} -pix_fmt yuv420p segment.mp4
+
+    Segment encodes run in parallel (SEGMENT_RENDER_CONCURRENCY); the returned stats
+    carry per-segment queue wait and run time.
+
+    render_mode="single_pass" skips the intermediate segment files and renders every
+    scene and overlay in one filter graph (one encode instead of two).
+
+    RGB(A) scene images are first converted once to the motion canvas size in a
+    fast-to-decode format (app.image_prep, cached by source hash + geometry), so
+    segment, single-pass and NumPy renders do not decode the full-size originals;
+    YUV sources such as JPEG are used as-is.
+
+    The narration/SFX mix is a separate audio stage (app.audio_stage) running beside
+    the video stages and cached by content; final outputs copy its AAC track.
+
+    motion_engine="numpy" replaces the per-scene zoompan encodes with one NumPy-driven
+    motion track (app.motion_numpy) that feeds the regular final merge.
+
+    profile picks a RENDER_PROFILES entry: "draft"/"preview" scale the output down,
+    lower the zoompan oversample and fps cap and use faster x264 settings, while
+    title layers keep the full-size line breaks.
+
+    progress, when given, is fed live frame/fps/out_time/speed from every encode
+    (ffmpeg -progress) with each stage planned by the frames it writes.
+    cancel, when given, kills in-flight encodes and raises JobCancelled.
+
+    final_slices (default FINAL_ENCODE_SLICES) > 1 splits the final merge into that
+    many scene-aligned time slices encoded in parallel and joined with stream copy
+    (see _render_sliced_final); single_pass renders ignore it.
+
+    sfx_path, when given, is the SFX bed to use instead of resolving one per job.
+
+    renditions (RenderOptions.renditions) adds outputs to the final ffmpeg run: the
+    composited video is split after the shared graph and re-scaled/encoded per
+    rendition (see _rendition_filter_parts). Renditions turn final slicing off.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    commands: list[str] = []
+    ffmpeg_log_path = output_dir / "ffmpeg.log"
+    render_mode = _resolve_render_mode(render_mode)
+    motion_engine = _resolve_motion_engine(motion_engine)
+    profile_name, render_profile = _resolve_render_profile(profile)
+    if motion_engine == "numpy":
+        # The NumPy track is a separate rawvideo encode, so it always goes through
+        # the concat + final-merge path.
+        render_mode = "segments"
+    append_ffmpeg_log(
+        ffmpeg_log_path,
+        (
+            "Render start "
+            f"images={len(image_paths)} use_sfx={use_sfx} "
+            f"target_duration_sec={target_duration_sec} mode={render_mode} "
+            f"motion_engine={motion_engine} profile={profile_name}"
+        ),
+    )
+
+    # Every input is probed (cached by content) before the first encode, so a bad
+    # asset fails here instead of part-way through the render.
+    inputs = validate_media(
+        [(str(path), path, "image") for path in image_paths] + [(str(tts_path), tts_path, "audio")]
+    )
+    narration_sec = max(1.0, float(inputs[str(tts_path)]["durationSec"]))
+    audio_duration = narration_sec
+    if target_duration_sec is not None:
+        audio_duration = float(target_duration_sec)
+
+    fps = _resolve_output_fps(overlay_options)
+    if render_profile["maxFps"]:
+        fps = min(fps, int(render_profile["maxFps"]))
+    image_count = len(image_paths)
+    total_frames = max(image_count, int(math.ceil(audio_duration * fps)))
+    frame_counts = _scene_frame_counts(image_count, total_frames)
+    out_w, out_h = _scale_dimensions(
+        *_resolve_output_dimensions(overlay_options),
+        float(render_profile["scale"]),
+    )
+
+    rendition_specs = _resolve_renditions(renditions, fps, out_w, out_h, output_dir)
+    slices = (
+        _plan_final_slices(frame_counts, fps, final_slices or FINAL_ENCODE_SLICES)
+        if render_mode == "segments" and not rendition_specs
+        else []
+    )
+    if progress is not None:
+        if motion_engine == "numpy":
+            progress.plan("motion-numpy", total_frames)
+        if len(slices) > 1:
+            for idx, item in enumerate(slices, start=1):
+                progress.plan(f"final-slice-{idx}", item["frames"])
+        else:
+            progress.plan("single-pass" if render_mode == "single_pass" else "final-merge", total_frames)
+
+    final_output = output_dir / "final.mp4"
+    video_filters = ",".join(
+        _overlay_video_filters(
+            subtitle_path,
+            subtitle_options,
+            overlay_options,
+            title_text,
+            text_scale=float(render_profile["scale"]),
+            raster_size=(out_w, out_h),
+            work_dir=output_dir,
+            log_path=ffmpeg_log_path,
+        )
+    )
+    if not use_sfx:
+        sfx_path = None
+    elif sfx_path is None:
+        sfx_path = resolve_sfx_path(ffmpeg_log_path)
+    if sfx_path is not None and not sfx_path.exists():
+        sfx_path = None
+
+    segment_timings: list[dict[str, Any]] = []
+    slice_timings: list[dict[str, Any]] = []
+    segment_reuse = {"segmentsReused": 0, "segmentsRendered": 0}
+    stage_sec: dict[str, float] = {}
+
+    # Audio runs beside the video stages and is ready (often from cache) before the merge.
+    audio_path = output_dir / "audio.m4a"
+    audio_stats: dict[str, Any] = {}
+
+    def _audio_stage() -> None:
+        stage_started = time.monotonic()
+        audio_stats.update(
+            render_audio_track(
+                tts_path,
+                sfx_path,
+                min(narration_sec, total_frames / fps),
+                audio_path,
+                audio_bitrate=render_profile["audioBitrate"],
+                log_path=ffmpeg_log_path,
+                progress=progress,
+                cancel=cancel,
+            )
+        )
+        stage_sec["audio"] = round(time.monotonic() - stage_started, 3)
+
+    audio_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+    audio_future = audio_executor.submit(_audio_stage)
+    try:
+        # Every engine starts from canvas-sized, fast-to-decode working copies.
+        if resolve_video_layout(overlay_options) == "panel_16_9":
+            canvas_w, canvas_h, _, _ = panel_geometry(overlay_options, out_w, out_h)
+        else:
+            canvas_w, canvas_h = out_w, out_h
+        stage_started = time.monotonic()
+        image_paths, image_prep_stats = prepare_scene_images(
+            image_paths,
+            canvas_w,
+            canvas_h,
+            output_dir,
+            log_path=ffmpeg_log_path,
+            progress=progress,
+            cancel=cancel,
+        )
+        if image_prep_stats["enabled"]:
+            stage_sec["image_prep"] = round(time.monotonic() - stage_started, 3)
+
+        if render_mode == "single_pass":
+            final_command = _build_single_pass_command(
+                image_paths,
+                frame_counts,
+                audio_path,
+                overlay_options,
+                video_filters,
+                fps,
+                out_w,
+                out_h,
+                final_output,
+                profile=render_profile,
+                renditions=rendition_specs,
+            )
+            audio_future.result()
+            stage_started = time.monotonic()
+            run_cmd(final_command, log_path=ffmpeg_log_path, label="single-pass", progress=progress, cancel=cancel)
+            stage_sec["single_pass"] = round(time.monotonic() - stage_started, 3)
+            commands.append(to_ffmpeg_command_string(final_command))
+            _check_final_av(final_output, total_frames, fps, narration_sec, ffmpeg_log_path, "single-pass")
+        else:
+            if motion_engine == "numpy":
+                motion_path = output_dir / "motion.mp4"
+                stage_started = time.monotonic()
+                commands.extend(
+                    render_motion_track(
+                        image_paths,
+                        frame_counts,
+                        fps,
+                        overlay_options,
+                        out_w,
+                        out_h,
+                        motion_path,
+                        log_path=ffmpeg_log_path,
+                        preset=render_profile["segmentPreset"],
+                        crf=render_profile["segmentCrf"],
+                        max_workers=SEGMENT_RENDER_CONCURRENCY,
+                        progress=progress,
+                        cancel=cancel,
+                    )
+                )
+                stage_sec["motion_track"] = round(time.monotonic() - stage_started, 3)
+                segments = [motion_path]
+            else:
+                segments, segment_commands, segment_timings, segment_reuse = _render_scene_segments(
+                    image_paths,
+                    frame_counts,
+                    fps,
+                    overlay_options,
+                    out_w,
+                    out_h,
+                    output_dir,
+                    ffmpeg_log_path,
+                    profile=render_profile,
+                    progress=progress,
+                    cancel=cancel,
+                )
+                commands.extend(segment_commands)
+
+            audio_future.result()
+            if len(slices) > 1:
+                stage_started = time.monotonic()
+                slice_commands, slice_timings = _render_sliced_final(
+                    slices,
+                    segments,
+                    motion_engine == "numpy",
+                    audio_path,
+                    video_filters,
+                    fps,
+                    narration_sec,
+                    output_dir,
+                    final_output,
+                    ffmpeg_log_path,
+                    profile=render_profile,
+                    progress=progress,
+                    cancel=cancel,
+                )
+                stage_sec["final_merge"] = round(time.monotonic() - stage_started, 3)
+                commands.extend(slice_commands)
+            else:
+                concat_file = output_dir / "concat.txt"
+                concat_file.write_text(
+                    "\n".join(f"file '{segment.as_posix()}'" for segment in segments),
+                    encoding="utf-8",
+                )
+                final_command = _build_segment_merge_command(
+                    concat_file,
+                    audio_path,
+                    video_filters,
+                    fps,
+                    final_output,
+                    total_frames,
+                    profile=render_profile,
+                    renditions=rendition_specs,
+                )
+                stage_started = time.monotonic()
+                run_cmd(final_command, log_path=ffmpeg_log_path, label="final-merge", progress=progress, cancel=cancel)
+                stage_sec["final_merge"] = round(time.monotonic() - stage_started, 3)
+                commands.append(to_ffmpeg_command_string(final_command))
+                _check_final_av(final_output, total_frames, fps, narration_sec, ffmpeg_log_path, "final-merge")
+
+    finally:
+        audio_executor.shutdown(wait=True)
 
-    run_cmd(final_command, log_path=ffmpeg_log_path, label="final-merge")
-    commands.append(_to_ffmpeg_command_string(final_command))
     dimensions = probe_video_dimensions(final_output)
     if dimensions:
         width, height = dimensions
@@ -1400,4 +2235,152 @@ def render_short_video(
             raise RuntimeError(
                 f"Output video ratio mismatch (expected {out_w}x{out_h}, got {width}x{height})."
             )
-    return final_output, commands
+    for rendition in rendition_specs:
+        if probe_video_dimensions(rendition["path"]) != (rendition["width"], rendition["height"]):
+            raise RuntimeError(
+                f"Rendition {rendition['name']} missing or not "
+                f"{rendition['width']}x{rendition['height']}: {rendition['path'].name}"
+            )
+    return final_output, commands, {
+        "renderMode": render_mode,
+        "motionEngine": motion_engine,
+        "profile": profile_name,
+        "segmentTimings": segment_timings,
+        "stageSec": stage_sec,
+        "finalSlices": max(1, len(slices)),
+        "finalSliceTimings": slice_timings,
+        "audio": audio_stats,
+        "renditions": [
+            {
+                "name": rendition["name"],
+                "path": rendition["path"],
+                "container": rendition["container"],
+                "width": rendition["width"],
+                "height": rendition["height"],
+                "fps": rendition["fps"],
+            }
+            for rendition in rendition_specs
+        ],
+        "imagePrep": image_prep_stats,
+        **segment_reuse,
+    }
+
+
+PREVIEW_IMAGE_FORMATS = {"png", "jpeg"}
+
+
+def _locate_scene_frame(frame_counts: list[int], frame_number: int) -> tuple[int, int]:
+    """Map a global frame number to (1-based scene index, frame index inside that scene)."""
+    remaining = frame_number
+    for idx, frame_count in enumerate(frame_counts, start=1):
+        if remaining < frame_count:
+            return idx, remaining
+        remaining -= frame_count
+    return len(frame_counts), max(0, frame_counts[-1] - 1)
+
+
+def render_preview_frame(
+    image_paths: list[Path],
+    duration_sec: float,
+    subtitle_path: Path | None,
+    output_dir: Path,
+    timestamp_sec: float,
+    subtitle_options: dict[str, Any] | None = None,
+    overlay_options: dict[str, Any] | None = None,
+    title_text: str = "",
+    profile: str = "final",
+    image_format: str = "png",
+) -> tuple[Path, dict[str, Any]]:
+    """
+    Render the single output frame at timestamp_sec as PNG/JPEG.
+
+    Scene timing, motion crop, panel layout, subtitle styling and title layers match
+    render_short_video, but only one image is decoded and one frame encoded: the
+    zoompan state for that frame comes from motion_crop_rect, and the frame is
+    re-stamped to timestamp_sec so libass shows the cue active at that moment.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    image_format = image_format if image_format in PREVIEW_IMAGE_FORMATS else "png"
+    _, render_profile = _resolve_render_profile(profile)
+
+    fps = _resolve_output_fps(overlay_options)
+    if render_profile["maxFps"]:
+        fps = min(fps, int(render_profile["maxFps"]))
+    image_count = len(image_paths)
+    total_frames = max(image_count, int(math.ceil(duration_sec * fps)))
+    frame_counts = _scene_frame_counts(image_count, total_frames)
+    out_w, out_h = _scale_dimensions(
+        *_resolve_output_dimensions(overlay_options),
+        float(render_profile["scale"]),
+    )
+
+    frame_number = max(0, min(total_frames - 1, int(math.floor(timestamp_sec * fps))))
+    scene_index, scene_frame = _locate_scene_frame(frame_counts, frame_number)
+    motion_preset = resolve_scene_motion_preset(overlay_options, scene_index)
+    if resolve_video_layout(overlay_options) == "panel_16_9":
+        canvas_w, canvas_h, offset_x, offset_y = panel_geometry(overlay_options, out_w, out_h)
+    else:
+        canvas_w, canvas_h, offset_x, offset_y = out_w, out_h, 0, 0
+    params = motion_parameters(frame_counts[scene_index - 1], scene_index, overlay_options)
+    crop_x, crop_y, crop_w, crop_h = motion_crop_rect(
+        motion_preset,
+        params,
+        scene_frame,
+        canvas_w,
+        canvas_h,
+    )
+
+    filters = [
+        f"scale={canvas_w}:{canvas_h}:force_original_aspect_ratio=increase",
+        f"crop={canvas_w}:{canvas_h}",
+        f"crop={max(2, int(round(crop_w)))}:{max(2, int(round(crop_h)))}:"
+        f"{int(round(crop_x))}:{int(round(crop_y))}",
+        f"scale={canvas_w}:{canvas_h}:flags=lanczos",
+    ]
+    if (canvas_w, canvas_h) != (out_w, out_h):
+        filters.append(f"pad={out_w}:{out_h}:{offset_x}:{offset_y}:color=black")
+    frame_time = frame_number / fps
+    filters.extend(["setsar=1", f"setpts=PTS-STARTPTS+{frame_time:.6f}/TB"])
+    filters.extend(
+        _overlay_video_filters(
+            subtitle_path,
+            subtitle_options,
+            overlay_options,
+            title_text,
+            text_scale=float(render_profile["scale"]),
+            raster_size=(out_w, out_h),
+            work_dir=output_dir,
+            log_path=output_dir / "ffmpeg.log",
+        )
+    )
+
+    extension = "png" if image_format == "png" else "jpg"
+    output_path = output_dir / f"frame-{int(round(frame_time * 1000))}.{extension}"
+    codec_args = (
+        ["-c:v", "png"]
+        if image_format == "png"
+        else ["-c:v", "mjpeg", "-q:v", "2", "-pix_fmt", "yuvj420p"]
+    )
+    command = [
+        FFMPEG_BIN,
+        "-y",
+        "-i",
+        str(image_paths[scene_index - 1]),
+        "-vf",
+        ",".join(filters),
+        "-frames:v",
+        "1",
+        *codec_args,
+        "-update",
+        "1",
+        str(output_path),
+    ]
+    run_cmd(command, log_path=output_dir / "ffmpeg.log", label="preview-frame")
+    return output_path, {
+        "sceneIndex": scene_index,
+        "frameIndex": frame_number,
+        "timestampSec": round(frame_time, 6),
+        "width": out_w,
+        "height": out_h,
+        "command": to_ffmpeg_command_string(command),
+    }
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import os
+import shlex
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable
+
+from app.cancellation import CancelToken, JobCancelled, kill_process_group, process_group_kwargs
+from app.env import env_int
+from app.ffmpeg_governor import ffmpeg_governor, with_thread_budget
+from app.metrics import record_ffmpeg_error
+from app.progress import RenderProgress, parse_progress_block
+
+
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+
+
+FFMPEG_CMD_TIMEOUT_SEC = env_int("FFMPEG_CMD_TIMEOUT_SEC", 12 * 60, 10, 60 * 60)
+# stderr lines kept per running ffmpeg for FAIL/TIMEOUT logs; older lines are dropped.
+FFMPEG_OUTPUT_RING_LINES = env_int("FFMPEG_OUTPUT_RING_LINES", 400, 20, 100_000)
+
+
+def decode_output(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        try:
+            return value.decode("utf-8", errors="replace").strip()
+        except Exception:  # pylint: disable=broad-except
+            return value.decode(errors="replace").strip()
+    return str(value).strip()
+
+
+def tail_text(value: str, max_chars: int = 4000) -> str:
+    text = (value or "").strip()
+    if len(text) <= max_chars:
+        return text
+    return text[-max_chars:]
+
+
+def append_ffmpeg_log(log_path: Path | None, message: str) -> None:
+    if log_path is None:
+        return
+    try:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        with log_path.open("a", encoding="utf-8") as handle:
+            handle.write(f"[{timestamp}Z] {message}\n")
+    except OSError:
+        return
+
+
+def run_cmd(
+    command: list[str],
+    log_path: Path | None = None,
+    label: str = "ffmpeg",
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+    on_stderr: Callable[[str], None] | None = None,
+    feed_stdin: Callable[[IO[bytes]], None] | None = None,
+) -> None:
+    """
+    Run one ffmpeg command under a governor slot, logging START/OK/FAIL to log_path.
+    on_stderr receives every stderr line (the FAIL log only keeps the tail), for
+    commands whose result is printed there, such as analysis passes.
+    feed_stdin, for commands reading "-i -", is called on this thread with the
+    process's stdin and closes it on return; writes after a cancel, timeout or crash
+    stop with BrokenPipeError, which is reported as that outcome instead.
+    """
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    with ffmpeg_governor.slot() as slot:
+        # A job cancelled while waiting in line gives its slot straight back.
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        _run_governed_cmd(
+            with_thread_budget(command, slot["threads"]),
+            log_path,
+            label,
+            slot,
+            progress,
+            cancel,
+            on_stderr,
+            feed_stdin,
+        )
+
+
+def _with_progress_pipe(command: list[str]) -> list[str]:
+    """Ask ffmpeg for machine-readable progress blocks on stdout instead of the stderr stats line."""
+    if len(command) < 2 or "-progress" in command:
+        return command
+    return [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+
+
+def _stream_cmd(
+    command: list[str],
+    label: str,
+    progress: RenderProgress | None,
+    cancel: CancelToken | None = None,
+    on_stderr: Callable[[str], None] | None = None,
+    feed_stdin: Callable[[IO[bytes]], None] | None = None,
+) -> tuple[int, str]:
+    """
+    Run command, parsing -progress blocks from stdout as they arrive (on a side
+    thread while feed_stdin writes the input).
+    stderr is drained on a side thread into a bounded ring so long encodes never
+    hold their whole log in memory; returns (returncode, stderr tail).
+    Raises subprocess.TimeoutExpired (with the stderr tail) past FFMPEG_CMD_TIMEOUT_SEC
+    and JobCancelled when the cancel token killed the process group.
+    """
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE if feed_stdin is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **process_group_kwargs(),
+    )
+    if cancel is not None:
+        cancel.attach(process)
+    stderr_ring: deque[bytes] = deque(maxlen=FFMPEG_OUTPUT_RING_LINES)
+
+    def _drain_stderr() -> None:
+        assert process.stderr is not None
+        for line in process.stderr:
+            stderr_ring.append(line)
+            if on_stderr is not None:
+                on_stderr(line.decode("utf-8", errors="replace"))
+
+    drain_thread = threading.Thread(target=_drain_stderr, name=f"{label}-stderr", daemon=True)
+    drain_thread.start()
+    timed_out = threading.Event()
+
+    def _kill_on_timeout() -> None:
+        timed_out.set()
+        kill_process_group(process)
+
+    def _read_progress() -> None:
+        assert process.stdout is not None
+        block: dict[str, str] = {}
+        for raw_line in process.stdout:
+            key, sep, value = raw_line.decode("utf-8", errors="replace").strip().partition("=")
+            if not sep:
+                continue
+            block[key] = value
+            if key == "progress":
+                if progress is not None:
+                    progress.update(label, parse_progress_block(block))
+                block = {}
+
+    timer = threading.Timer(FFMPEG_CMD_TIMEOUT_SEC, _kill_on_timeout)
+    timer.daemon = True
+    timer.start()
+    progress_thread: threading.Thread | None = None
+    try:
+        if feed_stdin is None:
+            _read_progress()
+        else:
+            progress_thread = threading.Thread(target=_read_progress, name=f"{label}-progress", daemon=True)
+            progress_thread.start()
+            _feed_stdin(process, feed_stdin)
+        return_code = process.wait()
+    except Exception as exc:
+        if cancel is not None and cancel.cancelled and not isinstance(exc, JobCancelled):
+            raise JobCancelled(f"Job cancelled: {cancel.reason}") from exc
+        raise
+    finally:
+        timer.cancel()
+        if cancel is not None:
+            cancel.detach(process)
+        if process.poll() is None:
+            kill_process_group(process)
+            process.wait()
+        if progress_thread is not None:
+            progress_thread.join(timeout=5)
+        drain_thread.join(timeout=5)
+    stderr_text = decode_output(b"".join(stderr_ring))
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(command, FFMPEG_CMD_TIMEOUT_SEC, stderr=stderr_text)
+    return return_code, stderr_text
+
+
+def _feed_stdin(process: subprocess.Popen, feed_stdin: Callable[[IO[bytes]], None]) -> None:
+    assert process.stdin is not None
+    try:
+        feed_stdin(process.stdin)
+    except BrokenPipeError:
+        # The process is gone (cancel, timeout or crash); its exit status tells which.
+        pass
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+
+def _run_governed_cmd(
+    command: list[str],
+    log_path: Path | None,
+    label: str,
+    slot: dict[str, Any],
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+    on_stderr: Callable[[str], None] | None = None,
+    feed_stdin: Callable[[IO[bytes]], None] | None = None,
+) -> None:
+    started = time.monotonic()
+    command = _with_progress_pipe(command)
+    command_text = to_ffmpeg_command_string(command)
+    append_ffmpeg_log(
+        log_path,
+        (
+            f"[{label}] START queue_wait={slot['waitSec']:.2f}s threads={slot['threads']} "
+            f"timeout={FFMPEG_CMD_TIMEOUT_SEC}s cmd={command_text}"
+        ),
+    )
+    if progress is not None:
+        progress.start(label)
+    try:
+        return_code, stderr_text = _stream_cmd(command, label, progress, cancel, on_stderr, feed_stdin)
+    except JobCancelled:
+        append_ffmpeg_log(log_path, f"[{label}] CANCELLED elapsed={time.monotonic() - started:.2f}s")
+        if progress is not None:
+            progress.finish(label, state="cancelled")
+        raise
+    except subprocess.TimeoutExpired as exc:
+        elapsed = time.monotonic() - started
+        output_text = tail_text(decode_output(exc.stderr)) or "(no output captured)"
+        append_ffmpeg_log(
+            log_path,
+            f"[{label}] TIMEOUT elapsed={elapsed:.2f}s cmd={command_text}\n{output_text}",
+        )
+        record_ffmpeg_error(label, "timeout")
+        if progress is not None:
+            progress.finish(label, state="failed")
+        raise RuntimeError(
+            f"Command timed out after {FFMPEG_CMD_TIMEOUT_SEC}s: {' '.join(command)}"
+        ) from exc
+    except Exception as exc:
+        # Only feed_stdin raises here: the input could not be produced.
+        append_ffmpeg_log(
+            log_path,
+            f"[{label}] FAIL input elapsed={time.monotonic() - started:.2f}s: {exc}",
+        )
+        record_ffmpeg_error(label, "failed")
+        if progress is not None:
+            progress.finish(label, state="failed")
+        raise
+    if return_code != 0:
+        elapsed = time.monotonic() - started
+        combined = stderr_text or "(ffmpeg returned non-zero with no output)"
+        append_ffmpeg_log(
+            log_path,
+            f"[{label}] FAIL rc={return_code} elapsed={elapsed:.2f}s cmd={command_text}\n{tail_text(combined)}",
+        )
+        record_ffmpeg_error(label, "failed")
+        if progress is not None:
+            progress.finish(label, state="failed")
+        raise RuntimeError(
+            f"Command failed: {' '.join(command)}\n{tail_text(combined)}"
+        )
+    elapsed = time.monotonic() - started
+    append_ffmpeg_log(
+        log_path,
+        f"[{label}] OK queue_wait={slot['waitSec']:.2f}s elapsed={elapsed:.2f}s",
+    )
+    if progress is not None:
+        progress.finish(label)
+
+
+def to_ffmpeg_command_string(command: list[str]) -> str:
+    return " ".join(shlex.quote(arg) for arg in command)
+
+
+def run_parallel_commands(
+    segment_commands: list[tuple[str, list[str]]],
+    log_path: Path | None,
+    max_workers: int,
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+    stage_name: str = "segment",
+) -> list[dict[str, Any]]:
+    """
+    Run independent segment encodes on a bounded thread pool.
+    Timings are returned in submission order so the concat list and log labels
+    stay stable regardless of which encode finishes first.
+    """
+    if not segment_commands:
+        return []
+
+    def _run_one(label: str, command: list[str], submitted: float) -> dict[str, Any]:
+        started = time.monotonic()
+        run_cmd(command, log_path=log_path, label=label, progress=progress, cancel=cancel)
+        finished = time.monotonic()
+        wait_sec = started - submitted
+        run_sec = finished - started
+        append_ffmpeg_log(log_path, f"[{label}] TIMING wait={wait_sec:.2f}s run={run_sec:.2f}s")
+        return {"label": label, "waitSec": round(wait_sec, 3), "runSec": round(run_sec, 3)}
+
+    worker_count = max(1, min(max_workers, len(segment_commands)))
+    append_ffmpeg_log(
+        log_path,
+        f"{stage_name.capitalize()} stage start segments={len(segment_commands)} workers={worker_count}",
+    )
+    executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix=stage_name)
+    try:
+        futures = [
+            executor.submit(_run_one, label, command, time.monotonic())
+            for label, command in segment_commands
+        ]
+        # Raise the first failure in scene order; pending encodes are dropped below
+        # (a cancel kills the running ones, so the shutdown wait is short).
+        return [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def aac_args(bitrate: str | None = None) -> list[str]:
+    args = ["-c:a", "aac"]
+    if bitrate:
+        args.extend(["-b:a", bitrate])
+    return args
+
+
+def escape_filter_path(path_text: str) -> str:
+    safe_path = path_text.replace("\\", "/")
+    if len(safe_path) >= 2 and safe_path[1] == ":":
+        safe_path = f"{safe_path[0]}\\:{safe_path[2:]}"
+    safe_path = safe_path.replace("'", "\\'")
+    return safe_path
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from app.env import env_int
+
+
+CPU_COUNT = max(1, os.cpu_count() or 1)
+# Concurrent ffmpeg processes across every job/request in this engine process.
+FFMPEG_MAX_PROCESSES = env_int("FFMPEG_MAX_PROCESSES", max(1, CPU_COUNT // 2), 1, 64)
+# Fixed per-process thread budget; 0 derives it from cores, slots and host load.
+FFMPEG_THREADS_PER_PROCESS = env_int("FFMPEG_THREADS_PER_PROCESS", 0, 0, 64)
+# Value placeholder for "-threads" in commands with several outputs: each output's
+# args carry ["-threads", THREAD_BUDGET], filled in once the slot's budget is known.
+THREAD_BUDGET = "{threads}"
+
+
+def with_thread_budget(command: list[str], threads: int) -> list[str]:
+    """
+    Return command with explicit -filter_threads/-filter_complex_threads (global) and
+    -threads (for the output) so ffmpeg does not size its pools to every core.
+    -threads is an output option, so a command with several outputs marks each one
+    with THREAD_BUDGET; otherwise it is added before the single (last) output.
+    Commands that already pin -threads are returned unchanged.
+    """
+    if len(command) < 2:
+        return command
+    budget = str(max(1, threads))
+    if THREAD_BUDGET in command:
+        return [
+            command[0],
+            "-filter_threads",
+            budget,
+            "-filter_complex_threads",
+            budget,
+            *(budget if arg == THREAD_BUDGET else arg for arg in command[1:]),
+        ]
+    if "-threads" in command:
+        return command
+    return [
+        command[0],
+        "-filter_threads",
+        budget,
+        "-filter_complex_threads",
+        budget,
+        *command[1:-1],
+        "-threads",
+        budget,
+        command[-1],
+    ]
+
+
+class FfmpegGovernor:
+    """
+    Process-wide gate for ffmpeg: at most max_processes run at once, the rest wait
+    in line, and each admitted process gets a thread budget so concurrent renders
+    share the cores instead of each spawning one thread per core.
+    """
+
+    def __init__(
+        self,
+        max_processes: int = FFMPEG_MAX_PROCESSES,
+        cpu_count: int = CPU_COUNT,
+        fixed_threads: int = FFMPEG_THREADS_PER_PROCESS,
+    ) -> None:
+        self.max_processes = max_processes
+        self.cpu_count = cpu_count
+        self.fixed_threads = fixed_threads
+        self._slots = threading.BoundedSemaphore(max_processes)
+        self._lock = threading.Lock()
+        self._running = 0
+        self._running_threads = 0
+        self._waiting = 0
+        self._totals: dict[str, float] = {"commands": 0, "waitSec": 0.0, "runSec": 0.0}
+
+    def thread_budget(self) -> int:
+        if self.fixed_threads > 0:
+            return self.fixed_threads
+        share = max(1, self.cpu_count // self.max_processes)
+        try:
+            load_1m = os.getloadavg()[0]
+        except (AttributeError, OSError):  # Windows
+            return share
+        # Load not explained by our own ffmpeg threads means the host is busy elsewhere.
+        with self._lock:
+            own_threads = self._running_threads
+        external = max(0.0, load_1m - own_threads)
+        headroom = max(1, int(self.cpu_count - external))
+        return max(1, min(share, headroom // self.max_processes or 1))
+
+    @contextmanager
+    def slot(self) -> Iterator[dict[str, Any]]:
+        """Block until a slot is free; yields {"waitSec", "threads"} for the admitted process."""
+        queued_at = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        self._slots.acquire()
+        wait_sec = time.monotonic() - queued_at
+        threads = self.thread_budget()
+        with self._lock:
+            self._waiting -= 1
+            self._running += 1
+            self._running_threads += threads
+        started = time.monotonic()
+        try:
+            yield {"waitSec": wait_sec, "threads": threads}
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._running_threads -= threads
+                self._totals["commands"] += 1
+                self._totals["waitSec"] += wait_sec
+                self._totals["runSec"] += time.monotonic() - started
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            totals = dict(self._totals)
+            running = self._running
+            waiting = self._waiting
+            running_threads = self._running_threads
+        return {
+            "cpuCount": self.cpu_count,
+            "maxProcesses": self.max_processes,
+            "running": running,
+            "waiting": waiting,
+            "runningThreads": running_threads,
+            "nextThreadBudget": self.thread_budget(),
+            "commands": int(totals["commands"]),
+            "totalWaitSec": round(totals["waitSec"], 3),
+            "totalRunSec": round(totals["runSec"], 3),
+        }
+
+
+ffmpeg_governor = FfmpegGovernor()
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FONT_INDEX_CACHE_PATH = Path(
+    os.getenv("FONT_INDEX_CACHE_PATH") or str(BASE_DIR / "cache" / "font-index.json")
+)
+FONT_EXTENSIONS = {".ttf", ".otf", ".ttc", ".otc"}
+SCRIPTS = ("latin", "hangul", "cjk", "devanagari", "arabic")
+# Bump when the on-disk index layout changes.
+_INDEX_VERSION = 1
+_FC_LIST_TIMEOUT_SEC = 30
+
+# fontconfig language tags -> scripts the renderer cares about.
+_LANG_SCRIPTS = {
+    "en": "latin",
+    "ko": "hangul",
+    "ja": "cjk",
+    "zh-cn": "cjk",
+    "zh-tw": "cjk",
+    "zh-hk": "cjk",
+    "hi": "devanagari",
+    "mr": "devanagari",
+    "ne": "devanagari",
+    "ar": "arabic",
+    "fa": "arabic",
+    "ur": "arabic",
+}
+# Filename fallback when fc-list is unavailable (e.g. Windows dev machines).
+_NAME_SCRIPT_HINTS = {
+    "hangul": ("malgun", "nanum", "cjk", "notosanskr", "notoserifkr", "pretendard", "spoqa", "gulim", "batang"),
+    "cjk": ("cjk", "malgun", "yugoth", "meiryo", "msgothic", "msmincho", "notosansjp", "notoserifjp", "msyh", "simsun"),
+    "devanagari": ("devanagari", "nirmala", "mangal", "aparaj", "kokila"),
+    "arabic": ("arabic", "naskh", "amiri", "scheherazade", "arial", "tahoma", "segoeui"),
+}
+_BOLD_STYLE_PATTERN = re.compile(r"bold|black|heavy|semibold|extrabold", re.IGNORECASE)
+
+
+def _normalize_path(path_text: str) -> str:
+    return os.path.normcase(os.path.normpath(str(path_text)))
+
+
+def default_font_dirs() -> list[Path]:
+    dirs: list[Path] = []
+    if os.name == "nt":
+        windir = os.getenv("WINDIR", "C:/Windows").strip() or "C:/Windows"
+        dirs.append(Path(windir) / "Fonts")
+        local_app_data = os.getenv("LOCALAPPDATA", "").strip()
+        if local_app_data:
+            dirs.append(Path(local_app_data) / "Microsoft" / "Windows" / "Fonts")
+    else:
+        dirs.extend(
+            [
+                Path("/usr/share/fonts"),
+                Path("/usr/local/share/fonts"),
+                Path.home() / ".local" / "share" / "fonts",
+                Path.home() / ".fonts",
+            ]
+        )
+    extra = str(os.getenv("FONT_INDEX_EXTRA_DIRS") or "").strip()
+    if extra:
+        dirs.extend(Path(item) for item in extra.split(os.pathsep) if item.strip())
+    return dirs
+
+
+def _weight_for_style(style: str) -> str:
+    return "bold" if _BOLD_STYLE_PATTERN.search(style or "") else "regular"
+
+
+def _guess_from_filename(path: Path) -> dict[str, Any]:
+    stem = path.stem
+    lowered = stem.lower()
+    scripts = {"latin"}
+    for script, hints in _NAME_SCRIPT_HINTS.items():
+        if any(hint in lowered for hint in hints):
+            scripts.add(script)
+    # Windows short names mark bold with a trailing b/bd (arialbd, malgunbd, YuGothB).
+    is_bold = bool(_BOLD_STYLE_PATTERN.search(stem)) or bool(re.search(r"(bd|b)$", lowered))
+    family = re.split(r"[-_]", stem, maxsplit=1)[0]
+    return {
+        "family": family,
+        "style": "Bold" if is_bold else "Regular",
+        "weight": "bold" if is_bold else "regular",
+        "scripts": sorted(scripts),
+    }
+
+
+def _fc_list_entries() -> dict[str, dict[str, Any]] | None:
+    """file -> {family, style, scripts} from one fc-list call, or None without fontconfig."""
+    fc_list = shutil.which("fc-list")
+    if not fc_list:
+        return None
+    try:
+        completed = subprocess.run(
+            [fc_list, "--format", "%{file}|%{family[0]}|%{style[0]}|%{lang}\n"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=False,
+            timeout=_FC_LIST_TIMEOUT_SEC,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if completed.returncode != 0:
+        return None
+
+    entries: dict[str, dict[str, Any]] = {}
+    for line in completed.stdout.decode("utf-8", errors="replace").splitlines():
+        parts = line.split("|")
+        if len(parts) < 4 or not parts[0]:
+            continue
+        # %{lang} is itself '|'-separated, so every field after style is a language tag.
+        file_path, family, style, langs = parts[0], parts[1], parts[2], parts[3:]
+        scripts = {_LANG_SCRIPTS[lang] for lang in langs if lang in _LANG_SCRIPTS}
+        entry = entries.setdefault(
+            _normalize_path(file_path),
+            {"family": family, "style": style, "weight": _weight_for_style(style), "scripts": set()},
+        )
+        entry["scripts"].update(scripts)
+    for entry in entries.values():
+        entry["scripts"] = sorted(entry["scripts"])
+    return entries
+
+
+def _dir_signature(roots: list[Path]) -> dict[str, list[list[Any]]]:
+    """
+    mtime of every directory under each root (the same tree _scan walks); adding or
+    removing a font file bumps its parent's mtime, however deep the family dir is.
+    """
+    signature: dict[str, list[list[Any]]] = {}
+    for root in roots:
+        if not root.is_dir():
+            continue
+        mtimes: list[list[Any]] = []
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames.sort()
+            try:
+                mtimes.append([os.path.relpath(dirpath, root), os.stat(dirpath).st_mtime])
+            except OSError:
+                continue
+        signature[str(root)] = mtimes
+    return signature
+
+
+class FontIndex:
+    """
+    In-memory map of installed font files with family, weight and supported scripts.
+    Built once (or loaded from FONT_INDEX_CACHE_PATH) so font resolution never probes
+    the filesystem per template; rebuild() rescans after fonts are installed.
+    """
+
+    def __init__(self, roots: list[Path] | None = None, cache_path: Path = FONT_INDEX_CACHE_PATH) -> None:
+        self.roots = roots if roots is not None else default_font_dirs()
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._fonts: list[dict[str, Any]] = []
+        self._files: set[str] = set()
+        self._outside_roots: dict[str, bool] = {}
+        self._root_prefixes = [_normalize_path(str(root)) + os.sep for root in self.roots]
+        self._info: dict[str, Any] = {}
+        self.generation = 0
+        self._loaded = False
+
+    def _install(self, fonts: list[dict[str, Any]], info: dict[str, Any]) -> None:
+        with self._lock:
+            self._fonts = fonts
+            self._files = {_normalize_path(font["path"]) for font in fonts}
+            self._outside_roots = {}
+            self._info = info
+            self.generation += 1
+            self._loaded = True
+
+    def _scan(self) -> list[dict[str, Any]]:
+        fc_entries = _fc_list_entries()
+        fonts: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        for root in self.roots:
+            if not root.is_dir():
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    if Path(filename).suffix.lower() not in FONT_EXTENSIONS:
+                        continue
+                    path = Path(dirpath) / filename
+                    normalized = _normalize_path(str(path))
+                    if normalized in seen:
+                        continue
+                    seen.add(normalized)
+                    details = (fc_entries or {}).get(normalized) or _guess_from_filename(path)
+                    fonts.append({"path": str(path), **details})
+        return fonts
+
+    def rebuild(self) -> dict[str, Any]:
+        started = time.monotonic()
+        fonts = self._scan()
+        info = {
+            "builtAt": time.time(),
+            "buildSec": round(time.monotonic() - started, 3),
+            "source": "fc-list" if shutil.which("fc-list") else "filename",
+            "loadedFrom": "scan",
+            "roots": [str(root) for root in self.roots],
+        }
+        self._install(fonts, info)
+        self._write_cache(fonts, info)
+        return self.summary()
+
+    def _write_cache(self, fonts: list[dict[str, Any]], info: dict[str, Any]) -> None:
+        payload = {
+            "version": _INDEX_VERSION,
+            "signature": _dir_signature(self.roots),
+            "info": info,
+            "fonts": fonts,
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle)
+            os.replace(tmp_name, self.cache_path)
+        except OSError:
+            return
+
+    def _read_cache(self) -> bool:
+        try:
+            payload = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if payload.get("version") != _INDEX_VERSION:
+            return False
+        if payload.get("signature") != _dir_signature(self.roots):
+            return False
+        info = dict(payload.get("info") or {})
+        if info.get("roots") != [str(root) for root in self.roots]:
+            return False
+        info["loadedFrom"] = "cache"
+        self._install(list(payload.get("fonts") or []), info)
+        return True
+
+    def load_or_build(self) -> dict[str, Any]:
+        if not self._read_cache():
+            return self.rebuild()
+        return self.summary()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load_or_build()
+
+    def has_file(self, path_text: str) -> bool:
+        """Existence check answered from the index; paths outside indexed roots are probed once."""
+        if not path_text:
+            return False
+        self._ensure_loaded()
+        normalized = _normalize_path(path_text)
+        with self._lock:
+            if normalized in self._files:
+                return True
+            if any(normalized.startswith(prefix) for prefix in self._root_prefixes):
+                return False
+            cached = self._outside_roots.get(normalized)
+        if cached is not None:
+            return cached
+        try:
+            exists = Path(path_text).exists()
+        except OSError:
+            exists = False
+        with self._lock:
+            self._outside_roots[normalized] = exists
+        return exists
+
+    def glob(self, pattern: str) -> list[str]:
+        self._ensure_loaded()
+        normalized_pattern = _normalize_path(pattern)
+        with self._lock:
+            fonts = list(self._fonts)
+        return sorted(
+            font["path"]
+            for font in fonts
+            if fnmatch.fnmatch(_normalize_path(font["path"]), normalized_pattern)
+        )
+
+    def best_file_for_script(self, script: str, prefer_bold: bool = False) -> str:
+        """Any indexed file covering the script, preferring the requested weight and Noto families."""
+        self._ensure_loaded()
+        with self._lock:
+            fonts = [font for font in self._fonts if script in font.get("scripts", [])]
+        if not fonts:
+            return ""
+        wanted_weight = "bold" if prefer_bold else "regular"
+        fonts.sort(
+            key=lambda font: (
+                font.get("weight") != wanted_weight,
+                "noto" not in str(font.get("family", "")).lower(),
+                font["path"],
+            )
+        )
+        return fonts[0]["path"]
+
+    def coverage(self) -> dict[str, list[dict[str, Any]]]:
+        self._ensure_loaded()
+        with self._lock:
+            fonts = list(self._fonts)
+        return {
+            script: [
+                {
+                    "family": font.get("family", ""),
+                    "style": font.get("style", ""),
+                    "weight": font.get("weight", "regular"),
+                    "path": font["path"],
+                }
+                for font in fonts
+                if script in font.get("scripts", [])
+            ]
+            for script in SCRIPTS
+        }
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            fonts = list(self._fonts)
+            info = dict(self._info)
+        return {
+            **info,
+            "generation": self.generation,
+            "fontCount": len(fonts),
+            "scriptCounts": {
+                script: sum(1 for font in fonts if script in font.get("scripts", []))
+                for script in SCRIPTS
+            },
+        }
+
+
+font_index = FontIndex()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from app.asset_cache import (
+    BASE_DIR,
+    evict_lru_files,
+    file_sha256,
+    link_or_copy,
+    list_cache_files,
+    touch,
+)
+from app.cancellation import CancelToken
+from app.env import env_int
+from app.ffmpeg_exec import FFMPEG_BIN, append_ffmpeg_log, run_parallel_commands
+from app.media_probe import probe_media
+from app.progress import RenderProgress
+
+
+IMAGE_CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR") or str(BASE_DIR / "cache" / "images"))
+# 0 disables reuse; working copies are still made per job while IMAGE_PREP_CONCURRENCY > 0.
+IMAGE_CACHE_MAX_BYTES = env_int("IMAGE_CACHE_MAX_BYTES", 1024 * 1024 * 1024)
+# Parallel image conversions per job; 0 renders straight from the original files.
+IMAGE_PREP_CONCURRENCY = env_int("IMAGE_PREP_CONCURRENCY", 4, 0, 16)
+# Uncompressed BGR(A): decoding is a copy, where a large PNG costs a full inflate per encode.
+IMAGE_PREP_FORMAT = "bmp"
+# Source pixel formats BMP holds without loss, and the working copy's format for each.
+# Anything else (JPEG's yuvj*, 16-bit, gray, palette) renders from the original:
+# a BMP round trip would change its pixels.
+IMAGE_PREP_PIX_FMTS = {
+    "rgb24": "bgr24",
+    "bgr24": "bgr24",
+    "rgba": "bgra",
+    "bgra": "bgra",
+    "argb": "bgra",
+    "abgr": "bgra",
+}
+# Bump when the conversion changes in a way the filter, format and pix_fmt do not capture.
+_IMAGE_KEY_VERSION = "2"
+
+
+def canvas_filter(width: int, height: int) -> str:
+    """Cover-fit an image to the motion canvas (the same scale/crop the scene filters start with)."""
+    return f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}"
+
+
+class ImageCache:
+    """
+    Working copies of scene images keyed by source content hash plus the target
+    canvas geometry and conversion, so a source reused across jobs with the same
+    layout is converted once.
+    """
+
+    def __init__(
+        self,
+        root: Path = IMAGE_CACHE_DIR,
+        max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key_for(self, image_path: Path, width: int, height: int, pix_fmt: str) -> str:
+        payload = json.dumps(
+            {
+                "version": _IMAGE_KEY_VERSION,
+                "image": file_sha256(image_path),
+                "filter": canvas_filter(width, height),
+                "format": IMAGE_PREP_FORMAT,
+                "pixFmt": pix_fmt,
+            },
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.{IMAGE_PREP_FORMAT}"
+
+    def lookup(self, key: str, destination: Path) -> bool:
+        if not self.enabled:
+            return False
+        cached = self._path_for(key)
+        if not cached.exists():
+            with self._lock:
+                self._counters["misses"] += 1
+            return False
+        touch(cached)
+        link_or_copy(cached, destination)
+        with self._lock:
+            self._counters["hits"] += 1
+        return True
+
+    def store(self, key: str, image_path: Path) -> None:
+        if not self.enabled or not image_path.exists():
+            return
+        cached = self._path_for(key)
+        if not cached.exists():
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            link_or_copy(image_path, cached)
+        with self._lock:
+            self._counters["evictions"] += evict_lru_files(self.root, self.max_bytes)
+
+    def stats(self) -> dict[str, Any]:
+        rows = list_cache_files(self.root)
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "enabled": self.enabled,
+            "imageCount": len(rows),
+            "totalBytes": sum(size for _, size, _ in rows),
+            "maxBytes": self.max_bytes,
+        }
+
+
+image_cache = ImageCache()
+
+
+def prepare_scene_images(
+    image_paths: list[Path],
+    width: int,
+    height: int,
+    output_dir: Path,
+    log_path: Path | None = None,
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+    max_workers: int = IMAGE_PREP_CONCURRENCY,
+) -> tuple[list[Path], dict[str, Any]]:
+    """
+    Convert every distinct RGB(A) scene image once to the width x height motion
+    canvas (image-prep-N.bmp in output_dir), in parallel, reusing cached conversions.
+    Returns the image per scene (repeated images share one working copy; sources
+    outside IMAGE_PREP_PIX_FMTS are returned as-is) and stats.
+    """
+    if max_workers <= 0:
+        return list(image_paths), {"enabled": False}
+    prepared: list[Path] = []
+    path_by_key: dict[str, Path] = {}
+    to_render: list[tuple[str, list[str], str]] = []
+    reused = 0
+    passed_through = 0
+    for image_path in image_paths:
+        try:
+            source_pix_fmt = (probe_media(image_path, "image")["video"] or {}).get("pixFmt")
+        except ValueError:
+            source_pix_fmt = None
+        pix_fmt = IMAGE_PREP_PIX_FMTS.get(str(source_pix_fmt))
+        if pix_fmt is None:
+            prepared.append(image_path)
+            passed_through += 1
+            continue
+        key = image_cache.key_for(image_path, width, height, pix_fmt)
+        if key in path_by_key:
+            prepared.append(path_by_key[key])
+            continue
+        index = len(path_by_key) + 1
+        working_path = output_dir / f"image-prep-{index}.{IMAGE_PREP_FORMAT}"
+        path_by_key[key] = working_path
+        prepared.append(working_path)
+        if image_cache.lookup(key, working_path):
+            reused += 1
+            append_ffmpeg_log(log_path, f"[image-prep-{index}] REUSE cache key={key[:12]}")
+            continue
+        # Never let ffmpeg truncate a file that may be hardlinked into the cache.
+        if working_path.exists():
+            working_path.unlink()
+        command = [
+            FFMPEG_BIN,
+            "-y",
+            "-i",
+            str(image_path),
+            "-vf",
+            canvas_filter(width, height),
+            "-frames:v",
+            "1",
+            "-pix_fmt",
+            pix_fmt,
+            str(working_path),
+        ]
+        to_render.append((f"image-prep-{index}", command, key))
+        if progress is not None:
+            progress.plan(f"image-prep-{index}", 1)
+
+    timings = run_parallel_commands(
+        [(label, command) for label, command, _ in to_render],
+        log_path,
+        max_workers=max_workers,
+        progress=progress,
+        cancel=cancel,
+        stage_name="image-prep",
+    )
+    for label, command, key in to_render:
+        working_path = Path(command[-1])
+        if not working_path.exists() or working_path.stat().st_size == 0:
+            raise RuntimeError(f"Image preparation produced no output: {label} ({working_path.name})")
+        image_cache.store(key, working_path)
+    return prepared, {
+        "enabled": True,
+        "canvas": f"{width}x{height}",
+        "imagesReused": reused,
+        "imagesConverted": len(to_render),
+        "imagesPassedThrough": passed_through,
+        "timings": timings,
+    }
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from app.asset_cache import touch
+from app.env import env_int
+from app.metrics import OUTPUT_FREED_BYTES
+
+
+# Finished jobs untouched (written or served) for this long are deleted; 0 disables.
+OUTPUT_RETENTION_SEC = env_int("OUTPUT_RETENTION_HOURS", 72) * 60 * 60
+# Total bytes under OUTPUTS_DIR; least recently used jobs are evicted above it. 0 disables.
+OUTPUT_QUOTA_BYTES = env_int("OUTPUT_QUOTA_BYTES", 20 * 1024 * 1024 * 1024)
+# Intermediates left behind by failed renders are removed after this long.
+OUTPUT_INTERMEDIATE_TTL_SEC = env_int("OUTPUT_INTERMEDIATE_TTL_SEC", 60 * 60)
+# Set to 1 to keep segments/concat lists after a successful merge (debugging).
+OUTPUT_KEEP_INTERMEDIATES = env_int("OUTPUT_KEEP_INTERMEDIATES", 0) > 0
+# Background sweep period; 0 leaves sweeping to POST /admin/janitor/run.
+OUTPUT_JANITOR_INTERVAL_SEC = env_int("OUTPUT_JANITOR_INTERVAL_SEC", 10 * 60)
+
+# Job-directory files only needed while a render runs.
+INTERMEDIATE_PATTERNS = (
+    "segment-*.mp4",
+    "image-prep-*",
+    "motion.mp4",
+    "motion-canvas-*",
+    "audio.m4a",
+    "concat.txt",
+    "final-slice*",
+    "_default_sfx.mp3",
+    "title-overlay.png",
+    "*.tmp",
+    "*.tmp.*",
+)
+# Files under assets/ that outlive the render (srtPath is returned to callers).
+_KEPT_ASSET_SUFFIXES = {".srt"}
+_TOUCH_MIN_INTERVAL_SEC = 60
+
+
+def _classify(relative: Path) -> str:
+    parts = relative.parts
+    if len(parts) > 1 and parts[0] == "assets":
+        return "subtitles" if relative.suffix.lower() in _KEPT_ASSET_SUFFIXES else "assets"
+    if len(parts) > 1 and parts[0] == "preview":
+        return "preview"
+    if len(parts) == 1:
+        if parts[0] == "final.mp4" or parts[0].startswith("rendition-"):
+            return "final"
+        if parts[0].endswith(".log"):
+            return "logs"
+        if any(fnmatch.fnmatch(parts[0], pattern) for pattern in INTERMEDIATE_PATTERNS):
+            return "intermediates"
+    return "other"
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def discard_job_outputs(job_dir: Path, keep: tuple[str, ...] = ("ffmpeg.log",)) -> None:
+    """Remove everything in a job directory except the named top-level entries."""
+    if not job_dir.is_dir():
+        return
+    for entry in job_dir.iterdir():
+        if entry.name not in keep:
+            _remove(entry)
+
+
+class OutputJanitor:
+    """
+    Retention for per-job directories under OUTPUTS_DIR.
+
+    Intermediates go right after a successful merge (or after a TTL for failed jobs),
+    whole jobs expire after OUTPUT_RETENTION_SEC without use, and least recently used
+    jobs are evicted while the directory exceeds OUTPUT_QUOTA_BYTES. Jobs reported
+    active by is_active are never touched. "Used" means written or served: /outputs
+    requests bump the job directory mtime via touch_job().
+    """
+
+    def __init__(
+        self,
+        outputs_dir: Path,
+        is_active: Callable[[str], bool] | None = None,
+        retention_sec: int = OUTPUT_RETENTION_SEC,
+        quota_bytes: int = OUTPUT_QUOTA_BYTES,
+        intermediate_ttl_sec: int = OUTPUT_INTERMEDIATE_TTL_SEC,
+        keep_intermediates: bool = OUTPUT_KEEP_INTERMEDIATES,
+        interval_sec: int = OUTPUT_JANITOR_INTERVAL_SEC,
+    ) -> None:
+        self.outputs_dir = outputs_dir
+        self.is_active = is_active or (lambda _: False)
+        self.retention_sec = retention_sec
+        self.quota_bytes = quota_bytes
+        self.intermediate_ttl_sec = intermediate_ttl_sec
+        self.keep_intermediates = keep_intermediates
+        self.interval_sec = interval_sec
+        self._sweep_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_report: dict[str, Any] | None = None
+
+    def _job_dir(self, job_id: str) -> Path | None:
+        job_dir = (self.outputs_dir / job_id).resolve()
+        if job_dir.parent != self.outputs_dir.resolve() or not job_dir.is_dir():
+            return None
+        return job_dir
+
+    def touch_job(self, job_id: str) -> None:
+        job_dir = self._job_dir(job_id)
+        if job_dir is None:
+            return
+        try:
+            if time.time() - job_dir.stat().st_mtime < _TOUCH_MIN_INTERVAL_SEC:
+                return
+        except OSError:
+            return
+        touch(job_dir)
+
+    def _scan_job(self, job_dir: Path) -> dict[str, Any]:
+        categories: dict[str, int] = {}
+        inodes: dict[tuple[int, int], int] = {}
+        shared_bytes = 0
+        discardable_bytes = 0
+        file_count = 0
+        try:
+            last_used = job_dir.stat().st_mtime
+        except OSError:
+            last_used = 0.0
+        for dirpath, _, filenames in os.walk(job_dir):
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                try:
+                    stat = path.lstat()
+                except OSError:
+                    continue
+                category = _classify(path.relative_to(job_dir))
+                categories[category] = categories.get(category, 0) + stat.st_size
+                inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+                # Hardlinks into the asset/segment caches free nothing when deleted here.
+                if stat.st_nlink > 1:
+                    shared_bytes += stat.st_size
+                elif category in {"intermediates", "assets"}:
+                    discardable_bytes += stat.st_size
+                file_count += 1
+                last_used = max(last_used, stat.st_mtime)
+        total_bytes = sum(categories.values())
+        return {
+            "jobId": job_dir.name,
+            "totalBytes": total_bytes,
+            "exclusiveBytes": total_bytes - shared_bytes,
+            "sharedBytes": shared_bytes,
+            "fileCount": file_count,
+            "byCategory": categories,
+            "lastUsedAt": last_used,
+            "active": self.is_active(job_dir.name),
+            "_discardableBytes": discardable_bytes,
+            "_inodes": inodes,
+        }
+
+    @staticmethod
+    def _public(row: dict[str, Any]) -> dict[str, Any]:
+        return {key: value for key, value in row.items() if not key.startswith("_")}
+
+    def job_usage(self, job_id: str) -> dict[str, Any] | None:
+        job_dir = self._job_dir(job_id)
+        return self._public(self._scan_job(job_dir)) if job_dir is not None else None
+
+    def _scan(self) -> list[dict[str, Any]]:
+        if not self.outputs_dir.is_dir():
+            return []
+        return [self._scan_job(entry) for entry in sorted(self.outputs_dir.iterdir()) if entry.is_dir()]
+
+    def usage(self) -> dict[str, Any]:
+        rows = self._scan()
+        # Count each inode once: identical scenes within a job are hardlinked copies.
+        inodes: dict[tuple[int, int], int] = {}
+        for row in rows:
+            inodes.update(row["_inodes"])
+        return {
+            "totalBytes": sum(inodes.values()),
+            "quotaBytes": self.quota_bytes,
+            "retentionSec": self.retention_sec,
+            "jobCount": len(rows),
+            "jobs": [
+                self._public(row)
+                for row in sorted(rows, key=lambda item: item["lastUsedAt"], reverse=True)
+            ],
+            "lastSweep": self._last_report,
+        }
+
+    def discard_intermediates(self, job_dir: Path) -> int:
+        """
+        Delete a finished job's intermediates (segments, concat list, motion track, ...)
+        and the asset copies no cache links to. Assets hardlinked from the asset cache
+        stay: removing them frees nothing, and /preview-frame renders from them.
+        Returns the bytes actually freed.
+        """
+        if self.keep_intermediates or not job_dir.is_dir():
+            return 0
+        freed = 0
+        for entry in list(job_dir.iterdir()):
+            relative = entry.relative_to(job_dir)
+            if entry.is_file() and _classify(relative) == "intermediates":
+                stat = entry.stat()
+                if stat.st_nlink == 1:
+                    freed += stat.st_size
+                _remove(entry)
+        assets_dir = job_dir / "assets"
+        if assets_dir.is_dir():
+            for entry in list(assets_dir.iterdir()):
+                if not entry.is_file() or _classify(entry.relative_to(job_dir)) != "assets":
+                    continue
+                stat = entry.stat()
+                if stat.st_nlink == 1:
+                    freed += stat.st_size
+                    _remove(entry)
+        return freed
+
+    def after_success(self, job_dir: Path) -> None:
+        """Called once a job's final.mp4 is in place."""
+        OUTPUT_FREED_BYTES.labels(action="merged").inc(self.discard_intermediates(job_dir))
+
+    def plan(self, now: float | None = None) -> dict[str, Any]:
+        """What a sweep would delete right now, without deleting anything."""
+        now = time.time() if now is None else now
+        rows = self._scan()
+        inodes: dict[tuple[int, int], int] = {}
+        for row in rows:
+            inodes.update(row["_inodes"])
+        projected = sum(inodes.values())
+        actions: list[dict[str, Any]] = []
+        kept: list[dict[str, Any]] = []
+        for row in rows:
+            if row["active"]:
+                continue
+            idle_sec = now - row["lastUsedAt"]
+            if self.retention_sec and idle_sec > self.retention_sec:
+                actions.append(
+                    {
+                        "jobId": row["jobId"],
+                        "action": "expire",
+                        "reason": f"idle {idle_sec / 3600:.1f}h > retention {self.retention_sec / 3600:.1f}h",
+                        "bytes": row["exclusiveBytes"],
+                    }
+                )
+                projected -= row["exclusiveBytes"]
+                continue
+            # Shared assets stay in place, so only intermediates or unshared copies call for a pass.
+            stale = row["_discardableBytes"]
+            leftovers = stale or row["byCategory"].get("intermediates", 0)
+            if leftovers and not self.keep_intermediates and idle_sec > self.intermediate_ttl_sec:
+                actions.append(
+                    {
+                        "jobId": row["jobId"],
+                        "action": "intermediates",
+                        "reason": f"leftover intermediates idle {idle_sec / 60:.0f}m",
+                        "bytes": stale,
+                    }
+                )
+                projected -= stale
+                row = {**row, "exclusiveBytes": max(0, row["exclusiveBytes"] - stale)}
+            kept.append(row)
+        if self.quota_bytes and projected > self.quota_bytes:
+            for row in sorted(kept, key=lambda item: item["lastUsedAt"]):
+                if projected <= self.quota_bytes:
+                    break
+                actions.append(
+                    {
+                        "jobId": row["jobId"],
+                        "action": "evict",
+                        "reason": f"over quota ({projected} > {self.quota_bytes} bytes), least recently used",
+                        "bytes": row["exclusiveBytes"],
+                    }
+                )
+                projected -= row["exclusiveBytes"]
+        return {
+            "generatedAt": now,
+            "totalBytes": sum(inodes.values()),
+            "projectedBytes": max(0, projected),
+            "quotaBytes": self.quota_bytes,
+            "actions": actions,
+            "freedBytes": sum(action["bytes"] for action in actions),
+        }
+
+    def sweep(self, dry_run: bool = False) -> dict[str, Any]:
+        with self._sweep_lock:
+            report = self.plan()
+            report["dryRun"] = dry_run
+            if dry_run:
+                return report
+            for action in report["actions"]:
+                job_dir = self._job_dir(action["jobId"])
+                # Re-check: the job may have been resubmitted since the plan was made.
+                if job_dir is None or self.is_active(action["jobId"]):
+                    action["skipped"] = True
+                    continue
+                if action["action"] == "intermediates":
+                    self.discard_intermediates(job_dir)
+                else:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+                OUTPUT_FREED_BYTES.labels(action=action["action"]).inc(action["bytes"])
+            self._last_report = {
+                "at": report["generatedAt"],
+                "actions": len(report["actions"]),
+                "freedBytes": report["freedBytes"],
+            }
+            return report
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.sweep()
+            except Exception:  # pylint: disable=broad-except
+                continue
+
+    def start(self) -> None:
+        if self.interval_sec <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="output-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.cancellation import CancelToken, JobCancelled
+from app.env import env_int
+
+StageSetter = Callable[[str], None]
+JobWork = Callable[[StageSetter, CancelToken], Any]
+
+
+JOB_WORKER_CONCURRENCY = env_int("JOB_WORKER_CONCURRENCY", 1, 1, 16)
+JOB_QUEUE_MAX = env_int("JOB_QUEUE_MAX", 32, 1, 1000)
+JOB_HISTORY_LIMIT = env_int("JOB_HISTORY_LIMIT", 500, 10, 10000)
+
+ACTIVE_JOB_STATES = {"queued", "running"}
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class JobAlreadyActive(RuntimeError):
+    pass
+
+
+@dataclass
+class JobRecord:
+    jobId: str
+    state: str = "queued"
+    stage: str = "queued"
+    result: Any = None
+    error: str | None = None
+    createdAt: float = field(default_factory=time.time)
+    startedAt: float | None = None
+    finishedAt: float | None = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+    cancel: CancelToken = field(default_factory=CancelToken, repr=False)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "jobId": self.jobId,
+            "state": self.state,
+            "stage": self.stage,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.createdAt,
+            "startedAt": self.startedAt,
+            "finishedAt": self.finishedAt,
+        }
+
+
+class JobManager:
+    """
+    Bounded in-process render queue.
+    Requests enqueue work and return immediately; a fixed set of worker threads
+    drains the queue so bursts wait in line instead of holding HTTP connections.
+    """
+
+    def __init__(
+        self,
+        worker_count: int = JOB_WORKER_CONCURRENCY,
+        max_queue: int = JOB_QUEUE_MAX,
+        history_limit: int = JOB_HISTORY_LIMIT,
+    ) -> None:
+        self._worker_count = max(1, worker_count)
+        self._history_limit = max(1, history_limit)
+        self._queue: queue.Queue[tuple[JobRecord, JobWork]] = queue.Queue(maxsize=max(1, max_queue))
+        self._jobs: OrderedDict[str, JobRecord] = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers: list[threading.Thread] = []
+
+    def _ensure_workers(self) -> None:
+        if self._workers:
+            return
+        for idx in range(self._worker_count):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"render-job-{idx + 1}",
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _trim_history(self) -> None:
+        while len(self._jobs) > self._history_limit:
+            oldest_id = next(
+                (job_id for job_id, job in self._jobs.items() if job.state not in ACTIVE_JOB_STATES),
+                None,
+            )
+            if oldest_id is None:
+                return
+            self._jobs.pop(oldest_id, None)
+
+    def submit(self, job_id: str, work: JobWork) -> JobRecord:
+        with self._lock:
+            self._ensure_workers()
+            existing = self._jobs.get(job_id)
+            if existing is not None and existing.state in ACTIVE_JOB_STATES:
+                raise JobAlreadyActive(f"Job is already {existing.state}: {job_id}")
+            record = JobRecord(jobId=job_id)
+            try:
+                self._queue.put_nowait((record, work))
+            except queue.Full as exc:
+                raise JobQueueFull("Render queue is full; retry later.") from exc
+            self._jobs.pop(job_id, None)
+            self._jobs[job_id] = record
+            self._trim_history()
+            return record
+
+    def get(self, job_id: str) -> JobRecord | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def running_count(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.state == "running")
+
+    def cancel(self, job_id: str) -> JobRecord | None:
+        """
+        Cancel a queued or running job. Queued jobs are finished on the spot (the worker
+        skips them); running jobs get their ffmpeg process groups killed and finish as
+        "cancelled" once their work unwinds. Finished jobs are returned unchanged.
+        """
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None or record.state not in ACTIVE_JOB_STATES:
+                return record
+            if record.state == "queued":
+                record.state = "cancelled"
+                record.stage = "cancelled"
+                record.finishedAt = time.time()
+                record.done.set()
+            else:
+                record.stage = "cancelling"
+        record.cancel.cancel("cancelled by request")
+        return record
+
+    def _set_stage(self, record: JobRecord, stage: str) -> None:
+        with self._lock:
+            if not record.cancel.cancelled:
+                record.stage = stage
+
+    def _worker_loop(self) -> None:
+        while True:
+            record, work = self._queue.get()
+            try:
+                self._run_job(record, work)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, record: JobRecord, work: JobWork) -> None:
+        with self._lock:
+            if record.state == "cancelled":
+                return
+            record.state = "running"
+            record.startedAt = time.time()
+        try:
+            result = work(lambda stage: self._set_stage(record, stage), record.cancel)
+        except JobCancelled as exc:
+            with self._lock:
+                record.state = "cancelled"
+                record.stage = "cancelled"
+                record.error = str(exc)
+                record.finishedAt = time.time()
+        except Exception as exc:  # pylint: disable=broad-except
+            with self._lock:
+                record.state = "failed"
+                record.stage = "failed"
+                record.error = str(exc)
+                record.finishedAt = time.time()
+        else:
+            with self._lock:
+                record.state = "succeeded"
+                record.stage = "done"
+                record.result = result
+                record.finishedAt = time.time()
+        finally:
+            record.done.set()
@@ -1,24 +1,76 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-import shutil
+import queue
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
 from urllib.parse import urlparse
 
-import requests
-from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.ffmpeg_builder import probe_audio_duration, render_short_video
-from app.models import BuildVideoRequest, BuildVideoResponse
+from app import metrics, text_layout, title_overlay
+from app.asset_cache import asset_cache
+from app.asset_fetch import fetch_assets
+from app.audio_stage import audio_cache
+from app.batch import SharedAssets, clear_staging, run_batch
+from app.cancellation import CancelToken, JobCancelled
+from app.ffmpeg_governor import ffmpeg_governor
+from app.ffmpeg_builder import (
+    layout_title_template,
+    render_labels,
+    render_preview_frame,
+    render_short_video,
+)
+from app.font_index import font_index
+from app.image_prep import image_cache
+from app.janitor import OutputJanitor, discard_job_outputs
+from app.jobs import ACTIVE_JOB_STATES, JobAlreadyActive, JobManager, JobQueueFull, JobRecord, JobWork
+from app.media_probe import MediaProbeError, media_probe_cache, validate_media
+from app.models import (
+    BuildVideoRequest,
+    BuildVideoResponse,
+    BuildVideosRequest,
+    JobProgressResponse,
+    JobStatusResponse,
+    LayoutRequest,
+    LayoutResponse,
+    PreviewFrameRequest,
+)
+from app.progress import FINISHED_STATES, RenderProgress, progress_registry
+from app.segment_cache import segment_cache
 from app.subtitles import build_srt_from_cues, build_srt_from_text
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 OUTPUTS_DIR = BASE_DIR / "outputs"
+# Comment line sent on idle event streams so proxies do not close them.
+PROGRESS_KEEPALIVE_SEC = 15.0
+# How often a synchronous /build-video checks whether its client went away.
+DISCONNECT_POLL_SEC = 1.0
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Build (or load) the font index once so font resolution never probes disk per job.
+    font_index.load_or_build()
+    clear_staging()
+    output_janitor.start()
+    yield
+    output_janitor.stop()
+
 
-app = FastAPI(title="Shorts Video Engine", version="1.0.0")
+app = FastAPI(title="Shorts Video Engine", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -30,20 +82,45 @@ app.add_middleware(
 OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 app.mount("/outputs", StaticFiles(directory=str(OUTPUTS_DIR)), name="outputs")
 
+job_manager = JobManager()
+# Cancel tokens of synchronous /build-video renders, so DELETE /jobs/{id} reaches them too.
+_inline_builds: dict[str, CancelToken] = {}
+# Held across the active check and the claim in both /build-video and the queue, so a
+# job id renders in one place at a time; reentrant because _job_is_active takes it too.
+_inline_builds_lock = threading.RLock()
+
+
+def _job_is_active(job_id: str) -> bool:
+    record = job_manager.get(job_id)
+    if record is not None and record.state in ACTIVE_JOB_STATES:
+        return True
+    with _inline_builds_lock:
+        return job_id in _inline_builds
+
+
+def _submit_queued(job_id: str, work: JobWork) -> JobRecord:
+    """job_manager.submit that also refuses a job id a /build-video render is using."""
+    with _inline_builds_lock:
+        if _job_is_active(job_id):
+            raise JobAlreadyActive(f"Job is already active: {job_id}")
+        return job_manager.submit(job_id, work)
+
 
-def _download_to_path(source: str, destination: Path) -> None:
-    if source.startswith("http://") or source.startswith("https://"):
-        response = requests.get(source, timeout=60)
-        if response.status_code >= 400:
-            raise RuntimeError(f"Failed to download asset: {source}")
-        destination.write_bytes(response.content)
-        return
+output_janitor = OutputJanitor(OUTPUTS_DIR, is_active=_job_is_active)
 
-    parsed = urlparse(source)
-    local_candidate = Path(parsed.path if parsed.scheme == "file" else source)
-    if not local_candidate.exists():
-        raise RuntimeError(f"Local asset does not exist: {source}")
-    shutil.copy(local_candidate, destination)
+metrics.JOB_QUEUE_DEPTH.set_function(job_manager.queue_depth)
+metrics.FFMPEG_PROCESSES.labels(state="running").set_function(lambda: ffmpeg_governor.stats()["running"])
+metrics.FFMPEG_PROCESSES.labels(state="waiting").set_function(lambda: ffmpeg_governor.stats()["waiting"])
+
+
+@app.middleware("http")
+async def touch_served_outputs(request: Request, call_next: Callable[[Request], Any]) -> Any:
+    response = await call_next(request)
+    # Serving a job's files counts as use for the janitor's age/LRU policies.
+    path_parts = request.url.path.split("/")
+    if len(path_parts) > 3 and path_parts[1] == "outputs" and response.status_code < 400:
+        output_janitor.touch_job(path_parts[2])
+    return response
 
 
 @app.get("/health")
@@ -51,79 +128,363 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/build-video", response_model=BuildVideoResponse)
-def build_video(
-    payload: BuildVideoRequest,
-    request: Request,
-    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
-) -> BuildVideoResponse:
+@app.get("/metrics")
+def prometheus_metrics() -> Response:
+    # Aggregates only (no job ids or URLs), so scrapers need no engine secret, like /health.
+    content, content_type = metrics.exposition()
+    return Response(content=content, media_type=content_type)
+
+
+def _require_engine_secret(provided_secret: str | None) -> None:
     expected_secret = os.getenv("VIDEO_ENGINE_SHARED_SECRET", "").strip()
-    if expected_secret and x_video_engine_secret != expected_secret:
+    if expected_secret and provided_secret != expected_secret:
         raise HTTPException(status_code=401, detail="Unauthorized video engine request")
 
+
+def _public_base_url(request: Request) -> str:
+    return os.getenv("PUBLIC_BASE_URL", str(request.base_url).rstrip("/"))
+
+
+def _noop_stage(_: str) -> None:
+    return None
+
+
+def _metric_labels(payload: BuildVideoRequest) -> dict[str, str]:
+    return render_labels(
+        payload.renderOptions.overlay.model_dump() if payload.renderOptions is not None else None,
+        len(payload.imageUrls),
+        payload.renderOptions.profile if payload.renderOptions is not None else "final",
+    )
+
+
+def _fetch_job_assets(
+    payload: BuildVideoRequest,
+    assets_dir: Path,
+    reuse_placed: bool = False,
+    prefetched: dict[str, Path] | None = None,
+) -> tuple[list[Path], Path, dict[str, Any]]:
+    local_images: list[Path] = []
+    for idx, image_url in enumerate(payload.imageUrls, start=1):
+        image_ext = Path(urlparse(image_url).path).suffix or ".png"
+        local_images.append(assets_dir / f"image-{idx}{image_ext}")
+
+    tts_ext = Path(urlparse(payload.ttsPath).path).suffix or ".mp3"
+    tts_path = assets_dir / f"tts{tts_ext}"
+    # Images and narration download together; stage latency is the slowest asset.
+    fetch_report = fetch_assets(
+        [
+            *zip(payload.imageUrls, local_images),
+            (payload.ttsPath, tts_path),
+        ],
+        reuse_placed=reuse_placed,
+        prefetched=prefetched,
+    )
+    return local_images, tts_path, fetch_report
+
+
+def _probe_job_inputs(
+    payload: BuildVideoRequest,
+    local_images: list[Path],
+    tts_path: Path,
+) -> dict[str, dict[str, Any]]:
+    """Probe summaries by source; raises MediaProbeError before anything is encoded."""
+    return validate_media(
+        [
+            *((image_url, path, "image") for image_url, path in zip(payload.imageUrls, local_images)),
+            (payload.ttsPath, tts_path, "audio"),
+        ]
+    )
+
+
+def _write_subtitles(
+    payload: BuildVideoRequest,
+    duration: float,
+    srt_path: Path,
+) -> Path | None:
+    words_per_caption = (
+        payload.renderOptions.subtitle.wordsPerCaption
+        if payload.renderOptions is not None
+        else 5
+    )
+    max_chars_per_caption = (
+        payload.renderOptions.subtitle.maxCharsPerCaption
+        if payload.renderOptions is not None
+        else 18
+    )
+    subtitle_delay_ms = (
+        payload.renderOptions.subtitle.subtitleDelayMs
+        if payload.renderOptions is not None
+        else 180
+    )
+    manual_cues = (
+        payload.renderOptions.subtitle.manualCues
+        if payload.renderOptions is not None
+        else []
+    )
+    if manual_cues:
+        srt_text = build_srt_from_cues(
+            [cue.model_dump() for cue in manual_cues],
+            duration,
+        )
+    else:
+        srt_text = build_srt_from_text(
+            payload.subtitlesText,
+            duration,
+            words_per_caption=words_per_caption,
+            max_chars_per_caption=max_chars_per_caption,
+            subtitle_delay_ms=subtitle_delay_ms,
+        )
+    if not srt_text.strip():
+        return None
+    srt_path.write_text(srt_text, encoding="utf-8")
+    return srt_path
+
+
+def _execute_build(
+    payload: BuildVideoRequest,
+    base_url: str,
+    set_stage: Callable[[str], None] = _noop_stage,
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+    shared: SharedAssets | None = None,
+) -> BuildVideoResponse:
+    cancel = cancel or CancelToken()
+    labels = _metric_labels(payload)
     job_dir = OUTPUTS_DIR / payload.jobId
     assets_dir = job_dir / "assets"
     assets_dir.mkdir(parents=True, exist_ok=True)
 
-    try:
-        local_images: list[Path] = []
-        for idx, image_url in enumerate(payload.imageUrls, start=1):
-            image_ext = Path(urlparse(image_url).path).suffix or ".png"
-            image_path = assets_dir / f"image-{idx}{image_ext}"
-            _download_to_path(image_url, image_path)
-            local_images.append(image_path)
-
-        tts_ext = Path(urlparse(payload.ttsPath).path).suffix or ".mp3"
-        tts_path = assets_dir / f"tts{tts_ext}"
-        _download_to_path(payload.ttsPath, tts_path)
-
-        # Keep subtitles and video synced to the actual narration audio duration.
-        duration = probe_audio_duration(tts_path)
-        words_per_caption = (
-            payload.renderOptions.subtitle.wordsPerCaption
+    set_stage("downloading")
+    stage_started = time.monotonic()
+    local_images, tts_path, fetch_report = _fetch_job_assets(
+        payload,
+        assets_dir,
+        prefetched=shared.paths if shared is not None else None,
+    )
+    metrics.observe_stage("download", time.monotonic() - stage_started, labels)
+    metrics.observe_assets(fetch_report["assets"])
+
+    # Keep subtitles and video synced to the actual narration audio duration.
+    cancel.raise_if_cancelled()
+    set_stage("probing")
+    stage_started = time.monotonic()
+    inputs = _probe_job_inputs(payload, local_images, tts_path)
+    duration = max(1.0, float(inputs[payload.ttsPath]["durationSec"]))
+    metrics.observe_stage("probe", time.monotonic() - stage_started, labels)
+    srt_path = _write_subtitles(payload, duration, assets_dir / "subtitles.srt")
+
+    cancel.raise_if_cancelled()
+    set_stage("rendering")
+    stage_started = time.monotonic()
+    output_path, ffmpeg_steps, render_stats = render_short_video(
+        image_paths=local_images,
+        tts_path=tts_path,
+        subtitle_path=srt_path,
+        output_dir=job_dir,
+        use_sfx=payload.useSfx,
+        target_duration_sec=duration,
+        subtitle_options=(
+            payload.renderOptions.subtitle.model_dump()
             if payload.renderOptions is not None
-            else 5
-        )
-        max_chars_per_caption = (
-            payload.renderOptions.subtitle.maxCharsPerCaption
+            else None
+        ),
+        overlay_options=(
+            payload.renderOptions.overlay.model_dump()
             if payload.renderOptions is not None
-            else 18
-        )
-        subtitle_delay_ms = (
-            payload.renderOptions.subtitle.subtitleDelayMs
+            else None
+        ),
+        title_text=payload.titleText,
+        render_mode=(
+            payload.renderOptions.renderMode
             if payload.renderOptions is not None
-            else 180
-        )
-        manual_cues = (
-            payload.renderOptions.subtitle.manualCues
+            else "segments"
+        ),
+        motion_engine=(
+            payload.renderOptions.motionEngine
+            if payload.renderOptions is not None
+            else "zoompan"
+        ),
+        profile=(
+            payload.renderOptions.profile
+            if payload.renderOptions is not None
+            else "final"
+        ),
+        progress=progress,
+        cancel=cancel,
+        final_slices=(
+            payload.renderOptions.finalEncodeSlices
             if payload.renderOptions is not None
-            else []
+            else None
+        ),
+        sfx_path=shared.sfx_path if shared is not None else None,
+        renditions=(
+            [rendition.model_dump() for rendition in payload.renderOptions.renditions]
+            if payload.renderOptions is not None
+            else None
+        ),
+    )
+    metrics.observe_render(duration, time.monotonic() - stage_started, labels)
+    for timing in render_stats.get("segmentTimings", []):
+        metrics.observe_stage("segment_encode", timing["runSec"], labels)
+    for stage, seconds in render_stats.get("stageSec", {}).items():
+        metrics.observe_stage(stage, seconds, labels)
+    output_janitor.after_success(job_dir)
+
+    output_url = f"{base_url}/outputs/{payload.jobId}/{output_path.name}"
+    return BuildVideoResponse(
+        outputPath=str(output_path),
+        outputUrl=output_url,
+        srtPath=str(srt_path) if srt_path is not None else "",
+        ffmpegSteps=ffmpeg_steps,
+        profile=render_stats.get("profile", "final"),
+        segmentTimings=render_stats.get("segmentTimings", []),
+        segmentsReused=render_stats.get("segmentsReused", 0),
+        segmentsRendered=render_stats.get("segmentsRendered", 0),
+        assetDownloadSec=fetch_report["totalSec"],
+        assets=fetch_report["assets"],
+        renditions=[
+            {
+                **rendition,
+                "outputPath": str(rendition["path"]),
+                "outputUrl": f"{base_url}/outputs/{payload.jobId}/{rendition['path'].name}",
+            }
+            for rendition in render_stats.get("renditions", [])
+        ],
+    )
+
+
+def _tracked_build(
+    payload: BuildVideoRequest,
+    base_url: str,
+    progress: RenderProgress,
+    set_stage: Callable[[str], None] = _noop_stage,
+    cancel: CancelToken | None = None,
+    shared: SharedAssets | None = None,
+) -> BuildVideoResponse:
+    def _set_stage(stage: str) -> None:
+        set_stage(stage)
+        progress.set_phase(stage)
+
+    started = time.monotonic()
+    outcome = "failed"
+    metrics.JOBS_IN_FLIGHT.inc()
+    try:
+        result = _execute_build(payload, base_url, _set_stage, progress, cancel, shared)
+        outcome = "succeeded"
+    except JobCancelled:
+        outcome = "cancelled"
+        discard_job_outputs(OUTPUTS_DIR / payload.jobId)
+        raise
+    finally:
+        metrics.JOBS_IN_FLIGHT.dec()
+        metrics.JOBS.labels(outcome=outcome).inc()
+        metrics.observe_stage("total", time.monotonic() - started, _metric_labels(payload))
+        progress.close(outcome)
+    return result
+
+
+def _sse_event(event: str, data: dict[str, Any], event_id: int | None = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _progress_events(progress: RenderProgress) -> Iterator[str]:
+    snapshot = progress.snapshot()
+    yield _sse_event("progress", snapshot, snapshot["version"])
+    while snapshot["state"] not in FINISHED_STATES:
+        changed = progress.wait_for_change(snapshot["version"], PROGRESS_KEEPALIVE_SEC)
+        if changed is None:
+            yield ": keepalive\n\n"
+            continue
+        snapshot = changed
+        yield _sse_event("progress", snapshot, snapshot["version"])
+    yield _sse_event("end", {"jobId": snapshot["jobId"], "state": snapshot["state"]})
+
+
+def _batch_lines(events: queue.Queue[str | None]) -> Iterator[str]:
+    while True:
+        try:
+            line = events.get(timeout=PROGRESS_KEEPALIVE_SEC)
+        except queue.Empty:
+            yield '{"event":"keepalive"}\n'
+            continue
+        if line is None:
+            return
+        yield line
+
+
+def _job_status_response(record: JobRecord) -> JobStatusResponse:
+    return JobStatusResponse(**record.snapshot())
+
+
+@app.post("/build-video", response_model=BuildVideoResponse)
+async def build_video(
+    payload: BuildVideoRequest,
+    request: Request,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> BuildVideoResponse:
+    _require_engine_secret(x_video_engine_secret)
+    cancel = CancelToken()
+    with _inline_builds_lock:
+        if _job_is_active(payload.jobId):
+            raise HTTPException(status_code=409, detail=f"Job is already active: {payload.jobId}")
+        _inline_builds[payload.jobId] = cancel
+    # Registered only once accepted, so a rejected duplicate never hides the active job's progress.
+    progress = progress_registry.register(RenderProgress(payload.jobId))
+    build = asyncio.ensure_future(
+        run_in_threadpool(
+            _tracked_build,
+            payload,
+            _public_base_url(request),
+            progress,
+            _noop_stage,
+            cancel,
         )
-        if manual_cues:
-            srt_text = build_srt_from_cues(
-                [cue.model_dump() for cue in manual_cues],
-                duration,
-            )
-        else:
-            srt_text = build_srt_from_text(
-                payload.subtitlesText,
-                duration,
-                words_per_caption=words_per_caption,
-                max_chars_per_caption=max_chars_per_caption,
-                subtitle_delay_ms=subtitle_delay_ms,
-            )
-        srt_path: Path | None = None
-        if srt_text.strip():
-            srt_path = assets_dir / "subtitles.srt"
-            srt_path.write_text(srt_text, encoding="utf-8")
-
-        output_path, ffmpeg_steps = render_short_video(
+    )
+    try:
+        # A caller that gives up (timeout, closed tab) should not keep the encode running.
+        while not build.done():
+            await asyncio.wait({build}, timeout=DISCONNECT_POLL_SEC)
+            if not build.done() and not cancel.cancelled and await request.is_disconnected():
+                cancel.cancel("client disconnected")
+        return build.result()
+    except JobCancelled as exc:
+        raise HTTPException(status_code=499, detail=str(exc)) from exc
+    except MediaProbeError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except Exception as exc:  # pylint: disable=broad-except
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    finally:
+        with _inline_builds_lock:
+            if _inline_builds.get(payload.jobId) is cancel:
+                _inline_builds.pop(payload.jobId, None)
+
+
+@app.post("/preview-frame")
+def preview_frame(
+    payload: PreviewFrameRequest,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> Response:
+    _require_engine_secret(x_video_engine_secret)
+    job_dir = OUTPUTS_DIR / payload.jobId
+    assets_dir = job_dir / "assets"
+    assets_dir.mkdir(parents=True, exist_ok=True)
+    preview_dir = job_dir / "preview"
+    try:
+        # Scrubbing hits the same job repeatedly; assets placed earlier are reused as-is.
+        local_images, tts_path, _ = _fetch_job_assets(payload, assets_dir, reuse_placed=True)
+        inputs = _probe_job_inputs(payload, local_images, tts_path)
+        duration = max(1.0, float(inputs[payload.ttsPath]["durationSec"]))
+        preview_dir.mkdir(parents=True, exist_ok=True)
+        srt_path = _write_subtitles(payload, duration, preview_dir / "subtitles.srt")
+        image_path, frame_info = render_preview_frame(
             image_paths=local_images,
-            tts_path=tts_path,
+            duration_sec=duration,
             subtitle_path=srt_path,
-            output_dir=job_dir,
-            use_sfx=payload.useSfx,
-            target_duration_sec=duration,
+            output_dir=preview_dir,
+            timestamp_sec=payload.timestampSec,
             subtitle_options=(
                 payload.renderOptions.subtitle.model_dump()
                 if payload.renderOptions is not None
@@ -135,15 +496,288 @@ def build_video(
                 else None
             ),
             title_text=payload.titleText,
+            profile=(
+                payload.renderOptions.profile
+                if payload.renderOptions is not None
+                else "final"
+            ),
+            image_format=str(payload.imageFormat or "png").strip().lower(),
         )
-
-        base_url = os.getenv("PUBLIC_BASE_URL", str(request.base_url).rstrip("/"))
-        output_url = f"{base_url}/outputs/{payload.jobId}/{output_path.name}"
-        return BuildVideoResponse(
-            outputPath=str(output_path),
-            outputUrl=output_url,
-            srtPath=str(srt_path) if srt_path is not None else "",
-            ffmpegSteps=ffmpeg_steps,
-        )
+        content = image_path.read_bytes()
+    except MediaProbeError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
     except Exception as exc:  # pylint: disable=broad-except
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return Response(
+        content=content,
+        media_type="image/png" if image_path.suffix == ".png" else "image/jpeg",
+        headers={
+            "X-Preview-Scene": str(frame_info["sceneIndex"]),
+            "X-Preview-Frame": str(frame_info["frameIndex"]),
+            "X-Preview-Timestamp": str(frame_info["timestampSec"]),
+        },
+    )
+
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202)
+def submit_job(
+    payload: BuildVideoRequest,
+    request: Request,
+    response: Response,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> JobStatusResponse:
+    _require_engine_secret(x_video_engine_secret)
+    base_url = _public_base_url(request)
+    progress = RenderProgress(payload.jobId)
+    try:
+        record = _submit_queued(
+            payload.jobId,
+            lambda set_stage, cancel: _tracked_build(payload, base_url, progress, set_stage, cancel),
+        )
+    except JobAlreadyActive as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except JobQueueFull as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": "15"},
+        ) from exc
+    # Registered only once accepted, so a rejected duplicate never hides the active job's progress.
+    progress_registry.register(progress)
+    response.headers["Location"] = f"/jobs/{payload.jobId}"
+    return _job_status_response(record)
+
+
+@app.post("/build-videos")
+def build_videos(
+    payload: BuildVideosRequest,
+    request: Request,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> StreamingResponse:
+    """
+    Render many /build-video payloads as one batch. Every distinct image and narration
+    (and the SFX bed) is fetched and probed once and linked into each job that uses
+    it; renders go through the job queue as it has room (each job is also visible at
+    /jobs/{id}). The response is NDJSON: an "accepted" line with the asset report,
+    one "job" line per job as it finishes, then a "done" line with outcome counts.
+    A client that disconnects leaves the batch running.
+    """
+    _require_engine_secret(x_video_engine_secret)
+    job_ids = [job.jobId for job in payload.jobs]
+    duplicates = sorted({job_id for job_id in job_ids if job_ids.count(job_id) > 1})
+    if duplicates:
+        raise HTTPException(status_code=422, detail=f"Duplicate jobId in batch: {', '.join(duplicates)}")
+    base_url = _public_base_url(request)
+    batch_id = uuid.uuid4().hex
+    events: queue.Queue[str | None] = queue.Queue()
+
+    def _emit(event: dict[str, Any]) -> None:
+        events.put(json.dumps(jsonable_encoder(event), separators=(",", ":")) + "\n")
+
+    def _submit(job: BuildVideoRequest, shared: SharedAssets) -> JobRecord:
+        progress = RenderProgress(job.jobId)
+        record = _submit_queued(
+            job.jobId,
+            lambda set_stage, cancel: _tracked_build(job, base_url, progress, set_stage, cancel, shared),
+        )
+        progress_registry.register(progress)
+        return record
+
+    def _run() -> None:
+        try:
+            run_batch(batch_id, payload.jobs, _submit, _emit)
+        finally:
+            events.put(None)
+
+    threading.Thread(target=_run, name=f"batch-{batch_id[:8]}", daemon=True).start()
+    return StreamingResponse(
+        _batch_lines(events),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Batch-Id": batch_id},
+    )
+
+
+@app.get("/asset-cache")
+def asset_cache_stats(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    return asset_cache.stats()
+
+
+@app.get("/admin/ffmpeg")
+def ffmpeg_governor_stats(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    return ffmpeg_governor.stats()
+
+
+@app.get("/admin/media-probe")
+def media_probe_stats(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    return media_probe_cache.stats()
+
+
+@app.get("/admin/render-caches")
+def render_cache_stats(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    return {
+        "segments": segment_cache.stats(),
+        "audio": audio_cache.stats(),
+        "images": image_cache.stats(),
+        "titleOverlays": title_overlay.stats(),
+    }
+
+
+@app.get("/admin/outputs")
+def outputs_usage(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    return output_janitor.usage()
+
+
+@app.get("/admin/outputs/{job_id}")
+def job_output_usage(
+    job_id: str,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    usage = output_janitor.job_usage(job_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail=f"No outputs for job: {job_id}")
+    return usage
+
+
+@app.get("/admin/janitor")
+def janitor_plan(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    """Dry run: what the next sweep would delete and why."""
+    _require_engine_secret(x_video_engine_secret)
+    return output_janitor.sweep(dry_run=True)
+
+
+@app.post("/admin/janitor/run")
+def janitor_run(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    return output_janitor.sweep()
+
+
+@app.get("/admin/fonts")
+def font_index_view(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    return {
+        **font_index.summary(),
+        "coverage": font_index.coverage(),
+    }
+
+
+@app.post("/admin/fonts/rebuild")
+def rebuild_font_index(
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> dict[str, Any]:
+    _require_engine_secret(x_video_engine_secret)
+    summary = font_index.rebuild()
+    text_layout.clear_caches()
+    return summary
+
+
+@app.post("/layout", response_model=LayoutResponse)
+def layout_templates(
+    payload: LayoutRequest,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> LayoutResponse:
+    """Title line breaks computed by the same glyph-metric layout the renderer uses."""
+    _require_engine_secret(x_video_engine_secret)
+    return LayoutResponse(
+        templates=[layout_title_template(template.model_dump()) for template in payload.templates]
+    )
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job(
+    job_id: str,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> JobStatusResponse:
+    _require_engine_secret(x_video_engine_secret)
+    record = job_manager.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return _job_status_response(record)
+
+
+@app.delete("/jobs/{job_id}", response_model=JobStatusResponse, status_code=202)
+def cancel_job(
+    job_id: str,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> JobStatusResponse:
+    """
+    Cancel a queued or running render: in-flight ffmpeg process groups are killed,
+    remaining segments are skipped and the job's intermediates are removed.
+    """
+    _require_engine_secret(x_video_engine_secret)
+    record = job_manager.cancel(job_id)
+    if record is not None:
+        if record.state in {"succeeded", "failed"}:
+            raise HTTPException(status_code=409, detail=f"Job already {record.state}: {job_id}")
+        if record.state == "cancelled" and record.startedAt is None:
+            # Never started, so nothing else will close its progress stream.
+            progress = progress_registry.get(job_id)
+            if progress is not None and not progress.finished:
+                progress.close("cancelled")
+            discard_job_outputs(OUTPUTS_DIR / job_id)
+        return _job_status_response(record)
+
+    with _inline_builds_lock:
+        cancel = _inline_builds.get(job_id)
+    if cancel is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    cancel.cancel("cancelled by request")
+    progress = progress_registry.get(job_id)
+    return JobStatusResponse(
+        jobId=job_id,
+        state="running",
+        stage="cancelling",
+        createdAt=progress.createdAt if progress is not None else 0.0,
+    )
+
+
+def _require_progress(job_id: str) -> RenderProgress:
+    progress = progress_registry.get(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail=f"No progress for job: {job_id}")
+    return progress
+
+
+@app.get("/jobs/{job_id}/progress", response_model=JobProgressResponse)
+def get_job_progress(
+    job_id: str,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> JobProgressResponse:
+    _require_engine_secret(x_video_engine_secret)
+    return JobProgressResponse(**_require_progress(job_id).snapshot())
+
+
+@app.get("/jobs/{job_id}/events")
+def stream_job_progress(
+    job_id: str,
+    x_video_engine_secret: str | None = Header(default=None, alias="X-Video-Engine-Secret"),
+) -> StreamingResponse:
+    """Server-Sent Events: a progress event per ffmpeg update, then one end event."""
+    _require_engine_secret(x_video_engine_secret)
+    progress = _require_progress(job_id)
+    return StreamingResponse(
+        _progress_events(progress),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
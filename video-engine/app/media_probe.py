@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from app.asset_cache import file_sha256
+from app.env import env_int
+
+
+FFPROBE_BIN = os.getenv("FFPROBE_BIN", "ffprobe")
+FFPROBE_CMD_TIMEOUT_SEC = env_int("FFPROBE_CMD_TIMEOUT_SEC", 60, 10, 60 * 60)
+# Probe summaries kept in memory, keyed by content hash; 0 probes every time.
+MEDIA_PROBE_CACHE_SIZE = env_int("MEDIA_PROBE_CACHE_SIZE", 4096)
+# Parallel ffprobe calls when a job's inputs are validated.
+MEDIA_PROBE_CONCURRENCY = env_int("MEDIA_PROBE_CONCURRENCY", 8, 1)
+# Input limits checked before any encode starts.
+MEDIA_MIN_IMAGE_SIDE = env_int("MEDIA_MIN_IMAGE_SIDE", 16, 1)
+MEDIA_MAX_IMAGE_PIXELS = env_int("MEDIA_MAX_IMAGE_PIXELS", 64_000_000)
+MEDIA_MAX_NARRATION_SEC = env_int("MEDIA_MAX_NARRATION_SEC", 15 * 60)
+
+
+class MediaProbeError(RuntimeError):
+    def __init__(self, failures: list[dict[str, Any]]) -> None:
+        self.failures = failures
+        details = "; ".join(f"{row['source']}: {row['error']}" for row in failures)
+        super().__init__(f"Unusable input(s) ({len(failures)}): {details}")
+
+
+def _float_or_none(value: Any) -> float | None:
+    try:
+        parsed = float(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed == parsed else None
+
+
+def _int_or_none(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _summarize(raw: dict[str, Any]) -> dict[str, Any]:
+    """Reduce ffprobe -show_format -show_streams JSON to the fields the renderer uses."""
+    media_format = raw.get("format") or {}
+    streams = raw.get("streams") or []
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+    summary: dict[str, Any] = {
+        "formatName": media_format.get("format_name"),
+        "durationSec": _float_or_none(media_format.get("duration")),
+        "video": None,
+        "audio": None,
+    }
+    if video is not None:
+        summary["video"] = {
+            "codec": video.get("codec_name"),
+            "width": _int_or_none(video.get("width")) or 0,
+            "height": _int_or_none(video.get("height")) or 0,
+            "pixFmt": video.get("pix_fmt"),
+            "frames": _int_or_none(video.get("nb_read_frames")),
+        }
+    if audio is not None:
+        audio_sec = _float_or_none(audio.get("duration"))
+        summary["audio"] = {
+            "codec": audio.get("codec_name"),
+            "sampleRate": _int_or_none(audio.get("sample_rate")),
+            "channels": _int_or_none(audio.get("channels")),
+            "durationSec": audio_sec,
+        }
+        if audio_sec is not None:
+            summary["durationSec"] = audio_sec
+    return summary
+
+
+def _run_ffprobe(path: Path, kind: str) -> dict[str, Any]:
+    command = [FFPROBE_BIN, "-v", "error", "-show_format", "-show_streams", "-of", "json"]
+    if kind == "image":
+        # Decodes the single frame, so truncated or mislabelled files fail here.
+        command.append("-count_frames")
+    command.append(str(path))
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+            timeout=FFPROBE_CMD_TIMEOUT_SEC,
+        )
+    except subprocess.TimeoutExpired as exc:
+        raise ValueError(f"ffprobe timed out after {FFPROBE_CMD_TIMEOUT_SEC}s") from exc
+    stderr_text = completed.stderr.decode("utf-8", errors="replace").strip()
+    if completed.returncode != 0:
+        raise ValueError(stderr_text.splitlines()[-1] if stderr_text else f"ffprobe rc={completed.returncode}")
+    try:
+        raw = json.loads(completed.stdout.decode("utf-8", errors="replace") or "{}")
+    except ValueError as exc:
+        raise ValueError("ffprobe returned invalid JSON") from exc
+    if not raw.get("streams"):
+        raise ValueError(stderr_text.splitlines()[-1] if stderr_text else "no media streams")
+    return raw
+
+
+class MediaProbeCache:
+    """
+    In-memory LRU of probe summaries keyed by (kind, content hash), so an asset shared
+    by many jobs, or seen again by the renderer after the API checked it, costs one
+    ffprobe per process.
+    """
+
+    def __init__(self, max_entries: int = MEDIA_PROBE_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {"hits": 0, "misses": 0}
+
+    def probe(self, path: Path, kind: str = "video", use_cache: bool = True) -> dict[str, Any]:
+        """Probe summary of path; raises ValueError when ffprobe cannot read it."""
+        if not path.exists():
+            raise ValueError("file not found")
+        if not use_cache or self.max_entries <= 0:
+            return _summarize(_run_ffprobe(path, kind))
+        key = f"{kind}:{file_sha256(path)}"
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return cached
+            self._counters["misses"] += 1
+        summary = _summarize(_run_ffprobe(path, kind))
+        with self._lock:
+            self._entries[key] = summary
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return summary
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "maxEntries": self.max_entries}
+
+
+media_probe_cache = MediaProbeCache()
+
+
+def probe_media(path: Path, kind: str = "video", use_cache: bool = True) -> dict[str, Any]:
+    return media_probe_cache.probe(path, kind, use_cache)
+
+
+def check_media(summary: dict[str, Any], kind: str) -> str | None:
+    """Why a probed asset cannot be rendered as kind, or None when it can."""
+    if kind == "image":
+        video = summary["video"]
+        if video is None:
+            return "no image stream"
+        if not video["frames"] or not video["width"] or not video["height"]:
+            return f"image does not decode ({video['codec'] or 'unknown codec'})"
+        if min(video["width"], video["height"]) < MEDIA_MIN_IMAGE_SIDE:
+            return f"image too small ({video['width']}x{video['height']}, min side {MEDIA_MIN_IMAGE_SIDE})"
+        if MEDIA_MAX_IMAGE_PIXELS and video["width"] * video["height"] > MEDIA_MAX_IMAGE_PIXELS:
+            return f"image too large ({video['width']}x{video['height']})"
+        return None
+    if kind == "audio":
+        if summary["audio"] is None:
+            return "no audio stream"
+        duration = summary["durationSec"]
+        if not duration or duration <= 0:
+            return "audio has no duration"
+        if MEDIA_MAX_NARRATION_SEC and duration > MEDIA_MAX_NARRATION_SEC:
+            return f"audio too long ({duration:.1f}s, max {MEDIA_MAX_NARRATION_SEC}s)"
+        return None
+    video = summary["video"]
+    if video is None or not video["width"] or not video["height"]:
+        return "no video stream"
+    return None
+
+
+def validate_media(assets: list[tuple[str, Path, str]]) -> dict[str, dict[str, Any]]:
+    """
+    Probe and check (source, local path, kind) assets in parallel; returns the probe
+    summary per source. Raises MediaProbeError listing every unusable asset, so a
+    bad input fails the job before any encode starts.
+    """
+    unique = list({source: (path, kind) for source, path, kind in assets}.items())
+    if not unique:
+        return {}
+
+    def _check(item: tuple[str, tuple[Path, str]]) -> tuple[str, dict[str, Any] | None, str | None]:
+        source, (path, kind) = item
+        try:
+            summary = probe_media(path, kind)
+        except ValueError as exc:
+            return source, None, str(exc)
+        return source, summary, check_media(summary, kind)
+
+    worker_count = max(1, min(MEDIA_PROBE_CONCURRENCY, len(unique)))
+    if worker_count == 1:
+        results = [_check(item) for item in unique]
+    else:
+        with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="media-probe") as executor:
+            results = list(executor.map(_check, unique))
+    failures = [{"source": source, "error": error} for source, _, error in results if error]
+    if failures:
+        raise MediaProbeError(failures)
+    return {source: summary for source, summary, _ in results if summary is not None}
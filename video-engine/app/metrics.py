@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+
+# What drives render cost; every per-job series carries these labels.
+RENDER_LABELS = ("fps", "layout", "motion_preset", "image_count")
+
+STAGE_SECONDS = Histogram(
+    "video_engine_stage_seconds",
+    "Wall time per render stage (download, probe, segment_encode, motion_track, final_merge, single_pass, total).",
+    ("stage", *RENDER_LABELS),
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1200),
+)
+REALTIME_RATIO = Histogram(
+    "video_engine_realtime_ratio",
+    "Rendered video seconds per wall-clock second of the rendering stage.",
+    RENDER_LABELS,
+    buckets=(0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 4, 8, 16),
+)
+RENDERED_VIDEO_SECONDS = Counter(
+    "video_engine_rendered_video_seconds",
+    "Seconds of video rendered.",
+    RENDER_LABELS,
+)
+RENDER_WALL_SECONDS = Counter(
+    "video_engine_render_wall_seconds",
+    "Wall-clock seconds spent in the rendering stage.",
+    RENDER_LABELS,
+)
+JOBS = Counter(
+    "video_engine_jobs",
+    "Finished render jobs by outcome.",
+    ("outcome",),
+)
+JOBS_IN_FLIGHT = Gauge(
+    "video_engine_jobs_in_flight",
+    "Render jobs currently executing (queued jobs and inline /build-video calls).",
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "video_engine_job_queue_depth",
+    "Jobs waiting in the render queue.",
+)
+FFMPEG_PROCESSES = Gauge(
+    "video_engine_ffmpeg_processes",
+    "ffmpeg processes admitted by the governor or waiting for a slot.",
+    ("state",),
+)
+FFMPEG_ERRORS = Counter(
+    "video_engine_ffmpeg_errors",
+    "ffmpeg commands that failed or timed out, by stage label.",
+    ("label", "reason"),
+)
+OUTPUT_FREED_BYTES = Counter(
+    "video_engine_output_freed_bytes",
+    "Bytes removed from the outputs directory by the janitor, by action.",
+    ("action",),
+)
+ASSET_BYTES = Counter(
+    "video_engine_asset_bytes",
+    "Bytes of job assets placed, by how they were satisfied (downloaded, cache hit, local, ...).",
+    ("status",),
+)
+
+_NUMBERED_LABEL_PATTERN = re.compile(r"-\d+$")
+
+
+def command_label(label: str) -> str:
+    """segment-7 -> segment, so per-scene labels do not explode series cardinality."""
+    return _NUMBERED_LABEL_PATTERN.sub("", label)
+
+
+def record_ffmpeg_error(label: str, reason: str) -> None:
+    FFMPEG_ERRORS.labels(label=command_label(label), reason=reason).inc()
+
+
+def observe_stage(stage: str, seconds: float, labels: dict[str, str]) -> None:
+    STAGE_SECONDS.labels(stage=stage, **labels).observe(max(0.0, seconds))
+
+
+def observe_assets(rows: list[dict[str, Any]]) -> None:
+    for row in rows:
+        ASSET_BYTES.labels(status=str(row.get("status") or "unknown")).inc(int(row.get("bytes") or 0))
+
+
+def observe_render(video_sec: float, wall_sec: float, labels: dict[str, str]) -> None:
+    if video_sec <= 0 or wall_sec <= 0:
+        return
+    RENDERED_VIDEO_SECONDS.labels(**labels).inc(video_sec)
+    RENDER_WALL_SECONDS.labels(**labels).inc(wall_sec)
+    REALTIME_RATIO.labels(**labels).observe(video_sec / wall_sec)
+
+
+def exposition() -> tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
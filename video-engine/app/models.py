@@ -74,9 +74,47 @@ class TitleTemplate(BaseModel):
     fontFile: str | None = Field(default=None, max_length=260)
 
 
+class LayoutRequest(BaseModel):
+    templates: list[TitleTemplate] = Field(..., min_length=1, max_length=50)
+
+
+class TemplateLayout(BaseModel):
+    id: str
+    lines: list[str]
+    lineWidthsPx: list[float] = Field(default_factory=list)
+    maxWidthPx: float
+    fontSize: int
+    lineHeightPx: int
+    fontFile: str = ""
+    fontName: str = ""
+    engine: str
+
+
+class LayoutResponse(BaseModel):
+    templates: list[TemplateLayout]
+
+
+class Rendition(BaseModel):
+    name: str = Field(..., min_length=1, max_length=32, pattern=r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+    width: int | None = Field(default=None, ge=120, le=4000)
+    height: int | None = Field(default=None, ge=120, le=4000)
+    fps: int | None = Field(default=None, ge=1, le=60)
+    crf: int | None = Field(default=None, ge=0, le=51)
+    videoBitrateKbps: int | None = Field(default=None, ge=100, le=50000)
+    audioBitrateKbps: int | None = Field(default=None, ge=32, le=512)
+    container: str = Field(default="mp4")
+
+
 class RenderOptions(BaseModel):
     subtitle: SubtitleOptions = Field(default_factory=SubtitleOptions)
     overlay: OverlayOptions = Field(default_factory=OverlayOptions)
+    renderMode: str = Field(default="segments")
+    motionEngine: str = Field(default="zoompan")
+    profile: str = Field(default="final")
+    # Parallel time slices for the final merge; unset uses FINAL_ENCODE_SLICES.
+    finalEncodeSlices: int | None = Field(default=None, ge=1, le=16)
+    # Extra outputs encoded from the same decode/filter pass as final.mp4.
+    renditions: list[Rendition] = Field(default_factory=list, max_length=4)
 
 
 class BuildVideoRequest(BaseModel):
@@ -90,11 +128,87 @@ class BuildVideoRequest(BaseModel):
     renderOptions: RenderOptions | None = None
 
 
+class BuildVideosRequest(BaseModel):
+    jobs: list[BuildVideoRequest] = Field(..., min_length=1, max_length=100)
+
+
+class PreviewFrameRequest(BuildVideoRequest):
+    timestampSec: float = Field(default=0.0, ge=0.0, le=3600.0)
+    imageFormat: str = Field(default="png")
+
+
+class SegmentTiming(BaseModel):
+    label: str
+    waitSec: float
+    runSec: float
+
+
+class AssetFetchResult(BaseModel):
+    source: str
+    path: str
+    status: str
+    bytes: int = 0
+    elapsedSec: float = 0.0
+    error: str | None = None
+
+
+class RenditionOutput(BaseModel):
+    name: str
+    outputPath: str
+    outputUrl: str
+    container: str
+    width: int
+    height: int
+    fps: int
+
+
 class BuildVideoResponse(BaseModel):
     outputPath: str
     outputUrl: str
     srtPath: str
     ffmpegSteps: list[str]
+    profile: str = "final"
+    segmentTimings: list[SegmentTiming] = Field(default_factory=list)
+    segmentsReused: int = 0
+    segmentsRendered: int = 0
+    assetDownloadSec: float = 0.0
+    assets: list[AssetFetchResult] = Field(default_factory=list)
+    renditions: list[RenditionOutput] = Field(default_factory=list)
+
+
+class JobStatusResponse(BaseModel):
+    jobId: str
+    state: str
+    stage: str
+    result: BuildVideoResponse | None = None
+    error: str | None = None
+    createdAt: float
+    startedAt: float | None = None
+    finishedAt: float | None = None
 
 
 OverlayOptions.model_rebuild()
+
+
+class StageProgress(BaseModel):
+    label: str
+    state: str
+    totalFrames: int | None = None
+    frame: int = 0
+    fps: float | None = None
+    outTimeSec: float | None = None
+    speed: float | None = None
+    startedAt: float | None = None
+    finishedAt: float | None = None
+
+
+class JobProgressResponse(BaseModel):
+    jobId: str
+    state: str
+    phase: str
+    percent: float
+    framesDone: int
+    framesTotal: int
+    stages: list[StageProgress] = Field(default_factory=list)
+    version: int
+    createdAt: float
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import IO, Any
+
+import numpy as np
+
+from app.cancellation import CancelToken
+from app.ffmpeg_exec import FFMPEG_BIN, run_cmd, run_parallel_commands, to_ffmpeg_command_string
+from app.image_prep import canvas_filter
+from app.progress import RenderProgress
+from app.scene_motion import (
+    motion_crop_rect,
+    motion_parameters,
+    panel_geometry,
+    resolve_scene_motion_preset,
+    resolve_video_layout,
+)
+
+
+def _decode_canvases(
+    raw_paths: dict[Path, Path],
+    canvas_w: int,
+    canvas_h: int,
+    log_path: Path | None,
+    max_workers: int,
+    progress: RenderProgress | None,
+    cancel: CancelToken | None,
+) -> list[str]:
+    """
+    Decode each distinct image once to its raw rgb24 canvas file, through the
+    regular governed command pool, before the encoder takes its slot.
+    """
+    decode_commands: list[tuple[str, list[str]]] = []
+    for index, (image_path, raw_path) in enumerate(raw_paths.items(), start=1):
+        command = [
+            FFMPEG_BIN,
+            "-y",
+            "-i",
+            str(image_path),
+            "-vf",
+            canvas_filter(canvas_w, canvas_h),
+            "-frames:v",
+            "1",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgb24",
+            str(raw_path),
+        ]
+        decode_commands.append((f"motion-decode-{index}", command))
+        if progress is not None:
+            progress.plan(f"motion-decode-{index}", 1)
+    run_parallel_commands(
+        decode_commands,
+        log_path,
+        max_workers=max_workers,
+        progress=progress,
+        cancel=cancel,
+        stage_name="motion-decode",
+    )
+    return [to_ffmpeg_command_string(command) for _, command in decode_commands]
+
+
+def _load_canvas(raw_path: Path, canvas_w: int, canvas_h: int) -> np.ndarray:
+    """
+    Load a decoded canvas column-major (width, height, 3) as uint16 so both resample
+    passes are contiguous row gathers with 8-bit fixed-point weights.
+    """
+    pixels = np.fromfile(raw_path, dtype=np.uint8)
+    expected = canvas_w * canvas_h * 3
+    if pixels.size < expected:
+        raise RuntimeError(f"Decoded motion canvas is truncated: {raw_path}")
+    pixels = pixels[:expected].reshape(canvas_h, canvas_w, 3)
+    return np.ascontiguousarray(pixels.transpose(1, 0, 2)).astype(np.uint16)
+
+
+def _sample_axis(start: float, length: float, size: int, limit: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bilinear taps (lo, hi, weight/256) for `size` output samples over [start, start+length)."""
+    centers = start + (np.arange(size, dtype=np.float64) + 0.5) * (length / size) - 0.5
+    centers = np.clip(centers, 0.0, limit - 1.0)
+    lo = np.floor(centers).astype(np.intp)
+    hi = np.minimum(lo + 1, limit - 1)
+    weight = np.rint((centers - lo) * 256.0).astype(np.uint16)
+    return lo, hi, weight
+
+
+def _resample_frame(
+    canvas_t: np.ndarray,
+    rect: tuple[float, float, float, float],
+    out_w: int,
+    out_h: int,
+) -> np.ndarray:
+    """Separable bilinear resample of a sub-pixel crop window to an (out_h, out_w, 3) frame."""
+    canvas_w, canvas_h = canvas_t.shape[:2]
+    x, y, crop_w, crop_h = rect
+    x_lo, x_hi, x_weight = _sample_axis(x, crop_w, out_w, canvas_w)
+    y_lo, y_hi, y_weight = _sample_axis(y, crop_h, out_h, canvas_h)
+    x_weight = x_weight[:, None, None]
+    columns = (canvas_t[x_lo] * (256 - x_weight) + canvas_t[x_hi] * x_weight) >> 8
+    columns = np.ascontiguousarray(columns.transpose(1, 0, 2))
+    y_weight = y_weight[:, None, None]
+    frame = (columns[y_lo] * (256 - y_weight) + columns[y_hi] * y_weight) >> 8
+    return frame.astype(np.uint8)
+
+
+def render_motion_track(
+    image_paths: list[Path],
+    frame_counts: list[int],
+    fps: int,
+    overlay_options: dict[str, Any] | None,
+    out_w: int,
+    out_h: int,
+    output_path: Path,
+    log_path: Path | None = None,
+    preset: str = "veryfast",
+    crf: int = 16,
+    max_workers: int = 1,
+    progress: RenderProgress | None = None,
+    cancel: CancelToken | None = None,
+) -> list[str]:
+    """
+    Render every scene's Ken Burns motion with NumPy and pipe rawvideo frames into a
+    single libx264 encoder, producing one silent motion track for the final merge.
+
+    Crop rectangles come from motion_crop_rect (same presets and easing as zoompan)
+    but keep sub-pixel positions, so no oversampled canvas or Lanczos downscale is needed.
+    Images are decoded to raw canvases first (up to max_workers at once); the encoder
+    then runs through run_cmd with frames fed to its stdin, so both get the same
+    governor slot, timeout, cancel and logging as every other ffmpeg stage.
+    """
+    layout = resolve_video_layout(overlay_options)
+    if layout == "panel_16_9":
+        canvas_w, canvas_h, offset_x, offset_y = panel_geometry(overlay_options, out_w, out_h)
+    else:
+        canvas_w, canvas_h, offset_x, offset_y = out_w, out_h, 0, 0
+
+    encode_command = [
+        FFMPEG_BIN,
+        "-y",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-s",
+        f"{out_w}x{out_h}",
+        "-r",
+        str(fps),
+        "-i",
+        "-",
+        "-c:v",
+        "libx264",
+        "-preset",
+        preset,
+        "-crf",
+        str(crf),
+        "-pix_fmt",
+        "yuv420p",
+        str(output_path),
+    ]
+
+    def _feed_frames(stdin: IO[bytes]) -> None:
+        frame = np.zeros((out_h, out_w, 3), dtype=np.uint8)
+        for idx, image_path in enumerate(image_paths, start=1):
+            frame_count = frame_counts[idx - 1]
+            canvas = _load_canvas(raw_paths[image_path], canvas_w, canvas_h)
+            motion_preset = resolve_scene_motion_preset(overlay_options, idx)
+            params = motion_parameters(frame_count, idx, overlay_options)
+            for frame_index in range(frame_count):
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                rect = motion_crop_rect(motion_preset, params, frame_index, canvas_w, canvas_h)
+                scene_frame = _resample_frame(canvas, rect, canvas_w, canvas_h)
+                frame[offset_y:offset_y + canvas_h, offset_x:offset_x + canvas_w] = scene_frame
+                stdin.write(frame.tobytes())
+
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    raw_paths: dict[Path, Path] = {}
+    for image_path in image_paths:
+        raw_paths.setdefault(image_path, output_path.parent / f"motion-canvas-{len(raw_paths) + 1}.rgb")
+    try:
+        commands = _decode_canvases(
+            raw_paths,
+            canvas_w,
+            canvas_h,
+            log_path,
+            max_workers,
+            progress,
+            cancel,
+        )
+        run_cmd(
+            encode_command,
+            log_path=log_path,
+            label="motion-numpy",
+            progress=progress,
+            cancel=cancel,
+            feed_stdin=_feed_frames,
+        )
+    finally:
+        for raw_path in raw_paths.values():
+            raw_path.unlink(missing_ok=True)
+    commands.append(to_ffmpeg_command_string(encode_command))
+    return commands
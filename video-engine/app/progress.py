@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.env import env_int
+
+
+PROGRESS_HISTORY_LIMIT = env_int("PROGRESS_HISTORY_LIMIT", 500, 10, 10000)
+
+FINISHED_STATES = {"succeeded", "failed", "cancelled"}
+
+
+def _parse_float(value: str | None) -> float | None:
+    if value is None:
+        return None
+    raw = value.strip().rstrip("x")
+    if not raw or raw.upper() == "N/A":
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def _parse_clock(value: str | None) -> float | None:
+    """HH:MM:SS.micro (ffmpeg out_time) -> seconds."""
+    if not value or value.strip().upper() == "N/A":
+        return None
+    try:
+        hours, minutes, seconds = value.strip().lstrip("-").split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
+def parse_progress_block(fields: dict[str, str]) -> dict[str, Any]:
+    """
+    Normalize one ffmpeg -progress block (key=value lines ending in progress=...).
+    out_time_us is preferred; out_time_ms carries microseconds too on every ffmpeg
+    release, so it is only a fallback behind the clock string.
+    """
+    out_time_sec = None
+    out_time_us = _parse_float(fields.get("out_time_us"))
+    if out_time_us is not None and out_time_us >= 0:
+        out_time_sec = out_time_us / 1_000_000
+    else:
+        out_time_sec = _parse_clock(fields.get("out_time"))
+    frame = _parse_float(fields.get("frame"))
+    return {
+        "frame": int(frame) if frame is not None else None,
+        "fps": _parse_float(fields.get("fps")),
+        "outTimeSec": round(out_time_sec, 3) if out_time_sec is not None else None,
+        "speed": _parse_float(fields.get("speed")),
+        "ended": fields.get("progress") == "end",
+    }
+
+
+class RenderProgress:
+    """
+    Live progress for one job, fed from ffmpeg -progress output while commands run.
+    Each ffmpeg stage (segment-N, final-merge, ...) is planned with the frames it will
+    write; the overall percent is frames written over frames planned. Stages that
+    were not planned (e.g. title rasterization) are listed but do not move the percent.
+    """
+
+    def __init__(self, job_id: str) -> None:
+        self.jobId = job_id
+        self.createdAt = time.time()
+        self._cond = threading.Condition()
+        self._stages: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._phase = "queued"
+        self._state = "queued"
+        self._version = 0
+
+    def _stage(self, label: str) -> dict[str, Any]:
+        stage = self._stages.get(label)
+        if stage is None:
+            stage = {
+                "label": label,
+                "state": "pending",
+                "totalFrames": None,
+                "frame": 0,
+                "fps": None,
+                "outTimeSec": None,
+                "speed": None,
+                "startedAt": None,
+                "finishedAt": None,
+            }
+            self._stages[label] = stage
+        return stage
+
+    def _changed(self) -> None:
+        self._version += 1
+        self._cond.notify_all()
+
+    def set_phase(self, phase: str) -> None:
+        with self._cond:
+            self._phase = phase
+            if self._state == "queued":
+                self._state = "running"
+            self._changed()
+
+    def plan(self, label: str, total_frames: int) -> None:
+        with self._cond:
+            self._stage(label)["totalFrames"] = max(0, int(total_frames))
+            self._changed()
+
+    def start(self, label: str) -> None:
+        with self._cond:
+            stage = self._stage(label)
+            stage["state"] = "running"
+            stage["startedAt"] = time.time()
+            self._changed()
+
+    def update(self, label: str, values: dict[str, Any]) -> None:
+        with self._cond:
+            stage = self._stage(label)
+            for key in ("frame", "fps", "outTimeSec", "speed"):
+                if values.get(key) is not None:
+                    stage[key] = values[key]
+            self._changed()
+
+    def finish(self, label: str, state: str = "done") -> None:
+        with self._cond:
+            stage = self._stage(label)
+            stage["state"] = state
+            stage["finishedAt"] = time.time()
+            if state == "done" and stage["totalFrames"] is not None:
+                stage["frame"] = stage["totalFrames"]
+            self._changed()
+
+    def close(self, state: str) -> None:
+        with self._cond:
+            self._state = state
+            self._phase = "done" if state == "succeeded" else state
+            self._changed()
+
+    @property
+    def finished(self) -> bool:
+        with self._cond:
+            return self._state in FINISHED_STATES
+
+    def _snapshot_locked(self) -> dict[str, Any]:
+        planned = [stage for stage in self._stages.values() if stage["totalFrames"]]
+        total_frames = sum(stage["totalFrames"] for stage in planned)
+        done_frames = sum(min(stage["frame"] or 0, stage["totalFrames"]) for stage in planned)
+        if self._state == "succeeded":
+            percent = 100.0
+        elif total_frames:
+            percent = round(100.0 * done_frames / total_frames, 1)
+        else:
+            percent = 0.0
+        return {
+            "jobId": self.jobId,
+            "state": self._state,
+            "phase": self._phase,
+            "percent": percent,
+            "framesDone": done_frames,
+            "framesTotal": total_frames,
+            "stages": [dict(stage) for stage in self._stages.values()],
+            "version": self._version,
+            "createdAt": self.createdAt,
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._cond:
+            return self._snapshot_locked()
+
+    def wait_for_change(self, after_version: int, timeout: float) -> dict[str, Any] | None:
+        """Block until the version moves past after_version; None on timeout."""
+        with self._cond:
+            changed = self._cond.wait_for(
+                lambda: self._version > after_version,
+                timeout=timeout,
+            )
+            return self._snapshot_locked() if changed else None
+
+
+class ProgressRegistry:
+    """Job id -> RenderProgress, keeping the most recent PROGRESS_HISTORY_LIMIT entries."""
+
+    def __init__(self, history_limit: int = PROGRESS_HISTORY_LIMIT) -> None:
+        self._history_limit = max(1, history_limit)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, RenderProgress] = OrderedDict()
+
+    def register(self, progress: RenderProgress) -> RenderProgress:
+        with self._lock:
+            self._entries.pop(progress.jobId, None)
+            self._entries[progress.jobId] = progress
+            while len(self._entries) > self._history_limit:
+                oldest_id = next(
+                    (job_id for job_id, entry in self._entries.items() if entry.finished),
+                    None,
+                )
+                if oldest_id is None:
+                    break
+                self._entries.pop(oldest_id, None)
+        return progress
+
+    def get(self, job_id: str) -> RenderProgress | None:
+        with self._lock:
+            return self._entries.get(job_id)
+
+
+progress_registry = ProgressRegistry()
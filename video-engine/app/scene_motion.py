@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from typing import Any
+
+
+SCENE_MOTION_PRESETS = {"gentle_zoom", "up_down", "left_right", "focus_smooth", "random", "none"}
+
+
+def resolve_scene_motion_preset(
+    overlay_options: dict[str, Any] | None,
+    scene_index: int,
+) -> str:
+    options = overlay_options or {}
+    raw = str(options.get("sceneMotionPreset") or "gentle_zoom").strip().lower()
+    if raw not in SCENE_MOTION_PRESETS:
+        raw = "gentle_zoom"
+    if raw == "random":
+        cycle = ["gentle_zoom", "focus_smooth", "up_down", "left_right"]
+        return cycle[(scene_index - 1) % len(cycle)]
+    return raw
+
+
+def resolve_video_layout(overlay_options: dict[str, Any] | None) -> str:
+    options = overlay_options or {}
+    raw = str(options.get("videoLayout") or "fill_9_16").strip().lower()
+    return "panel_16_9" if raw == "panel_16_9" else "fill_9_16"
+
+
+def even_dimension(value: int) -> int:
+    return value if value % 2 == 0 else value - 1
+
+
+def panel_geometry(
+    overlay_options: dict[str, Any] | None,
+    out_w: int,
+    out_h: int,
+) -> tuple[int, int, int, int]:
+    options = overlay_options or {}
+    try:
+        width_pct = float(options.get("panelWidthPercent"))
+    except (TypeError, ValueError):
+        width_pct = 100.0
+    width_pct = max(60.0, min(100.0, width_pct))
+
+    panel_w = even_dimension(int(round(out_w * (width_pct / 100.0))))
+    # Floors never exceed the frame itself (profile-scaled outputs can be < 320px).
+    panel_w = max(min(out_w, max(320, int(out_w * 0.6))), min(out_w, panel_w))
+    panel_h = even_dimension(int(round(panel_w * (9.0 / 16.0))))
+    panel_h = max(min(out_h, 180), min(out_h, panel_h))
+
+    try:
+        top_pct = float(options.get("panelTopPercent"))
+    except (TypeError, ValueError):
+        top_pct = 34.0
+    top_pct = max(0.0, min(85.0, top_pct))
+    top_px = int(round(out_h * (top_pct / 100.0)))
+    top_px = max(0, min(out_h - panel_h, top_px))
+    left_px = (out_w - panel_w) // 2
+    return panel_w, panel_h, left_px, top_px
+
+
+def motion_parameters(
+    frame_count: int,
+    scene_index: int,
+    overlay_options: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """Scene motion inputs shared by the zoompan expressions and the crop-rect math."""
+    options = overlay_options or {}
+    def _safe_float(value: Any, fallback: float) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return fallback
+
+    def _clamp(value: float, min_value: float, max_value: float) -> float:
+        return max(min_value, min(max_value, value))
+
+    raw_motion_speed = _clamp(_safe_float(options.get("motionSpeedPercent"), 135.0), 60.0, 220.0) / 100.0
+    motion_speed = 1.0 + (raw_motion_speed - 1.0) * 0.68
+    try:
+        configured_zoom = float(options.get("focusZoomPercent"))
+    except (TypeError, ValueError):
+        configured_zoom = 9.0
+    zoom_gain = max(0.03, min(0.2, configured_zoom / 100.0))
+
+    focus_x = _clamp(_safe_float(options.get("focusXPercent"), 50.0), 0.0, 100.0) / 100.0
+    focus_y = _clamp(_safe_float(options.get("focusYPercent"), 50.0), 0.0, 100.0) / 100.0
+    drift = _clamp(_safe_float(options.get("focusDriftPercent"), 6.0), 0.0, 20.0) / 100.0
+    drift_x = drift
+    drift_y = drift * 0.64
+    direction_x = -1.0 if scene_index % 2 else 1.0
+    direction_y = -1.0 if scene_index % 3 else 1.0
+    return {
+        "frames_minus_one": max(1, frame_count - 1),
+        "motion_speed": motion_speed,
+        "zoom_gain": zoom_gain,
+        "focus_x": focus_x,
+        "focus_y": focus_y,
+        "start_fx": _clamp(focus_x - (drift_x * direction_x), 0.06, 0.94),
+        "end_fx": _clamp(focus_x + (drift_x * direction_x), 0.06, 0.94),
+        "start_fy": _clamp(focus_y - (drift_y * direction_y), 0.06, 0.94),
+        "end_fy": _clamp(focus_y + (drift_y * direction_y), 0.06, 0.94),
+    }
+
+
+def motion_crop_rect(
+    motion_preset: str,
+    params: dict[str, Any],
+    frame_index: int,
+    canvas_w: int,
+    canvas_h: int,
+) -> tuple[float, float, float, float]:
+    """
+    Sub-pixel (x, y, w, h) crop window for one frame, mirroring the zoompan
+    expressions (same rounding of speed/zoom/focus) without integer snapping.
+    """
+    if motion_preset == "none":
+        return 0.0, 0.0, float(canvas_w), float(canvas_h)
+
+    speed = round(float(params["motion_speed"]), 2)
+    zoom_gain = round(float(params["zoom_gain"]), 4)
+    progress = max(0.0, min(1.0, (frame_index / params["frames_minus_one"]) * speed))
+    ease = progress * progress * progress * (progress * (progress * 6 - 15) + 10)
+    start_fx = round(float(params["start_fx"]), 4)
+    start_fy = round(float(params["start_fy"]), 4)
+    delta_fx = round(float(params["end_fx"]) - float(params["start_fx"]), 4)
+    delta_fy = round(float(params["end_fy"]) - float(params["start_fy"]), 4)
+    focus_x = round(float(params["focus_x"]), 4)
+    focus_y = round(float(params["focus_y"]), 4)
+
+    if motion_preset == "focus_smooth":
+        zoom = round(1.0 + zoom_gain, 4)
+        fx = start_fx + delta_fx * ease
+        fy = start_fy + delta_fy * ease
+    elif motion_preset == "up_down":
+        zoom = 1.0 + zoom_gain * ease
+        fx = focus_x
+        fy = start_fy + delta_fy * ease
+    elif motion_preset == "left_right":
+        zoom = 1.0 + zoom_gain * ease
+        fx = start_fx + delta_fx * ease
+        fy = focus_y
+    else:
+        zoom = 1.0 + zoom_gain * ease
+        fx = focus_x
+        fy = focus_y
+
+    crop_w = canvas_w / zoom
+    crop_h = canvas_h / zoom
+    x = max(0.0, min(canvas_w - crop_w, canvas_w * fx - crop_w / 2))
+    y = max(0.0, min(canvas_h - crop_h, canvas_h * fy - crop_h / 2))
+    return x, y, crop_w, crop_h
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from app.asset_cache import (
+    BASE_DIR,
+    evict_lru_files,
+    file_sha256,
+    link_or_copy,
+    list_cache_files,
+    touch,
+)
+from app.env import env_int
+
+
+SEGMENT_CACHE_DIR = Path(os.getenv("SEGMENT_CACHE_DIR") or str(BASE_DIR / "cache" / "segments"))
+# 0 disables cross-render reuse (identical scenes within one job are still rendered once).
+SEGMENT_CACHE_MAX_BYTES = env_int("SEGMENT_CACHE_MAX_BYTES", 4 * 1024 * 1024 * 1024)
+# Bump when the segment encode changes in a way the command line does not capture.
+_SEGMENT_KEY_VERSION = "1"
+
+
+class SegmentCache:
+    """
+    Encoded scene segments keyed by image content hash plus every argument that
+    shapes the segment's pixels (the full -vf chain with motion/focus/zoom/drift,
+    frame count, fps, output and panel geometry, and encoder settings).
+    """
+
+    def __init__(
+        self,
+        root: Path = SEGMENT_CACHE_DIR,
+        max_bytes: int = SEGMENT_CACHE_MAX_BYTES,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key_for(self, image_path: Path, encode_args: list[str]) -> str:
+        payload = json.dumps(
+            {
+                "version": _SEGMENT_KEY_VERSION,
+                "image": file_sha256(image_path),
+                "args": encode_args,
+            },
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.mp4"
+
+    def lookup(self, key: str, destination: Path) -> bool:
+        if not self.enabled:
+            return False
+        cached = self._path_for(key)
+        if not cached.exists():
+            with self._lock:
+                self._counters["misses"] += 1
+            return False
+        touch(cached)
+        link_or_copy(cached, destination)
+        with self._lock:
+            self._counters["hits"] += 1
+        return True
+
+    def store(self, key: str, segment_path: Path) -> None:
+        if not self.enabled or not segment_path.exists():
+            return
+        cached = self._path_for(key)
+        if not cached.exists():
+            link_or_copy(segment_path, cached)
+        with self._lock:
+            self._counters["evictions"] += evict_lru_files(self.root, self.max_bytes)
+
+    def stats(self) -> dict[str, Any]:
+        rows = list_cache_files(self.root)
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "enabled": self.enabled,
+            "segmentCount": len(rows),
+            "totalBytes": sum(size for _, size, _ in rows),
+            "maxBytes": self.max_bytes,
+        }
+
+
+segment_cache = SegmentCache()
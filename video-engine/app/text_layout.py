@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import ImageFont
+
+from app.env import env_int
+
+
+# Wrapped-line results kept in memory, keyed by (text, font file, size, width).
+TEXT_LAYOUT_CACHE_SIZE = env_int("TEXT_LAYOUT_CACHE_SIZE", 4096, 0, 1_000_000)
+# Advances are measured once per glyph at this size and scaled linearly.
+_REFERENCE_SIZE = 1000
+
+_tables_lock = threading.Lock()
+_advance_tables: dict[str, dict[str, float]] = {}
+
+
+@lru_cache(maxsize=64)
+def _reference_font(font_path: str) -> ImageFont.FreeTypeFont:
+    # Face index 0, the same face ffmpeg drawtext picks from a .ttc collection.
+    return ImageFont.truetype(font_path, _REFERENCE_SIZE, index=0)
+
+
+def _advance(font_path: str, char: str) -> float:
+    """Advance width of one character at _REFERENCE_SIZE, from the per-font glyph table."""
+    with _tables_lock:
+        table = _advance_tables.setdefault(font_path, {})
+        width = table.get(char)
+    if width is None:
+        width = float(_reference_font(font_path).getlength(char))
+        with _tables_lock:
+            table[char] = width
+    return width
+
+
+def measure_text(text: str, font_path: str, font_size: float) -> float:
+    """Pixel width of text at font_size as the sum of glyph advances (no kerning)."""
+    scale = float(font_size) / _REFERENCE_SIZE
+    return sum(_advance(font_path, char) for char in text) * scale
+
+
+def _wrap_uncached(text: str, font_path: str, font_size: float, max_width_px: float) -> tuple[str, ...]:
+    wrapped_lines: list[str] = []
+    space_px = measure_text(" ", font_path, font_size)
+
+    for paragraph in (text.splitlines() or [text]):
+        if paragraph == "":
+            wrapped_lines.append("")
+            continue
+
+        tokens = re.findall(r"\S+|\s+", paragraph)
+        current = ""
+        current_px = 0.0
+
+        def flush_line() -> None:
+            nonlocal current, current_px
+            line = current.rstrip()
+            if line or not wrapped_lines:
+                wrapped_lines.append(line)
+            current = ""
+            current_px = 0.0
+
+        for token in tokens:
+            token_px = space_px * len(token) if token.isspace() else measure_text(token, font_path, font_size)
+
+            if current and (current_px + token_px) > max_width_px:
+                flush_line()
+
+            if not current and token.isspace():
+                continue
+
+            if not token.isspace() and token_px > max_width_px:
+                # Break inside over-long tokens (CJK runs, URLs) at glyph boundaries.
+                for char in token:
+                    char_px = measure_text(char, font_path, font_size)
+                    if current and (current_px + char_px) > max_width_px:
+                        flush_line()
+                    current += char
+                    current_px += char_px
+                continue
+
+            current += token
+            current_px += token_px
+
+        if current:
+            flush_line()
+        elif tokens:
+            wrapped_lines.append("")
+
+    return tuple(wrapped_lines or [text])
+
+
+_wrap_cached = lru_cache(maxsize=TEXT_LAYOUT_CACHE_SIZE)(_wrap_uncached)
+
+
+def wrap_text_to_width(
+    text: str,
+    font_path: str,
+    font_size: float,
+    max_width_px: float,
+) -> list[str] | None:
+    """
+    Wrap text to max_width_px using the font's real glyph advances.
+    Returns None when the font file cannot be loaded so callers can fall back
+    to the per-character heuristic.
+    """
+    if not font_path or not Path(font_path).is_file():
+        return None
+    try:
+        _reference_font(font_path)
+    except OSError:
+        return None
+    # Round the width so float noise from percentage math does not split cache entries.
+    return list(_wrap_cached(text, font_path, float(font_size), round(float(max_width_px), 2)))
+
+
+def cache_info() -> dict[str, int]:
+    info = _wrap_cached.cache_info()
+    with _tables_lock:
+        glyphs = sum(len(table) for table in _advance_tables.values())
+        fonts = len(_advance_tables)
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxSize": info.maxsize or 0,
+        "fonts": fonts,
+        "glyphs": glyphs,
+    }
+
+
+def clear_caches() -> None:
+    """Drop glyph tables and wrapped layouts (e.g. after the font index is rebuilt)."""
+    _wrap_cached.cache_clear()
+    _reference_font.cache_clear()
+    with _tables_lock:
+        _advance_tables.clear()
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.asset_cache import BASE_DIR, evict_lru_files, link_or_copy, list_cache_files, touch
+from app.env import env_bool, env_int
+from app.ffmpeg_exec import FFMPEG_BIN, escape_filter_path, run_cmd
+
+
+TITLE_OVERLAY_CACHE_DIR = Path(
+    os.getenv("TITLE_OVERLAY_CACHE_DIR") or str(BASE_DIR / "cache" / "overlays")
+)
+# 0 keeps rasterizing per render (into the job directory) without a shared cache.
+TITLE_OVERLAY_CACHE_MAX_BYTES = env_int("TITLE_OVERLAY_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+# Set to 0 to fall back to live drawtext filters in the final encode.
+TITLE_OVERLAY_RASTERIZE = env_bool("TITLE_OVERLAY_RASTERIZE", True)
+# Bump when the rasterization itself changes in a way the key does not capture.
+_OVERLAY_KEY_VERSION = "1"
+_FONTFILE_PATTERN = re.compile(r"fontfile='((?:[^'\\]|\\.)*)'")
+
+_lock = threading.Lock()
+_counters: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _font_signatures(drawtext_filters: list[str]) -> list[list[Any]]:
+    signatures: list[list[Any]] = []
+    for font_path in sorted({match for item in drawtext_filters for match in _FONTFILE_PATTERN.findall(item)}):
+        try:
+            stat = Path(font_path.replace("\\'", "'")).stat()
+            signatures.append([font_path, stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            signatures.append([font_path, 0, 0])
+    return signatures
+
+
+def overlay_key(drawtext_filters: list[str], out_w: int, out_h: int) -> str:
+    payload = json.dumps(
+        {
+            "version": _OVERLAY_KEY_VERSION,
+            "size": [out_w, out_h],
+            "filters": drawtext_filters,
+            "fonts": _font_signatures(drawtext_filters),
+        },
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _render_on_backgrounds(
+    drawtext_filters: list[str],
+    out_w: int,
+    out_h: int,
+    raw_path: Path,
+    log_path: Path | None,
+) -> np.ndarray:
+    """Draw the layers once on opaque black and once on opaque white (stacked vertically)."""
+    chain = ",".join(drawtext_filters)
+    graph = (
+        f"color=c=black:s={out_w}x{out_h}:d=1,format=rgb24,{chain}[onblack];"
+        f"color=c=white:s={out_w}x{out_h}:d=1,format=rgb24,{chain}[onwhite];"
+        "[onblack][onwhite]vstack[out]"
+    )
+    command = [
+        FFMPEG_BIN,
+        "-y",
+        "-filter_complex",
+        graph,
+        "-map",
+        "[out]",
+        "-frames:v",
+        "1",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        str(raw_path),
+    ]
+    run_cmd(command, log_path=log_path, label="title-raster")
+    pixels = np.fromfile(raw_path, dtype=np.uint8)
+    raw_path.unlink(missing_ok=True)
+    expected = out_w * out_h * 3 * 2
+    if pixels.size < expected:
+        raise RuntimeError(f"Title overlay rasterization produced {pixels.size} of {expected} bytes")
+    return pixels[:expected].reshape(out_h * 2, out_w, 3).astype(np.int32)
+
+
+def _difference_matte(on_black: np.ndarray, on_white: np.ndarray) -> np.ndarray:
+    """
+    Recover straight-alpha RGBA from the two renders. Drawing directly on a transparent
+    canvas is not usable: drawtext blends the alpha channel like a colour, so
+    semi-transparent boxes and shadows come out with their opacity squared.
+    """
+    alpha = 255 - np.clip((on_white - on_black).mean(axis=2), 0, 255)
+    safe_alpha = np.maximum(alpha, 1)[:, :, None]
+    color = np.clip((on_black * 255 + safe_alpha // 2) // safe_alpha, 0, 255)
+    rgba = np.empty((*alpha.shape, 4), dtype=np.uint8)
+    rgba[:, :, :3] = np.where(alpha[:, :, None] > 0, color, 0)
+    rgba[:, :, 3] = np.rint(alpha)
+    return rgba
+
+
+def _write_png(rgba: np.ndarray, output_path: Path, log_path: Path | None) -> None:
+    out_h, out_w = rgba.shape[:2]
+    raw_path = output_path.with_name(f"{output_path.stem}.{uuid.uuid4().hex}.rgba")
+    rgba.tofile(raw_path)
+    try:
+        run_cmd(
+            [
+                FFMPEG_BIN,
+                "-y",
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "rgba",
+                "-s",
+                f"{out_w}x{out_h}",
+                "-i",
+                str(raw_path),
+                "-frames:v",
+                "1",
+                "-c:v",
+                "png",
+                "-f",
+                "image2",
+                str(output_path),
+            ],
+            log_path=log_path,
+            label="title-raster-png",
+        )
+    finally:
+        raw_path.unlink(missing_ok=True)
+
+
+def rasterize_title_layers(
+    drawtext_filters: list[str],
+    out_w: int,
+    out_h: int,
+    work_dir: Path,
+    log_path: Path | None = None,
+) -> Path:
+    """
+    Render static drawtext layers once into a transparent PNG of the output size,
+    reusing the cached image when the same layers/fonts/size were rendered before.
+    Always returns work_dir/title-overlay.png: the final encode reads it for its whole
+    run, so a concurrent eviction of the cache entry must not pull it away.
+    """
+    key = overlay_key(drawtext_filters, out_w, out_h)
+    use_cache = TITLE_OVERLAY_CACHE_MAX_BYTES > 0
+    output_path = work_dir / "title-overlay.png"
+    cached_path = TITLE_OVERLAY_CACHE_DIR / key[:2] / f"{key}.png"
+    if use_cache:
+        if cached_path.exists():
+            touch(cached_path)
+            link_or_copy(cached_path, output_path)
+            with _lock:
+                _counters["hits"] += 1
+            return output_path
+        with _lock:
+            _counters["misses"] += 1
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f"{key}.{uuid.uuid4().hex}.tmp.png")
+    stacked = _render_on_backgrounds(
+        drawtext_filters,
+        out_w,
+        out_h,
+        output_path.with_name(f"{key}.{uuid.uuid4().hex}.rgb"),
+        log_path,
+    )
+    rgba = _difference_matte(stacked[:out_h], stacked[out_h:])
+    try:
+        _write_png(rgba, tmp_path, log_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    if use_cache:
+        if not cached_path.exists():
+            link_or_copy(output_path, cached_path)
+        with _lock:
+            _counters["evictions"] += evict_lru_files(TITLE_OVERLAY_CACHE_DIR, TITLE_OVERLAY_CACHE_MAX_BYTES)
+    return output_path
+
+
+def title_overlay_filter(overlay_path: Path) -> str:
+    """Filter-chain fragment compositing the pre-rasterized layers over the incoming video."""
+    return (
+        "null[titlebase];"
+        f"movie='{escape_filter_path(overlay_path.as_posix())}',format=rgba[titlelayer];"
+        "[titlebase][titlelayer]overlay=0:0:format=auto"
+    )
+
+
+def stats() -> dict[str, Any]:
+    rows = list_cache_files(TITLE_OVERLAY_CACHE_DIR)
+    with _lock:
+        counters = dict(_counters)
+    return {
+        **counters,
+        "enabled": TITLE_OVERLAY_RASTERIZE,
+        "overlayCount": len(rows),
+        "totalBytes": sum(size for _, size, _ in rows),
+        "maxBytes": TITLE_OVERLAY_CACHE_MAX_BYTES,
+    }
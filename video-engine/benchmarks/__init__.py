@@ -0,0 +1 @@
+# Render benchmarks for the video engine (not shipped in the container image).
@@ -0,0 +1,95 @@
+"""
+Compare the zoompan motion engine with the NumPy Ken Burns engine.
+
+Reports wall time per engine and visual parity (SSIM / PSNR of the NumPy output
+against zoompan) for each motion preset.
+
+Usage (from video-engine/):
+    python -m benchmarks.motion_engines --duration 20 --images 4 --fps 60
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from app.ffmpeg_builder import render_short_video
+from app.ffmpeg_exec import FFMPEG_BIN
+from benchmarks.synthetic import make_narration, make_test_images
+
+PRESETS = ("gentle_zoom", "up_down", "left_right", "focus_smooth")
+
+
+def _render(engine: str, preset: str, images: list[Path], narration: Path, work_dir: Path, fps: int) -> tuple[Path, float]:
+    output_dir = work_dir / f"{preset}-{engine}"
+    shutil.rmtree(output_dir, ignore_errors=True)
+    started = time.perf_counter()
+    output_path, _, _ = render_short_video(
+        image_paths=images,
+        tts_path=narration,
+        subtitle_path=None,
+        output_dir=output_dir,
+        use_sfx=False,
+        target_duration_sec=None,
+        overlay_options={"outputFps": fps, "sceneMotionPreset": preset},
+        motion_engine=engine,
+    )
+    return output_path, time.perf_counter() - started
+
+
+def _parity(reference: Path, candidate: Path) -> dict[str, float]:
+    completed = subprocess.run(
+        [
+            FFMPEG_BIN, "-hide_banner", "-i", str(candidate), "-i", str(reference),
+            "-lavfi", "[0:v][1:v]ssim;[0:v][1:v]psnr", "-f", "null", "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    ssim = re.search(r"SSIM .*All:([0-9.]+)", completed.stderr)
+    psnr = re.search(r"PSNR .*average:([0-9.inf]+)", completed.stderr)
+    return {
+        "ssim": float(ssim.group(1)) if ssim else 0.0,
+        "psnr": float(psnr.group(1)) if psnr else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=int, default=15)
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--presets", default=",".join(PRESETS))
+    parser.add_argument("--work-dir", type=Path, default=Path(tempfile.gettempdir()) / "shorts-engine-bench")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir.resolve() / "motion"
+    inputs_dir = args.work_dir.resolve() / "inputs"
+    images = make_test_images(inputs_dir, args.images)
+    narration = make_narration(inputs_dir, args.duration)
+
+    rows: list[dict[str, object]] = []
+    for preset in [item.strip() for item in args.presets.split(",") if item.strip()]:
+        zoompan_path, zoompan_sec = _render("zoompan", preset, images, narration, work_dir, args.fps)
+        numpy_path, numpy_sec = _render("numpy", preset, images, narration, work_dir, args.fps)
+        rows.append(
+            {
+                "preset": preset,
+                "zoompanSec": round(zoompan_sec, 3),
+                "numpySec": round(numpy_sec, 3),
+                "speedup": round(zoompan_sec / numpy_sec, 2) if numpy_sec else 0.0,
+                **_parity(zoompan_path, numpy_path),
+            }
+        )
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
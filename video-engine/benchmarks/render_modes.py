@@ -0,0 +1,86 @@
+"""
+Compare the two-pass segment render against the single-pass filter graph render.
+
+Usage (from video-engine/):
+    python -m benchmarks.render_modes --duration 60 --images 8 --repeat 2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from app.ffmpeg_builder import render_short_video
+from benchmarks.synthetic import make_narration, make_subtitles, make_test_images
+
+
+def _bench_mode(
+    mode: str,
+    images: list[Path],
+    narration: Path,
+    subtitles: Path,
+    work_dir: Path,
+    overlay_options: dict[str, object],
+) -> dict[str, object]:
+    output_dir = work_dir / f"render-{mode}"
+    shutil.rmtree(output_dir, ignore_errors=True)
+    started = time.perf_counter()
+    output_path, _, _ = render_short_video(
+        image_paths=images,
+        tts_path=narration,
+        subtitle_path=subtitles,
+        output_dir=output_dir,
+        use_sfx=True,
+        target_duration_sec=None,
+        overlay_options=overlay_options,
+        title_text="Benchmark title",
+        render_mode=mode,
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "wallSec": round(elapsed, 3),
+        "outputBytes": output_path.stat().st_size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=int, default=30)
+    parser.add_argument("--images", type=int, default=6)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--work-dir", type=Path, default=Path(tempfile.gettempdir()) / "shorts-engine-bench")
+    args = parser.parse_args()
+
+    args.work_dir = args.work_dir.resolve()
+    inputs_dir = args.work_dir / "inputs"
+    images = make_test_images(inputs_dir, args.images)
+    narration = make_narration(inputs_dir, args.duration)
+    subtitles = make_subtitles(inputs_dir, args.duration)
+    overlay_options = {
+        "outputFps": args.fps,
+        "sceneMotionPreset": "random",
+        "titleTemplates": [{"id": "bench", "text": "Benchmark title", "y": 12.0}],
+    }
+
+    results: list[dict[str, object]] = []
+    for _ in range(max(1, args.repeat)):
+        for mode in ("segments", "single_pass"):
+            results.append(
+                _bench_mode(mode, images, narration, subtitles, args.work_dir, overlay_options)
+            )
+    best = {
+        mode: min(float(row["wallSec"]) for row in results if row["mode"] == mode)
+        for mode in ("segments", "single_pass")
+    }
+    print(json.dumps({"runs": results, "bestWallSec": best}, indent=2))
+    if best["single_pass"] > 0:
+        print(f"single_pass speedup: {best['segments'] / best['single_pass']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
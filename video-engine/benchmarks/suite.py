@@ -0,0 +1,345 @@
+"""
+Reproducible render benchmark over a parameter matrix, with a regression compare.
+
+Inputs are synthetic (lavfi test patterns + sine/noise narration), so two runs on
+the same machine render identical content. Cross-render caches (segments, title
+overlays) are disabled unless --warm-caches is given, so every case pays its
+full encode cost.
+
+Usage (from video-engine/):
+    python -m benchmarks.suite run --out bench-before.json
+    python -m benchmarks.suite run --fps 30,60 --layouts fill_9_16,panel_16_9 \\
+        --presets gentle_zoom,random --images 3,8 --layers 0,4 --durations 15,60 \\
+        --out bench-after.json
+    python -m benchmarks.suite compare bench-before.json bench-after.json --threshold 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from app import title_overlay
+from app.ffmpeg_builder import render_short_video
+from app.ffmpeg_exec import FFMPEG_BIN
+from app.segment_cache import segment_cache
+from benchmarks.synthetic import make_narration, make_subtitles, make_test_images
+
+REPORT_VERSION = 1
+# Metrics compared between runs; lower is better for all of them.
+COMPARED_METRICS = ("wallSec", "cpuSec", "outputBytes")
+
+
+def _csv(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _csv_ints(value: str) -> list[int]:
+    return [int(item) for item in _csv(value)]
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process plus every reaped child (the ffmpeg encodes)."""
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _ffmpeg_version() -> str:
+    try:
+        completed = subprocess.run(
+            [FFMPEG_BIN, "-hide_banner", "-version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return ""
+    return (completed.stdout.splitlines() or [""])[0]
+
+
+def _git_revision() -> str:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return ""
+    return completed.stdout.strip()
+
+
+def _title_templates(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": f"bench-{idx}",
+            "text": f"Benchmark layer {idx} with a longer title line",
+            "x": 50.0,
+            "y": 8.0 + idx * (80.0 / max(1, count)),
+            "fontSize": 44 + (idx % 3) * 8,
+            "backgroundOpacity": 0.35 if idx % 2 else 0.0,
+        }
+        for idx in range(count)
+    ]
+
+
+def _case_id(case: dict[str, Any]) -> str:
+    return (
+        f"fps{case['fps']}-{case['layout']}-{case['preset']}-img{case['images']}"
+        f"-layers{case['layers']}-{case['duration']}s-{case['resolution']}-{case['narration']}"
+        f"-{case['mode']}-{case['engine']}-{case['profile']}"
+    )
+
+
+def _run_case(case: dict[str, Any], inputs_dir: Path, work_dir: Path, repeat: int) -> dict[str, Any]:
+    width, height = (int(part) for part in case["resolution"].split("x"))
+    images = make_test_images(inputs_dir, case["images"], width=width, height=height)
+    narration = make_narration(inputs_dir, case["duration"], kind=case["narration"])
+    subtitles = make_subtitles(inputs_dir, case["duration"])
+    overlay_options = {
+        "outputFps": case["fps"],
+        "videoLayout": case["layout"],
+        "sceneMotionPreset": case["preset"],
+        "titleTemplates": _title_templates(case["layers"]),
+    }
+    output_dir = work_dir / _case_id(case)
+    runs: list[dict[str, Any]] = []
+    output_bytes = 0
+    for _ in range(max(1, repeat)):
+        shutil.rmtree(output_dir, ignore_errors=True)
+        cpu_started = _cpu_seconds()
+        started = time.perf_counter()
+        output_path, _, render_stats = render_short_video(
+            image_paths=images,
+            tts_path=narration,
+            subtitle_path=subtitles,
+            output_dir=output_dir,
+            use_sfx=False,
+            target_duration_sec=None,
+            overlay_options=overlay_options,
+            title_text="Benchmark title",
+            render_mode=case["mode"],
+            motion_engine=case["engine"],
+            profile=case["profile"],
+        )
+        wall_sec = time.perf_counter() - started
+        cpu_sec = _cpu_seconds() - cpu_started
+        output_bytes = output_path.stat().st_size
+        runs.append(
+            {
+                "wallSec": round(wall_sec, 3),
+                "cpuSec": round(cpu_sec, 3),
+                "outputBytes": output_bytes,
+                "stageSec": render_stats.get("stageSec", {}),
+            }
+        )
+    shutil.rmtree(output_dir, ignore_errors=True)
+    wall_sec = statistics.median(run["wallSec"] for run in runs)
+    return {
+        "id": _case_id(case),
+        "params": case,
+        "runs": runs,
+        "wallSec": round(wall_sec, 3),
+        "cpuSec": round(statistics.median(run["cpuSec"] for run in runs), 3),
+        "outputBytes": output_bytes,
+        "realtimeRatio": round(case["duration"] / wall_sec, 3) if wall_sec else 0.0,
+    }
+
+
+def run_suite(args: argparse.Namespace) -> dict[str, Any]:
+    work_dir = args.work_dir.resolve()
+    inputs_dir = work_dir / "inputs"
+    renders_dir = work_dir / "suite"
+    if not args.warm_caches:
+        segment_cache.max_bytes = 0
+        title_overlay.TITLE_OVERLAY_CACHE_MAX_BYTES = 0
+
+    matrix = [
+        {
+            "fps": fps,
+            "layout": layout,
+            "preset": preset,
+            "images": images,
+            "layers": layers,
+            "duration": duration,
+            "resolution": resolution,
+            "narration": narration,
+            "mode": args.mode,
+            "engine": args.engine,
+            "profile": args.profile,
+        }
+        for fps, layout, preset, images, layers, duration, resolution, narration in itertools.product(
+            _csv_ints(args.fps),
+            _csv(args.layouts),
+            _csv(args.presets),
+            _csv_ints(args.images),
+            _csv_ints(args.layers),
+            _csv_ints(args.durations),
+            _csv(args.resolutions),
+            _csv(args.narration),
+        )
+    ]
+    cases: list[dict[str, Any]] = []
+    for index, case in enumerate(matrix, start=1):
+        result = _run_case(case, inputs_dir, renders_dir, args.repeat)
+        cases.append(result)
+        print(
+            f"[{index}/{len(matrix)}] {result['id']}: wall={result['wallSec']:.2f}s "
+            f"cpu={result['cpuSec']:.2f}s size={result['outputBytes']}",
+            file=sys.stderr,
+        )
+    return {
+        "version": REPORT_VERSION,
+        "createdAt": time.time(),
+        "revision": _git_revision(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpuCount": os.cpu_count() or 1,
+            "ffmpeg": _ffmpeg_version(),
+        },
+        "settings": {
+            "repeat": args.repeat,
+            "warmCaches": args.warm_caches,
+        },
+        "cases": cases,
+    }
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    candidate: dict[str, Any],
+    threshold: float,
+    min_delta_sec: float,
+) -> dict[str, Any]:
+    """
+    Per-case ratios (candidate / baseline) for COMPARED_METRICS. A metric regresses when
+    it grows by more than threshold and, for timings, by more than min_delta_sec, so
+    sub-second jitter on tiny cases is not reported.
+    """
+    baseline_cases = {case["id"]: case for case in baseline.get("cases", [])}
+    rows: list[dict[str, Any]] = []
+    regressions: list[str] = []
+    for case in candidate.get("cases", []):
+        reference = baseline_cases.get(case["id"])
+        if reference is None:
+            continue
+        row: dict[str, Any] = {"id": case["id"]}
+        for metric in COMPARED_METRICS:
+            before = float(reference.get(metric) or 0)
+            after = float(case.get(metric) or 0)
+            ratio = (after / before) if before else 0.0
+            delta = after - before
+            regressed = bool(before) and ratio > 1 + threshold
+            if metric.endswith("Sec"):
+                regressed = regressed and delta > min_delta_sec
+            row[metric] = {
+                "baseline": before,
+                "candidate": after,
+                "ratio": round(ratio, 3),
+                "regressed": regressed,
+            }
+            if regressed:
+                regressions.append(f"{case['id']} {metric} {before:g} -> {after:g} ({ratio:.2f}x)")
+        rows.append(row)
+    return {
+        "baselineRevision": baseline.get("revision", ""),
+        "candidateRevision": candidate.get("revision", ""),
+        "threshold": threshold,
+        "matchedCases": len(rows),
+        "missingCases": sorted(set(baseline_cases) - {row["id"] for row in rows}),
+        "cases": rows,
+        "regressions": regressions,
+    }
+
+
+def _print_comparison(comparison: dict[str, Any]) -> None:
+    width = max([len(row["id"]) for row in comparison["cases"]] + [4])
+    print(f"{'case':<{width}} {'wall':>8} {'cpu':>8} {'size':>8}")
+    for row in comparison["cases"]:
+        cells = []
+        for metric in COMPARED_METRICS:
+            mark = "!" if row[metric]["regressed"] else " "
+            cells.append(f"{row[metric]['ratio']:>7.2f}{mark}")
+        print(f"{row['id']:<{width}} {' '.join(cells)}")
+    if comparison["missingCases"]:
+        print(f"missing in candidate: {len(comparison['missingCases'])} case(s)")
+    for line in comparison["regressions"]:
+        print(f"REGRESSION {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="render the matrix and write a JSON report")
+    run_parser.add_argument("--fps", default="30,60")
+    run_parser.add_argument("--layouts", default="fill_9_16,panel_16_9")
+    run_parser.add_argument("--presets", default="gentle_zoom")
+    run_parser.add_argument("--images", default="6")
+    run_parser.add_argument("--layers", default="0,3")
+    run_parser.add_argument("--durations", default="15", help="narration lengths, e.g. 15,60,180")
+    run_parser.add_argument("--resolutions", default="1536x1024", help="source image sizes, e.g. 1080x1080,3000x2000")
+    run_parser.add_argument("--narration", default="sine", help="sine and/or noise")
+    run_parser.add_argument("--mode", default="segments", choices=("segments", "single_pass"))
+    run_parser.add_argument("--engine", default="zoompan", choices=("zoompan", "numpy"))
+    run_parser.add_argument("--profile", default="final")
+    run_parser.add_argument("--repeat", type=int, default=1, help="runs per case; the median is reported")
+    run_parser.add_argument("--warm-caches", action="store_true", help="keep segment/overlay caches enabled")
+    run_parser.add_argument("--work-dir", type=Path, default=Path(tempfile.gettempdir()) / "shorts-engine-bench")
+    run_parser.add_argument("--out", type=Path, default=None, help="report path (stdout when omitted)")
+
+    compare_parser = subparsers.add_parser("compare", help="flag regressions between two reports")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("candidate", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative growth")
+    compare_parser.add_argument("--min-delta-sec", type=float, default=0.25)
+    compare_parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(args)
+        text = json.dumps(report, indent=2)
+        if args.out is None:
+            print(text)
+        else:
+            args.out.write_text(text + "\n", encoding="utf-8")
+        return
+
+    comparison = compare_reports(
+        json.loads(args.baseline.read_text(encoding="utf-8")),
+        json.loads(args.candidate.read_text(encoding="utf-8")),
+        args.threshold,
+        args.min_delta_sec,
+    )
+    if args.json:
+        print(json.dumps(comparison, indent=2))
+    else:
+        _print_comparison(comparison)
+    # Non-zero exit lets CI fail the build on a regression.
+    sys.exit(1 if comparison["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from app.ffmpeg_exec import FFMPEG_BIN
+
+
+def _run_lavfi(source: str, output_path: Path, extra_args: list[str]) -> Path:
+    if output_path.exists():
+        return output_path
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    command = [FFMPEG_BIN, "-v", "error", "-y", "-f", "lavfi", "-i", source, *extra_args, str(output_path)]
+    subprocess.run(command, check=True)
+    return output_path
+
+
+def make_test_images(output_dir: Path, count: int, width: int = 1536, height: int = 1024) -> list[Path]:
+    """Generate distinct test-pattern PNGs (testsrc2 sampled at different offsets)."""
+    images: list[Path] = []
+    for idx in range(1, count + 1):
+        images.append(
+            _run_lavfi(
+                f"testsrc2=s={width}x{height}:r=1:d={idx + 1}",
+                output_dir / f"image-{width}x{height}-{idx}.png",
+                ["-vf", f"select=eq(n\\,{idx}),hue=h={idx * 37 % 360}", "-frames:v", "1"],
+            )
+        )
+    return images
+
+
+def make_narration(output_dir: Path, duration_sec: int, kind: str = "sine") -> Path:
+    """Generate a narration stand-in: a sine tone or pink noise of the given length."""
+    if kind == "noise":
+        source = f"anoisesrc=color=pink:amplitude=0.2:d={duration_sec}"
+    else:
+        source = f"sine=frequency=220:sample_rate=44100:d={duration_sec}"
+    return _run_lavfi(
+        source,
+        output_dir / f"narration-{kind}-{duration_sec}s.mp3",
+        ["-c:a", "libmp3lame", "-b:a", "128k"],
+    )
+
+
+def make_subtitles(output_dir: Path, duration_sec: int) -> Path:
+    from app.subtitles import build_srt_from_text
+
+    words = " ".join(f"word{idx}" for idx in range(max(10, duration_sec * 2)))
+    srt_path = output_dir / f"subtitles-{duration_sec}s.srt"
+    srt_path.parent.mkdir(parents=True, exist_ok=True)
+    srt_path.write_text(build_srt_from_text(words, float(duration_sec)), encoding="utf-8")
+    return srt_path
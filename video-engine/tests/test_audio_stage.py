@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.audio_stage import AudioCache
+
+SETTINGS: dict[str, Any] = {
+    "mix": "",
+    "durationMs": 12000,
+    "codec": ["-c:a", "aac", "-b:a", "128k"],
+    "loudnorm": None,
+}
+
+
+@pytest.fixture()
+def narration(tmp_path: Path) -> Path:
+    path = tmp_path / "inputs" / "tts.mp3"
+    path.parent.mkdir()
+    path.write_bytes(b"narration-bytes")
+    return path
+
+
+@pytest.fixture()
+def cache(tmp_path: Path) -> AudioCache:
+    return AudioCache(root=tmp_path / "audio", max_bytes=1024 * 1024)
+
+
+def test_key_is_content_addressed(cache: AudioCache, narration: Path, tmp_path: Path) -> None:
+    moved = tmp_path / "elsewhere.mp3"
+    shutil.copyfile(narration, moved)
+    assert cache.key_for(narration, None, SETTINGS) == cache.key_for(moved, None, SETTINGS)
+    moved.write_bytes(b"other narration")
+    assert cache.key_for(narration, None, SETTINGS) != cache.key_for(moved, None, SETTINGS)
+
+
+def test_key_ignores_settings_order(cache: AudioCache, narration: Path) -> None:
+    reordered = dict(reversed(list(SETTINGS.items())))
+    assert cache.key_for(narration, None, SETTINGS) == cache.key_for(narration, None, reordered)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"durationMs": 11999},
+        {"codec": ["-c:a", "aac", "-b:a", "96k"]},
+        {"loudnorm": "I=-14:TP=-1.5:LRA=11"},
+        {"mix": "[0:a]volume=1.0[tts];[1:a]volume=0.13[sfx];[tts][sfx]amix=inputs=2[aout]"},
+    ],
+)
+def test_key_changes_with_every_setting(cache: AudioCache, narration: Path, change: dict[str, Any]) -> None:
+    assert cache.key_for(narration, None, SETTINGS) != cache.key_for(narration, None, {**SETTINGS, **change})
+
+
+def test_key_covers_the_sfx_bed(cache: AudioCache, narration: Path, tmp_path: Path) -> None:
+    sfx = tmp_path / "bed.mp3"
+    sfx.write_bytes(b"bed-1")
+    with_bed = cache.key_for(narration, sfx, SETTINGS)
+    assert with_bed != cache.key_for(narration, None, SETTINGS)
+    sfx.write_bytes(b"bed-2")
+    assert with_bed != cache.key_for(narration, sfx, SETTINGS)
+
+
+def test_hit_returns_the_stored_loudnorm_stats(cache: AudioCache, narration: Path, tmp_path: Path) -> None:
+    track = tmp_path / "audio.m4a"
+    track.write_bytes(b"aac-track")
+    key = cache.key_for(narration, None, SETTINGS)
+    stats = {"input_i": "-20.1", "input_tp": "-3.0"}
+    cache.store(key, track, {"loudnorm": stats})
+
+    destination = tmp_path / "job" / "audio.m4a"
+    destination.parent.mkdir()
+    assert cache.lookup(key, destination) == {"loudnorm": stats}
+    assert destination.read_bytes() == b"aac-track"
+
+
+def test_track_without_sidecar_is_a_miss(cache: AudioCache, narration: Path, tmp_path: Path) -> None:
+    track = tmp_path / "audio.m4a"
+    track.write_bytes(b"aac-track")
+    key = cache.key_for(narration, None, SETTINGS)
+    cache.store(key, track, {"loudnorm": None})
+    next(cache.root.glob("*/*.json")).unlink()
+
+    assert cache.lookup(key, tmp_path / "out.m4a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_eviction_removes_track_and_sidecar_together(narration: Path, tmp_path: Path) -> None:
+    cache = AudioCache(root=tmp_path / "audio", max_bytes=1)
+    track = tmp_path / "audio.m4a"
+    track.write_bytes(b"aac-track")
+    cache.store(cache.key_for(narration, None, SETTINGS), track, {"loudnorm": None})
+
+    assert list(cache.root.glob("*/*")) == []
+    assert cache.stats()["evictions"] == 1
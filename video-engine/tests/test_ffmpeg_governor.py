@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.ffmpeg_builder import _build_segment_merge_command, _resolve_render_profile, _resolve_renditions
+from app.ffmpeg_governor import THREAD_BUDGET, with_thread_budget
+
+
+def test_single_output_gets_threads_before_the_output() -> None:
+    command = ["ffmpeg", "-y", "-i", "in.png", "-c:v", "libx264", "out.mp4"]
+    assert with_thread_budget(command, 3) == [
+        "ffmpeg",
+        "-filter_threads",
+        "3",
+        "-filter_complex_threads",
+        "3",
+        "-y",
+        "-i",
+        "in.png",
+        "-c:v",
+        "libx264",
+        "-threads",
+        "3",
+        "out.mp4",
+    ]
+
+
+def test_every_marked_output_gets_the_budget() -> None:
+    command = [
+        "ffmpeg",
+        "-i",
+        "in.mp4",
+        "-map",
+        "[vmain]",
+        "-threads",
+        THREAD_BUDGET,
+        "main.mp4",
+        "-map",
+        "[rv1out]",
+        "-threads",
+        THREAD_BUDGET,
+        "small.mp4",
+    ]
+    budgeted = with_thread_budget(command, 2)
+    assert THREAD_BUDGET not in budgeted
+    assert budgeted[:5] == ["ffmpeg", "-filter_threads", "2", "-filter_complex_threads", "2"]
+    assert budgeted[budgeted.index("main.mp4") - 2 : budgeted.index("main.mp4")] == ["-threads", "2"]
+    assert budgeted[-3:] == ["-threads", "2", "small.mp4"]
+    assert budgeted.count("-threads") == 2
+
+
+def test_pinned_threads_are_left_alone() -> None:
+    command = ["ffmpeg", "-i", "in.mp4", "-threads", "8", "out.mp4"]
+    assert with_thread_budget(command, 2) is command
+
+
+def test_budget_is_at_least_one_thread() -> None:
+    budgeted = with_thread_budget(["ffmpeg", "-i", "in.mp4", "out.mp4"], 0)
+    assert budgeted[budgeted.index("-threads") + 1] == "1"
+    assert budgeted[2] == "1"
+
+
+def test_degenerate_commands_are_returned_unchanged() -> None:
+    assert with_thread_budget(["ffmpeg"], 4) == ["ffmpeg"]
+    assert with_thread_budget([], 4) == []
+
+
+def test_rendition_merge_budgets_each_output(tmp_path: Path) -> None:
+    _, profile = _resolve_render_profile("final")
+    renditions = _resolve_renditions(
+        [{"name": "small", "width": 360}, {"name": "web", "container": "webm", "height": 640}],
+        30,
+        720,
+        1280,
+        tmp_path,
+    )
+    command = _build_segment_merge_command(
+        tmp_path / "concat.txt",
+        tmp_path / "audio.m4a",
+        "",
+        30,
+        tmp_path / "final.mp4",
+        300,
+        profile=profile,
+        renditions=renditions,
+    )
+    budgeted = with_thread_budget(command, 2)
+    outputs = [str(tmp_path / "final.mp4"), *(str(rendition["path"]) for rendition in renditions)]
+    previous = 0
+    for output in outputs:
+        position = budgeted.index(output)
+        output_args = budgeted[previous:position]
+        assert output_args.count("-threads") == 1
+        assert output_args[output_args.index("-threads") + 1] == "2"
+        previous = position + 1
+    assert THREAD_BUDGET not in budgeted
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pytest
+
+from app import ffmpeg_builder
+from app.ffmpeg_builder import _plan_final_slices
+
+
+@pytest.fixture(autouse=True)
+def _min_slice_sec(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ffmpeg_builder, "FINAL_SLICE_MIN_SEC", 8)
+
+
+def _assert_covers(slices: list[dict[str, int]], frame_counts: list[int]) -> None:
+    scene = 0
+    frame = 0
+    for slice_plan in slices:
+        assert slice_plan["firstScene"] == scene
+        assert slice_plan["startFrame"] == frame
+        assert slice_plan["sceneCount"] >= 1
+        assert slice_plan["frames"] == sum(frame_counts[scene : scene + slice_plan["sceneCount"]])
+        scene += slice_plan["sceneCount"]
+        frame += slice_plan["frames"]
+    assert scene == len(frame_counts)
+    assert frame == sum(frame_counts)
+
+
+def test_single_slice_when_one_requested() -> None:
+    frame_counts = [300, 300, 300]
+    assert _plan_final_slices(frame_counts, 30, 1) == [
+        {"firstScene": 0, "sceneCount": 3, "startFrame": 0, "frames": 900}
+    ]
+
+
+def test_slices_split_on_scene_boundaries_with_similar_length() -> None:
+    frame_counts = [240, 300, 270, 330, 240, 300]
+    slices = _plan_final_slices(frame_counts, 30, 3)
+    assert len(slices) == 3
+    _assert_covers(slices, frame_counts)
+    assert [slice_plan["frames"] for slice_plan in slices] == [540, 600, 540]
+
+
+def test_short_renders_are_not_sliced_below_the_minimum_length() -> None:
+    # 15 s at 30 fps holds one 8 s slice, however many are requested.
+    frame_counts = [150, 150, 150]
+    slices = _plan_final_slices(frame_counts, 30, 4)
+    assert len(slices) == 1
+    _assert_covers(slices, frame_counts)
+
+
+def test_never_more_slices_than_scenes() -> None:
+    frame_counts = [1800, 1800]
+    slices = _plan_final_slices(frame_counts, 30, 8)
+    assert len(slices) == 2
+    _assert_covers(slices, frame_counts)
+
+
+def test_uneven_scenes_still_cover_every_frame() -> None:
+    frame_counts = [1200, 60, 60, 60, 600]
+    for requested in range(1, 6):
+        slices = _plan_final_slices(frame_counts, 30, requested)
+        assert 1 <= len(slices) <= requested
+        _assert_covers(slices, frame_counts)
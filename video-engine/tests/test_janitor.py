@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from app.janitor import OutputJanitor
+
+NOW = 1_700_000_000.0
+HOUR = 60 * 60
+
+
+def _write(path: Path, size: int) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def _age(job_dir: Path, idle_sec: float) -> None:
+    stamp = NOW - idle_sec
+    for path in [*job_dir.rglob("*"), job_dir]:
+        os.utime(path, (stamp, stamp))
+
+
+def _janitor(outputs: Path, **kwargs: object) -> OutputJanitor:
+    options = {
+        "retention_sec": 72 * HOUR,
+        "quota_bytes": 0,
+        "intermediate_ttl_sec": HOUR,
+        "keep_intermediates": False,
+        "interval_sec": 0,
+    }
+    options.update(kwargs)
+    return OutputJanitor(outputs, **options)  # type: ignore[arg-type]
+
+
+def test_expired_job_frees_only_unshared_bytes(tmp_path: Path) -> None:
+    outputs = tmp_path / "outputs"
+    cache_copy = _write(tmp_path / "cache" / "blob", 700)
+    job = outputs / "old"
+    _write(job / "final.mp4", 1000)
+    (job / "assets").mkdir()
+    os.link(cache_copy, job / "assets" / "image-1.png")
+    _age(job, 100 * HOUR)
+
+    plan = _janitor(outputs).plan(now=NOW)
+
+    assert plan["actions"] == [
+        {
+            "jobId": "old",
+            "action": "expire",
+            "reason": "idle 100.0h > retention 72.0h",
+            "bytes": 1000,
+        }
+    ]
+    assert plan["totalBytes"] == 1700
+    assert plan["projectedBytes"] == 700
+    assert plan["freedBytes"] == 1000
+
+
+def test_leftover_intermediates_count_unshared_files_only(tmp_path: Path) -> None:
+    outputs = tmp_path / "outputs"
+    cache_copy = _write(tmp_path / "cache" / "blob", 500)
+    job = outputs / "failed"
+    _write(job / "segment-1.mp4", 300)
+    _write(job / "concat.txt", 20)
+    _write(job / "assets" / "tts.mp3", 80)
+    _write(job / "assets" / "subtitles.srt", 10)
+    os.link(cache_copy, job / "assets" / "image-1.png")
+    _write(job / "ffmpeg.log", 5)
+    _age(job, 2 * HOUR)
+
+    plan = _janitor(outputs).plan(now=NOW)
+
+    assert [(action["action"], action["bytes"]) for action in plan["actions"]] == [("intermediates", 400)]
+    assert plan["projectedBytes"] == plan["totalBytes"] - 400
+
+
+def test_shared_assets_alone_do_not_schedule_a_pass(tmp_path: Path) -> None:
+    outputs = tmp_path / "outputs"
+    cache_copy = _write(tmp_path / "cache" / "blob", 500)
+    job = outputs / "done"
+    _write(job / "final.mp4", 100)
+    (job / "assets").mkdir()
+    os.link(cache_copy, job / "assets" / "image-1.png")
+    _age(job, 2 * HOUR)
+
+    assert _janitor(outputs).plan(now=NOW)["actions"] == []
+
+
+def test_quota_evicts_least_recently_used_after_other_actions(tmp_path: Path) -> None:
+    outputs = tmp_path / "outputs"
+    for job_id, idle_hours in (("newest", 1), ("middle", 5), ("oldest", 10)):
+        _write(outputs / job_id / "final.mp4", 1000)
+        _age(outputs / job_id, idle_hours * HOUR)
+
+    plan = _janitor(outputs, quota_bytes=1500).plan(now=NOW)
+
+    assert [(action["jobId"], action["action"]) for action in plan["actions"]] == [
+        ("oldest", "evict"),
+        ("middle", "evict"),
+    ]
+    assert plan["projectedBytes"] == 1000
+    assert plan["freedBytes"] == 2000
+
+
+def test_active_jobs_are_never_planned(tmp_path: Path) -> None:
+    outputs = tmp_path / "outputs"
+    _write(outputs / "busy" / "segment-1.mp4", 1000)
+    _age(outputs / "busy", 500 * HOUR)
+
+    janitor = _janitor(outputs, quota_bytes=1, is_active=lambda job_id: job_id == "busy")
+    plan = janitor.plan(now=NOW)
+
+    assert plan["actions"] == []
+    assert plan["projectedBytes"] == 1000
+
+
+def test_discard_intermediates_keeps_cache_linked_assets(tmp_path: Path) -> None:
+    outputs = tmp_path / "outputs"
+    cache_copy = _write(tmp_path / "cache" / "blob", 500)
+    job = outputs / "done"
+    _write(job / "final.mp4", 100)
+    _write(job / "segment-1.mp4", 300)
+    _write(job / "assets" / "tts.mp3", 80)
+    _write(job / "assets" / "subtitles.srt", 10)
+    os.link(cache_copy, job / "assets" / "image-1.png")
+
+    freed = _janitor(outputs).discard_intermediates(job)
+
+    assert freed == 380
+    assert sorted(path.name for path in job.rglob("*") if path.is_file()) == [
+        "final.mp4",
+        "image-1.png",
+        "subtitles.srt",
+    ]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+import pytest
+
+from app.cancellation import CancelToken
+from app.jobs import JobAlreadyActive, JobManager, JobQueueFull
+
+WAIT_SEC = 5
+
+
+def _blocking_work(started: threading.Event, release: threading.Event) -> Any:
+    def _work(set_stage: Any, cancel: CancelToken) -> str:
+        set_stage("rendering")
+        started.set()
+        while not release.wait(0.01):
+            cancel.raise_if_cancelled()
+        return "released"
+
+    return _work
+
+
+def test_job_runs_and_keeps_its_result() -> None:
+    manager = JobManager(worker_count=1, max_queue=4)
+    record = manager.submit("job-1", lambda set_stage, cancel: {"ok": True})
+    assert record.done.wait(WAIT_SEC)
+    assert record.state == "succeeded"
+    assert record.stage == "done"
+    assert record.result == {"ok": True}
+    assert manager.get("job-1") is record
+
+
+def test_failed_work_is_recorded() -> None:
+    manager = JobManager(worker_count=1, max_queue=4)
+
+    def _fail(set_stage: Any, cancel: CancelToken) -> None:
+        raise RuntimeError("encode broke")
+
+    record = manager.submit("job-1", _fail)
+    assert record.done.wait(WAIT_SEC)
+    assert record.state == "failed"
+    assert record.error == "encode broke"
+
+
+def test_active_job_id_is_refused_until_it_finishes() -> None:
+    manager = JobManager(worker_count=1, max_queue=4)
+    started, release = threading.Event(), threading.Event()
+    first = manager.submit("job-1", _blocking_work(started, release))
+    assert started.wait(WAIT_SEC)
+    with pytest.raises(JobAlreadyActive):
+        manager.submit("job-1", lambda set_stage, cancel: None)
+    release.set()
+    assert first.done.wait(WAIT_SEC)
+    again = manager.submit("job-1", lambda set_stage, cancel: "second")
+    assert again.done.wait(WAIT_SEC)
+    assert again.result == "second"
+
+
+def test_full_queue_is_refused() -> None:
+    manager = JobManager(worker_count=1, max_queue=1)
+    started, release = threading.Event(), threading.Event()
+    manager.submit("running", _blocking_work(started, release))
+    assert started.wait(WAIT_SEC)
+    manager.submit("queued", lambda set_stage, cancel: None)
+    assert manager.queue_depth() == 1
+    with pytest.raises(JobQueueFull):
+        manager.submit("overflow", lambda set_stage, cancel: None)
+    assert manager.get("overflow") is None
+    release.set()
+
+
+def test_cancel_queued_job_finishes_it_without_running() -> None:
+    manager = JobManager(worker_count=1, max_queue=4)
+    started, release = threading.Event(), threading.Event()
+    running = manager.submit("running", _blocking_work(started, release))
+    assert started.wait(WAIT_SEC)
+    calls: list[str] = []
+    queued = manager.submit("queued", lambda set_stage, cancel: calls.append("ran"))
+    assert manager.cancel("queued") is queued
+    assert queued.state == "cancelled"
+    assert queued.done.is_set()
+    release.set()
+    assert running.done.wait(WAIT_SEC)
+    # The worker has dequeued and skipped the cancelled job by the time the queue drains.
+    manager._queue.join()
+    assert calls == []
+    assert queued.state == "cancelled"
+
+
+def test_cancel_running_job_unwinds_through_the_token() -> None:
+    manager = JobManager(worker_count=1, max_queue=4)
+    started, release = threading.Event(), threading.Event()
+    record = manager.submit("job-1", _blocking_work(started, release))
+    assert started.wait(WAIT_SEC)
+    assert record.stage == "rendering"
+    manager.cancel("job-1")
+    assert record.done.wait(WAIT_SEC)
+    assert record.state == "cancelled"
+    assert record.stage == "cancelled"
+    assert "cancelled by request" in (record.error or "")
+    assert record.result is None
+
+
+def test_cancel_finished_or_unknown_job_changes_nothing() -> None:
+    manager = JobManager(worker_count=1, max_queue=4)
+    record = manager.submit("job-1", lambda set_stage, cancel: "done")
+    assert record.done.wait(WAIT_SEC)
+    assert manager.cancel("job-1") is record
+    assert record.state == "succeeded"
+    assert manager.cancel("missing") is None
+
+
+def test_history_keeps_active_jobs() -> None:
+    manager = JobManager(worker_count=1, max_queue=4, history_limit=1)
+    started, release = threading.Event(), threading.Event()
+    running = manager.submit("running", _blocking_work(started, release))
+    assert started.wait(WAIT_SEC)
+    queued = manager.submit("queued", lambda set_stage, cancel: None)
+    assert manager.get("running") is running
+    assert manager.get("queued") is queued
+    release.set()
+    assert queued.done.wait(WAIT_SEC)
+    finished = manager.submit("later", lambda set_stage, cancel: None)
+    assert finished.done.wait(WAIT_SEC)
+    assert manager.get("running") is None
+    assert manager.get("later") is finished
+
+
+def test_queue_refuses_a_job_id_rendering_inline(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app import main
+
+    manager = JobManager(worker_count=1, max_queue=4)
+    monkeypatch.setattr(main, "job_manager", manager)
+    monkeypatch.setitem(main._inline_builds, "job-1", CancelToken())
+    assert main._job_is_active("job-1")
+    with pytest.raises(JobAlreadyActive):
+        main._submit_queued("job-1", lambda set_stage, cancel: None)
+    assert manager.get("job-1") is None
+    record = main._submit_queued("job-2", lambda set_stage, cancel: None)
+    assert record.done.wait(WAIT_SEC)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app import ffmpeg_builder
+from app.audio_stage import audio_cache
+from app.ffmpeg_builder import probe_av_streams, render_short_video
+from app.ffmpeg_exec import FFMPEG_BIN
+from app.image_prep import image_cache
+from app.media_probe import FFPROBE_BIN
+from app.segment_cache import segment_cache
+from benchmarks.synthetic import make_narration, make_test_images
+
+pytestmark = pytest.mark.skipif(
+    shutil.which(FFMPEG_BIN) is None or shutil.which(FFPROBE_BIN) is None,
+    reason="ffmpeg/ffprobe not installed",
+)
+
+FPS = 30
+DURATION_SEC = 12
+OVERLAY = {"outputWidth": 320, "outputHeight": 568, "outputFps": FPS}
+
+
+@pytest.fixture(scope="module")
+def inputs(tmp_path_factory: pytest.TempPathFactory) -> tuple[list[Path], Path]:
+    work = tmp_path_factory.mktemp("synthetic")
+    return make_test_images(work, 3, 640, 480), make_narration(work, DURATION_SEC)
+
+
+@pytest.fixture(autouse=True)
+def _private_caches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    for cache in (segment_cache, image_cache, audio_cache):
+        monkeypatch.setattr(cache, "root", tmp_path / "cache" / type(cache).__name__)
+    # Lets the 12 s render split into the requested slices.
+    monkeypatch.setattr(ffmpeg_builder, "FINAL_SLICE_MIN_SEC", 4)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"final_slices": 2},
+        {"motion_engine": "numpy"},
+        {"render_mode": "single_pass"},
+    ],
+    ids=["segments", "sliced", "numpy", "single-pass"],
+)
+def test_render_has_every_frame_and_matching_audio(
+    inputs: tuple[list[Path], Path],
+    tmp_path: Path,
+    options: dict[str, Any],
+) -> None:
+    images, narration = inputs
+    output_path, _, stats = render_short_video(
+        image_paths=images,
+        tts_path=narration,
+        subtitle_path=None,
+        output_dir=tmp_path / "job",
+        use_sfx=False,
+        target_duration_sec=float(DURATION_SEC),
+        overlay_options=OVERLAY,
+        **options,
+    )
+    if "final_slices" in options:
+        assert stats["finalSlices"] == options["final_slices"]
+    streams = probe_av_streams(output_path)
+    assert streams["videoFrames"] == DURATION_SEC * FPS
+    assert streams["audioSec"] == pytest.approx(DURATION_SEC, abs=0.1)